@@ -0,0 +1,62 @@
+"""
+Vergleich der HTML-Backends (html_backends.py): Zeit je Detailseite
+(parse_detail_page) und je Kalenderseite (Link-Extraktion) fuer jedes
+installierte Backend, dazu die Seiten, deren Ergebnis von html.parser
+abweicht.
+
+    python bench/bench_backends.py [--pages 500] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scraper  # noqa: E402
+from fixture_site import CATEGORIES, calendar_page, detail_page  # noqa: E402
+from html_backends import available_parsers  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "pages"
+REFERENCE = "html.parser"
+
+
+def best_per_page(fn, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500, help="Generated detail pages in addition to the fixtures (default 500).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs, the best one counts (default 5).")
+    args = parser.parse_args()
+
+    details = [path.read_text(encoding="utf-8") for path in sorted(FIXTURES.glob("detail_*.html"))]
+    details += [detail_page(i) for i in range(args.pages)]
+    listings = [(FIXTURES / "calendar_month.html").read_text(encoding="utf-8")]
+    listings += [calendar_page("https://bluray-disc.de", category, month, 0)
+                 for category in CATEGORIES for month in range(1, 13)]
+
+    reference = [scraper.parse_detail_page(html, REFERENCE) for html in details]
+    reference_links = [sorted(scraper.extract_item_links_from_month_page(html, REFERENCE)) for html in listings]
+    print(f"{len(details)} Detailseiten, {len(listings)} Kalenderseiten")
+    print(f"{'Backend':<12} {'Detailseite':>12} {'Kalenderseite':>14}  Abweichungen")
+    for name in available_parsers():
+        detail_time = best_per_page(lambda html: scraper.parse_detail_page(html, name), details, args.repeat)
+        listing_time = best_per_page(lambda html: scraper.extract_item_links_from_month_page(html, name),
+                                     listings, args.repeat)
+        differing = sum(scraper.parse_detail_page(html, name) != ref for html, ref in zip(details, reference))
+        differing += sum(sorted(scraper.extract_item_links_from_month_page(html, name)) != ref
+                         for html, ref in zip(listings, reference_links))
+        print(f"{name:<12} {detail_time * 1e6:9.0f} us {listing_time * 1e6:11.0f} us  {differing}")
+
+
+if __name__ == "__main__":
+    main()
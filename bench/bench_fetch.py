@@ -0,0 +1,62 @@
+"""
+Benchmark des parallelen Detailseiten-Abrufs: ein 12-Monats-Crawl gegen die
+lokale Nachbildung der Seite (bench/fixture_site.py, feste Latenz je Antwort)
+mit steigender Worker-Zahl. Gemessen wird die Laufzeit von scrape(); die
+gefundenen Eintraege muessen bei jeder Worker-Zahl dieselben sein wie mit
+einem Worker.
+
+    python bench/bench_fetch.py [--latency 0.05] [--workers 1,2,4,8] [--max-rate 0]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scraper  # noqa: E402
+from fixture_site import serve, calendar_template  # noqa: E402
+
+
+def crawl(base_url, concurrency, max_rate, category):
+    config = scraper.ScrapeConfig(
+        calendar_template=calendar_template(base_url),
+        calendar_year="2026",
+        category=category,
+        ignore_production=True,
+        concurrency=concurrency,
+        max_rate=max_rate,
+        start_rate=max_rate or scraper.DEFAULT_START_RATE,
+        cache=None,
+    )
+    start = time.perf_counter()
+    items = list(scraper.scrape(config))
+    return time.perf_counter() - start, items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per response (default 0.05).")
+    parser.add_argument("--workers", type=str, default="1,2,4,8", help="Worker counts (default 1,2,4,8).")
+    parser.add_argument("--max-rate", type=float, default=0, help="Politeness budget per host (default 0 = unlimited).")
+    parser.add_argument("--category", type=str, default="4k-uhd", help="Category to crawl (default 4k-uhd).")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    workers = [int(w) for w in args.workers.split(",")]
+    with serve(args.latency) as base_url:
+        reference = None
+        baseline = None
+        print(f"{'Worker':>6}  {'Zeit':>7}  {'Speedup':>7}  Eintraege")
+        for n in workers:
+            elapsed, items = crawl(base_url, n, args.max_rate, args.category)
+            if reference is None:
+                reference, baseline = items, elapsed
+            same = "gleich" if items == reference else "ABWEICHEND"
+            print(f"{n:>6}  {elapsed:6.2f}s  {baseline / elapsed:6.1f}x  {len(items)} ({same})")
+
+
+if __name__ == "__main__":
+    main()
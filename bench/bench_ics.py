@@ -0,0 +1,109 @@
+"""
+Benchmark des ICS-Schreibens: ein grosser Kalender (default 50000 Termine)
+einmal wie frueher als icalendar.Calendar-Baum mit to_ical() am Ende und
+einmal mit dem streamenden IcsWriter. Jede Variante laeuft in einem eigenen
+Prozess, gemessen werden Laufzeit und Zuwachs des Spitzen-RSS. Beide Dateien
+muessen byte-gleich sein.
+
+    python bench/bench_ics.py [--events 50000]
+"""
+
+import argparse
+import filecmp
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+try:
+    import resource  # Unix only; elsewhere the peak RSS is not reported
+except ImportError:
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+STAMP = datetime(2026, 10, 16, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def events(count):
+    for i in range(count):
+        url = f"https://bluray-disc.de/4k-uhd/filme/{i}-film-nummer-{i}"
+        yield (f"Film Nummer {i}: Der lange Titel, Teil {i % 7} (4K UHD Blu-ray Steelbook)",
+               date(2024, 1, 1) + timedelta(days=i % 1500), url)
+
+
+def write_icalendar(path, count):
+    from icalendar import Calendar, Event
+    from ics_writer import event_uid, PRODID
+    cal = Calendar()
+    cal.add("prodid", PRODID)
+    cal.add("version", "2.0")
+    for title, dtstart, url in events(count):
+        event = Event()
+        event.add("summary", title)
+        event.add("dtstart", dtstart)
+        event.add("dtstamp", STAMP)
+        event["uid"] = event_uid(url)
+        event.add("description", f"Quelle: {url}")
+        cal.add_component(event)
+    with open(path, "wb") as f:
+        f.write(cal.to_ical())
+
+
+def write_streaming(path, count):
+    from ics_writer import IcsWriter, event_uid
+    with open(path, "wb") as f, IcsWriter(f) as cal:
+        for title, dtstart, url in events(count):
+            cal.add_event(title, event_uid(url), dtstamp=STAMP, dtstart=dtstart, description=f"Quelle: {url}")
+
+
+VARIANTS = {"icalendar": write_icalendar, "streaming": write_streaming}
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_variant(name, path, count):
+    """Child process: write one calendar, print time and peak RSS growth as JSON."""
+    before = _peak_rss_mb()
+    start = time.perf_counter()
+    VARIANTS[name](path, count)
+    elapsed = time.perf_counter() - start
+    after = _peak_rss_mb()
+    print(json.dumps({"seconds": elapsed, "rss_mb": None if before is None else after - before}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=50000, help="Number of events (default 50000).")
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.variant:
+        run_variant(args.variant, args.out, args.events)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        print(f"{args.events} Termine")
+        for name in VARIANTS:
+            paths[name] = Path(tmp) / f"{name}.ics"
+            out = subprocess.run([sys.executable, __file__, "--variant", name, "--out", str(paths[name]),
+                                  "--events", str(args.events)], check=True, capture_output=True, text=True).stdout
+            result = json.loads(out)
+            rss = "n/a" if result["rss_mb"] is None else f"+{result['rss_mb']:.0f} MB"
+            print(f"{name:<10} {result['seconds']:6.2f}s  Spitzen-RSS {rss}")
+        same = filecmp.cmp(paths["icalendar"], paths["streaming"], shallow=False)
+        print("Ausgabe byte-gleich" if same else "Ausgabe ABWEICHEND")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark von normalize_title(): die fruehere Inline-Normalisierung (rund 25
+re.sub-Durchlaeufe, Kopie aus tests/test_title_normalizer.py) gegen die
+vorkompilierte Fassung, ohne und mit LRU-Cache, ueber die echten Titel mit
+Editionszusaetzen aus dem Test. Alle Varianten muessen dieselben Schluessel
+liefern.
+
+    python bench/bench_normalizer.py [--rounds 50]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from title_normalizer import normalize_title  # noqa: E402
+from test_title_normalizer import TITLES, _legacy_normalize  # noqa: E402
+
+
+def per_call(fn, titles, rounds, before_round=None):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if before_round:
+            before_round()
+        for title in titles:
+            fn(title)
+    return (time.perf_counter() - start) / (rounds * len(titles))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=50, help="Passes over all titles (default 50).")
+    args = parser.parse_args()
+
+    titles = [title for title in TITLES if title]
+    mismatches = sum(normalize_title(title) != _legacy_normalize(title) for title in titles)
+    print(f"{len(titles)} Titel x {args.rounds} Durchlaeufe, {mismatches} abweichende Schluessel")
+    variants = [
+        ("vorher (Inline, re.sub)", lambda: per_call(_legacy_normalize, titles, args.rounds)),
+        # the cache is emptied before every pass, so each call really normalizes
+        ("nachher, ohne Cache", lambda: per_call(normalize_title, titles, args.rounds, normalize_title.cache_clear)),
+        ("nachher, mit Cache", lambda: per_call(normalize_title, titles, args.rounds)),
+    ]
+    for name, run in variants:
+        print(f"{name:<26} {run() * 1e6:7.1f} us/Titel")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Micro-Benchmark von parse_detail_page(): Parse-Zeit und Speicher je Seite
+vorher (bench/legacy_parse.py, kompletter BeautifulSoup-Baum) und nachher
+(Single-Pass-Extraktion) ueber die gespeicherten Detailseiten in
+tests/fixtures/pages und generierte Seiten aus bench/fixture_site.py. Beide
+Varianten muessen auf jeder Seite dasselbe Ergebnis liefern.
+
+Zeit: bester von --repeat Durchlaeufen ueber alle Seiten, je Seite gemittelt.
+Speicher: Spitze der mit tracemalloc gezaehlten Allokationen waehrend einer
+Seite (eigener Durchlauf, tracemalloc verfaelscht die Zeitmessung).
+
+    python bench/bench_parse.py [--pages 500] [--repeat 5] [--parser html.parser]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scraper  # noqa: E402
+from fixture_site import detail_page  # noqa: E402
+from legacy_parse import parse_detail_page as legacy_parse_detail_page  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "pages"
+
+
+def load_pages(generated):
+    pages = [path.read_text(encoding="utf-8") for path in sorted(FIXTURES.glob("detail_*.html"))]
+    return pages + [detail_page(i) for i in range(generated)]
+
+
+def comparable(meta):
+    # the old code returned the formats in set order
+    return {**meta, "detected_formats": sorted(meta["detected_formats"])}
+
+
+def time_per_page(parse, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            parse(html)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages)
+
+
+def peak_per_page(parse, pages):
+    """(mean, max) of the tracemalloc peak while parsing one page, in bytes."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for html in pages:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            parse(html)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks), max(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500, help="Generated pages in addition to the fixtures (default 500).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs, the best one counts (default 5).")
+    parser.add_argument("--parser", type=str, default="html.parser", choices=scraper.PARSER_CHOICES,
+                        help="Backend of the new extraction (default html.parser, like the old code).")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    variants = [
+        ("vorher (bs4 html.parser)", legacy_parse_detail_page),
+        (f"nachher ({args.parser})", lambda html: scraper.parse_detail_page(html, args.parser)),
+    ]
+
+    mismatches = sum(comparable(legacy_parse_detail_page(html)) != comparable(scraper.parse_detail_page(html, args.parser))
+                     for html in pages)
+    print(f"{len(pages)} Seiten, {mismatches} abweichende Ergebnisse")
+    print(f"{'Variante':<28} {'Zeit/Seite':>11} {'Speicher/Seite':>15} {'max':>9}")
+    for name, parse in variants:
+        seconds = time_per_page(parse, pages, args.repeat)
+        mean_peak, max_peak = peak_per_page(parse, pages)
+        print(f"{name:<28} {seconds * 1e6:8.0f} us {mean_peak / 1024:11.0f} KiB {max_peak / 1024:5.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
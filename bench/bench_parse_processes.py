@@ -0,0 +1,64 @@
+"""
+Skalierung der Parse-Stufe mit Prozessen (--parse-processes): einige tausend
+generierte Detailseiten (bench/fixture_site.py) werden einmal im Thread und
+dann wie in scrape() ueber einen ProcessPoolExecutor geparst (zwei Threads
+je Prozess reichen das HTML ein und warten auf parse_detail_record()). Die
+Ergebnisse muessen mit dem Thread-Pfad uebereinstimmen.
+
+Mehr Prozesse als CPU-Kerne bringen nichts; auf einem Kern zeigt die Messung
+nur den Overhead der Interprozess-Kommunikation.
+
+    python bench/bench_parse_processes.py [--pages 3000] [--processes 1,2,4] [--parser html.parser]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scraper  # noqa: E402
+from fixture_site import detail_page  # noqa: E402
+
+
+def parse_in_processes(pages, processes, parser):
+    with ProcessPoolExecutor(processes) as pool:
+        list(pool.map(int, range(processes)))  # start the workers before the clock runs
+        start = time.perf_counter()
+        with ThreadPoolExecutor(2 * processes) as threads:
+            results = list(threads.map(
+                lambda html: scraper.meta_from_record(pool.submit(scraper.parse_detail_record, html, parser).result()),
+                pages))
+        return time.perf_counter() - start, results
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_processes = ",".join(str(n) for n in sorted({1, 2, 4, cores}))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=3000, help="Generated detail pages (default 3000).")
+    parser.add_argument("--processes", type=str, default=default_processes,
+                        help=f"Process counts (default {default_processes}).")
+    parser.add_argument("--parser", type=str, default="html.parser", choices=scraper.PARSER_CHOICES,
+                        help="HTML backend (default html.parser).")
+    args = parser.parse_args()
+
+    pages = [detail_page(i) for i in range(args.pages)]
+    start = time.perf_counter()
+    reference = [scraper.parse_detail_page(html, args.parser) for html in pages]
+    in_thread = time.perf_counter() - start
+
+    print(f"{len(pages)} Seiten, {args.parser}, {cores} CPU-Kern(e)")
+    print(f"{'Prozesse':>8}  {'Zeit':>7}  {'Speedup':>7}  Abweichungen")
+    print(f"{'Thread':>8}  {in_thread:6.2f}s  {1:6.1f}x")
+    for n in (int(p) for p in args.processes.split(",")):
+        elapsed, results = parse_in_processes(pages, n, args.parser)
+        differing = sum(got != ref for got, ref in zip(results, reference))
+        print(f"{n:>8}  {elapsed:6.2f}s  {in_thread / elapsed:6.1f}x  {differing}")
+
+
+if __name__ == "__main__":
+    main()
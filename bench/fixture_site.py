@@ -0,0 +1,122 @@
+"""
+Lokale Nachbildung von bluray-disc.de fuer die Benchmarks: Kalenderseiten
+(mit Paginierung) und Detailseiten mit Breadcrumb, Titel, Datum in
+wechselnden Schreibweisen und Produktionsangabe. Alle Seiten sind
+deterministisch, jede Antwort wird um eine feste Latenz verzoegert.
+
+    with serve(latency=0.05) as base_url:
+        config = ScrapeConfig(calendar_template=calendar_template(base_url), ...)
+"""
+
+import hashlib
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CATEGORIES = ["4k-uhd", "blu-ray-filme", "serien", "3d-blu-ray-filme", "blu-ray-importe"]
+ITEMS = 400
+PER_PAGE = 10
+TITLES = ["Dune: Part Two", "Oppenheimer", "Der Herr der Ringe - Die Gefährten", "Alien: Romulus", "Gladiator II",
+          "Das Boot", "Babylon Berlin - Staffel 4", "The Walking Dead - Die komplette Serie", "Avatar 3D",
+          "Ghostbusters", "Mad Max: Furiosa", "Blade Runner 2049", "Jäger des verlorenen Schatzes", "Heat",
+          "Terminator 2"]
+EDITIONS = ["", " (Steelbook)", " 4K (4K UHD + Blu-ray)", " (Limited Mediabook) (Cover A)", " - Limited Edition",
+            " (2 Blu-rays)"]
+MONTHS = ["Januar", "Februar", "März", "April", "Mai", "Juni", "Juli", "August", "September", "Oktober",
+          "November", "Dezember"]
+
+
+def calendar_template(base_url):
+    """--calendar-template / ScrapeConfig.calendar_template for the fixture site."""
+    return base_url + "/{category}/kalender?id={year}-{month:02d}"
+
+
+def detail_page(i, base_url="https://bluray-disc.de", year=2026):
+    """HTML of detail page `i` (any non-negative int); the padding makes it about as long
+    as a real page, with the sidebar dates and scripts the extraction has to skip."""
+    rnd = random.Random(i)
+    # every title exists in several editions (duplicates for the dedup), and as a sequel
+    block, variant = divmod(i, len(TITLES) * len(EDITIONS))
+    title = TITLES[i % len(TITLES)] + (f" - Teil {block + 1}" if block else "") + EDITIONS[variant // len(TITLES)]
+    category = CATEGORIES[i % len(CATEGORIES)]
+    month = i % 12 + 1
+    day = rnd.randint(1, 28)
+    date_text = [f"Ab {day:02d}.{month:02d}.{year}", f"{day}. {MONTHS[month - 1]} {year}",
+                 f"VÖ: {day:02d}.{month:02d}.{year}"][i % 3]
+    production = rnd.choice([1990, year - 2, year - 1, year])
+    news = "".join(f"<li><a href='/news/{i * 31 + n}'>Meldung vom {n % 28 + 1:02d}.{n % 12 + 1:02d}.{year - 1}"
+                   f"</a> Lorem ipsum dolor sit amet, consetetur sadipscing elitr.</li>" for n in range(rnd.randint(10, 40)))
+    return f"""<html><head><title>{title}</title><script>var release = "Ab 01.01.1999";</script></head><body>
+<nav class="breadcrumb"><a href="/">Start</a> &gt; <a href="/{category}">{category.replace('-', ' ').upper()}</a></nav>
+<div class="sidebar"><h3>Neu</h3><p>News vom 03.02.{year - 2}</p><ul>{news}</ul></div>
+<h1>{title}</h1>
+<div class="info"><p>{date_text}</p><p>Produktion: USA / {production}</p><p>Regie: Jemand</p>
+<p>Darsteller: Leute</p><p>Laufzeit 120 Min.</p></div>
+<a href="{base_url}/blu-ray-filme/{(i * 7) % ITEMS}-other">Weitere Filme</a>
+</body></html>"""
+
+
+def calendar_page(base_url, category, month, page):
+    """Listing page `page` of a category month: links to the items of that month."""
+    index = CATEGORIES.index(category)
+    ids = [i for i in range(ITEMS) if i % 12 + 1 == month and (i % len(CATEGORIES) == index or i % 3 == 0)]
+    links = "\n".join(f'<li><a href="{base_url}/blu-ray-filme/{i}-film?ref=kalender#c">Film</a></li>'
+                      for i in ids[page * PER_PAGE:(page + 1) * PER_PAGE])
+    return f"<html><body><ul>{links}</ul><a href='/impressum'>Impressum</a></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    base_url = ""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        m = re.match(r"/([\w-]+)/kalender\?id=\d{4}-(\d{2})(?:&page=(\d+))?", self.path)
+        if m and m.group(1) in CATEGORIES:
+            body = calendar_page(self.base_url, m.group(1), int(m.group(2)), int(m.group(3) or 0))
+        else:
+            m = re.match(r"/blu-ray-filme/(\d+)", self.path)
+            if not m:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = detail_page(int(m.group(1)), self.base_url)
+        data = body.encode("utf-8")
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@contextmanager
+def serve(latency=0.05):
+    """Run the fixture site on a free local port; yields its base URL. Every response is
+    delayed by `latency` seconds (a stand-in for the network round trip)."""
+    handler = type("Handler", (_Handler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    handler.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield handler.base_url
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,203 @@
+"""
+Die fruehere parse_detail_page() (vor dem Single-Pass-Umbau), unveraendert
+uebernommen als Vergleichsbasis fuer bench/bench_parse.py: kompletter
+BeautifulSoup-Baum mit html.parser, get_text() ueber die ganze Seite und
+unkompilierte Regex-Suchen.
+"""
+
+from bs4 import BeautifulSoup
+from datetime import datetime
+import re
+
+
+def parse_detail_page(html):
+    """
+    Extrahiert Titel, Release-Datum (wenn vorhanden) und Produktionsjahr (falls angezeigt).
+    Rückgabe: dict mit keys: title, release_date (datetime.date oder None), production_year (int or None)
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    result = {"title": None, "release_date": None, "production_year": None, "url": None, "detected_formats": []}
+
+    # Titel
+    h1 = soup.find(["h1", "h2"])
+    if h1:
+        result["title"] = h1.get_text(strip=True)
+
+    # Detect format/category from breadcrumbs and title (NOT sidebar/full page)
+    formats = set()
+    title_lower = (result.get("title") or "").lower()
+
+    # Check breadcrumbs only (reliable category indicator)
+    for nav in soup.select("nav, .breadcrumb, .breadcrumbs, ol.breadcrumb"):
+        nav_text = nav.get_text(" ", strip=True).lower()
+        if "4k" in nav_text or "uhd" in nav_text or "ultra hd" in nav_text:
+            formats.add("4k-uhd")
+        if "serie" in nav_text:
+            formats.add("serien")
+        if "3d" in nav_text:
+            formats.add("3d-blu-ray-filme")
+        if "import" in nav_text:
+            formats.add("blu-ray-importe")
+
+    # Check the TITLE for series indicators (Staffel, Season, komplette Serie)
+    if re.search(r"\bstaffel\b|\bseason\b|\bkomplette\s+serie\b", title_lower):
+        formats.add("serien")
+
+    # Check the title for 4K/UHD indicators
+    if re.search(r"\b4k\b|\buhd\b|\bultra\s*hd\b", title_lower):
+        formats.add("4k-uhd")
+    if re.search(r"\b3d\b", title_lower):
+        formats.add("3d-blu-ray-filme")
+    # Check the URL itself for category hints
+    result["detected_formats"] = list(formats)
+
+    # Suche nach Produktionsjahr - die Seite führt öfters "Produktion: 2025" oder es ist in Klammern im Titel
+    text = soup.get_text(" ", strip=True)
+    # Erweiterte Suche nach Produktionsjahr unter "Produktion:" Abschnitt
+    # Try to find an explicit "Produktion" label and extract ALL 4-digit years
+    # that appear in the production section. This covers variants like:
+    #   Produktion: USA / 1990
+    #   Produktion: Neuseeland / 2025
+    #   Produktion\nUSA / 1990
+    #   Produktion: Deutschland/Frankreich 2024
+    production_years = []
+    m = re.search(r"Produktion\b", text, flags=re.IGNORECASE)
+    if m:
+        # look at the next 500 characters after the label for all 4-digit years
+        start = m.start()
+        # Find the end of the production section (until next major section or end of reasonable text)
+        end_markers = [r"\bRegie\b", r"\bDarsteller\b", r"\bGenre\b", r"\bLaufzeit\b", r"\bSprache\b", r"\bBildformat\b", r"\bTonformat\b", r"\bFSK\b"]
+        end_pos = len(text)
+        for marker in end_markers:
+            match = re.search(marker, text[start+50:], flags=re.IGNORECASE)  # skip first 50 chars to avoid false matches
+            if match:
+                candidate_end = start + 50 + match.start()
+                end_pos = min(end_pos, candidate_end)
+        
+        # Limit to reasonable section size (max 800 chars)
+        end_pos = min(end_pos, start + 800)
+        snippet = text[start:end_pos]
+        
+        # Find all 4-digit years in the production section
+        for y_match in re.finditer(r"([0-9]{4})", snippet):
+            year = int(y_match.group(1))
+            # Only consider years that could realistically be production years (1900-2030)
+            if 1900 <= year <= 2030:
+                production_years.append(year)
+        
+        # Choose the most recent/relevant production year
+        if production_years:
+            # Remove duplicates and sort
+            production_years = sorted(set(production_years), reverse=True)
+            # Prefer years closer to current time (within reasonable range)
+            current_year = datetime.now().year
+            # Look for years within a reasonable production range (current year - 5 to current year + 5)
+            reasonable_years = [y for y in production_years if current_year - 5 <= y <= current_year + 5]
+            if reasonable_years:
+                result["production_year"] = reasonable_years[0]  # Most recent reasonable year
+            else:
+                result["production_year"] = production_years[0]  # Most recent year overall
+    
+    # Additional pattern: look for "Country / YYYY" format which is common on bluray-disc.de
+    if result["production_year"] is None:
+        # Pattern like "Deutschland / 2025" or "USA / 2024"
+        country_year_pattern = r"([A-Za-zäöüÄÖÜß]+(?:\s*/\s*[A-Za-zäöüÄÖÜß]+)*)\s*/\s*([0-9]{4})"
+        for match in re.finditer(country_year_pattern, text):
+            year = int(match.group(2))
+            current_year = datetime.now().year
+            # Only consider reasonable production years
+            if current_year - 5 <= year <= current_year + 5:
+                result["production_year"] = year
+                break
+    
+    # Fallback: if no production section found, try looking for years in parentheses near the title
+    # but be more selective about this
+    if result["production_year"] is None and result["title"]:
+        # Look for (YYYY) patterns near the title, but only consider reasonable production years
+        title_area = text[:500]  # First 500 chars should contain title area
+        for y_match in re.finditer(r"\(([0-9]{4})\)", title_area):
+            year = int(y_match.group(1))
+            current_year = datetime.now().year
+            if current_year - 5 <= year <= current_year + 5:  # Only recent/upcoming years
+                result["production_year"] = year
+                break
+    
+    # NOTE: Improved logic now searches entire production section for any valid years
+    # and uses heuristics to pick the most likely production year
+
+    # Release-Datum: suche nach Formaten wie "Ab 07.11.2025" oder "07.11.2025" oder "07. November 2025"
+    # mehrere Muster versuchen:
+    date_patterns = [
+        r"Ab\s+([0-3]?\d\.[01]?\d\.[0-9]{4})",
+        r"ab\s+([0-3]?\d\.[01]?\d\.[0-9]{4})",
+        r"([0-3]?\d\.\s*(?:Januar|Februar|März|April|Mai|Juni|Juli|August|September|Oktober|November|Dezember)\s*[0-9]{4})",
+        r"([0-3]?\d\.[01]?\d\.[0-9]{4})"
+    ]
+    month_dict = {
+        "Januar":"01","Februar":"02","März":"03","April":"04","Mai":"05","Juni":"06",
+        "Juli":"07","August":"08","September":"09","Oktober":"10","November":"11","Dezember":"12"
+    }
+    # prefer searching close to the title (avoid finding page meta publish dates)
+    snippet = text
+    if result["title"]:
+        idx = text.find(result["title"])
+        if idx >= 0:
+            snippet = text[idx:idx+800]
+
+    for pat in date_patterns:
+        mm = re.search(pat, snippet, flags=re.IGNORECASE)
+        if not mm:
+            mm = re.search(pat, text, flags=re.IGNORECASE)
+        if mm:
+            s = mm.group(1)
+            s = s.strip()
+            # replace month names with numeric month
+            for name, num in month_dict.items():
+                if re.search(name, s, flags=re.IGNORECASE):
+                    s = re.sub(name, "."+num+".", s, flags=re.IGNORECASE)
+            # keep only digits, dots and whitespace, then collapse duplicate dots
+            s = re.sub(r"[^0-9\.\s]", "", s)
+            s = re.sub(r"\.{2,}", ".", s)
+            s = s.replace(" ", "")
+            # try several parse attempts
+            for fmt in ("%d.%m.%Y", "%d.%m.%y"):
+                try:
+                    dt = datetime.strptime(s, fmt)
+                    result["release_date"] = dt.date()
+                    result["raw_date"] = s
+                    break
+                except Exception:
+                    pass
+
+            # if we only found day.month (no year), try to infer year 2025 when sensible
+            if result.get("release_date") is None:
+                m_short = re.search(r"([0-3]?\d\.[01]?\d)\.?$", s)
+                if m_short:
+                    daymonth = m_short.group(1)
+                    # infer year 2025 if month is 11 or 12
+                    try:
+                        inferred_year = str(datetime.now().year)
+                        dm = datetime.strptime(daymonth + "." + inferred_year, "%d.%m.%Y")
+                        result["release_date"] = dm.date()
+                        result["raw_date"] = daymonth + "." + inferred_year
+                    except Exception:
+                        pass
+
+            # fallback: if no date yet, try to find day.month + year within nearby text
+            if result.get("release_date") is None:
+                m2 = re.search(r"([0-3]?\d\.[01]?\d)\D{0,30}([0-9]{4})", snippet)
+                if not m2:
+                    m2 = re.search(r"([0-3]?\d\.[01]?\d)\D{0,30}([0-9]{4})", text)
+                if m2:
+                    candidate = f"{m2.group(1)}.{m2.group(2)}"
+                    candidate = re.sub(r"\.{2,}", ".", candidate)
+                    try:
+                        dt = datetime.strptime(candidate, "%d.%m.%Y")
+                        result["release_date"] = dt.date()
+                        result["raw_date"] = candidate
+                    except Exception:
+                        pass
+            if result.get("release_date"):
+                break
+
+    return result
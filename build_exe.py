@@ -20,7 +20,7 @@ PyInstaller.__main__.run([
     "web_ui.py",
     "--onefile",
     "--name=BluRay-Calendar-Scraper",
-    "--add-data=scraper.py;.",
+    "--hidden-import=scraper",
     "--hidden-import=flask",
     "--hidden-import=icalendar",
     "--hidden-import=requests",
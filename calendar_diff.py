@@ -0,0 +1,79 @@
+"""
+Abgleich eines neuen Kalenders mit dem zuletzt erzeugten (--diff).
+
+Die Termine werden ueber ihre stabile UID (ics_writer.event_uid) zugeordnet:
+unveraenderte Termine behalten DTSTAMP, SEQUENCE und LAST-MODIFIED aus dem
+alten Kalender, sodass abonnierende Kalender-Clients sie nicht neu
+uebertragen. Geaenderte Termine (Titel, Datum, Beschreibung) bekommen eine
+hoehere SEQUENCE, neue starten mit SEQUENCE 0, und Termine, die nicht mehr
+vorkommen, werden einmal mit STATUS:CANCELLED ausgeliefert und beim naechsten
+Lauf entfernt. Die Delta-Liste enthaelt nur neue, geaenderte und abgesagte
+Termine.
+"""
+
+from datetime import datetime, timezone
+
+from ics_writer import iter_events
+
+# properties whose change makes an event "changed"
+_CONTENT_FIELDS = ("summary", "dtstart", "description")
+
+
+class DiffStats:
+    def __init__(self):
+        self.added = 0
+        self.changed = 0
+        self.cancelled = 0
+        self.unchanged = 0
+
+    def summary(self):
+        return (f"{self.added} neu, {self.changed} geaendert, {self.cancelled} abgesagt, "
+                f"{self.unchanged} unveraendert")
+
+
+def load_previous(path):
+    """{uid: event} of a previously written calendar; empty if the file does not exist."""
+    try:
+        with open(path, "rb") as f:
+            return {event["uid"]: event for event in iter_events(f)}
+    except FileNotFoundError:
+        return {}
+
+
+def diff_events(previous, events, now=None):
+    """Merge the new `events` (event dicts with "uid") with the `previous` calendar.
+
+    Returns (calendar, delta, stats): `calendar` is the full new event list,
+    `delta` only the added, changed and cancelled events.
+    """
+    now = now or datetime.now(timezone.utc)
+    stats = DiffStats()
+    calendar, delta = [], []
+    seen = set()
+    for event in events:
+        uid = event["uid"]
+        seen.add(uid)
+        old = previous.get(uid)
+        if old is None:
+            event = {**event, "dtstamp": now, "sequence": 0, "last_modified": now}
+            stats.added += 1
+            delta.append(event)
+        elif old.get("status") == "CANCELLED" or any(old.get(k) != event.get(k) for k in _CONTENT_FIELDS):
+            # changed, or back after a cancellation
+            event = {**event, "dtstamp": now, "sequence": old.get("sequence", 0) + 1, "last_modified": now}
+            stats.changed += 1
+            delta.append(event)
+        else:
+            event = {**event, "dtstamp": old.get("dtstamp", now), "sequence": old.get("sequence", 0),
+                     "last_modified": old.get("last_modified")}
+            stats.unchanged += 1
+        calendar.append(event)
+    for uid, old in previous.items():
+        if uid in seen or old.get("status") == "CANCELLED":
+            continue  # cancellations were delivered by the previous calendar already
+        event = {**old, "dtstamp": now, "sequence": old.get("sequence", 0) + 1,
+                 "last_modified": now, "status": "CANCELLED"}
+        stats.cancelled += 1
+        calendar.append(event)
+        delta.append(event)
+    return calendar, delta, stats
@@ -0,0 +1,106 @@
+"""
+Ereignisprotokoll eines Web-Jobs fuer beliebig viele SSE-Leser.
+
+Bisher hing an jedem Job eine queue.Queue, aus der genau ein /stream-Aufruf
+die Ereignisse entnommen hat. Das EventLog behaelt die Ereignisse dagegen:
+jeder Leser spielt sie von vorne ab und folgt dann den neuen. So koennen
+mehrere Browser-Tabs (bzw. zusammengelegte identische Anfragen) denselben
+laufenden Job verfolgen, auch wenn sie spaeter dazukommen.
+
+Das Protokoll ist ein Ringpuffer mit fester Groesse: bei sehr gespraechigen
+Crawls fallen die aeltesten Eintraege heraus (ausgelassene Log-Zeilen werden
+gezaehlt), statt dass der Speicher unbegrenzt waechst. Fortschritt und
+Teil-Job-Status gehen dabei nicht verloren -- davon wird jeweils der letzte
+Stand gesondert gehalten, ebenso die Vorschau-Deltas (bis discard() sie
+nach Ende des Jobs freigibt). Jedes Ereignis hat eine fortlaufende Nummer, ab
+der ein Leser (z.B. nach Verbindungsabbruch per Last-Event-ID) weiterliest.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from itertools import islice
+
+# the last event of a job; a log that received one of them is closed
+TERMINAL_EVENTS = ("done", "error", "preview")
+# events that describe a state; only the latest one per key matters
+STATE_EVENTS = ("progress", "subjob")
+# events a reader must never miss; they are kept when they fall out of the buffer
+KEPT_EVENTS = ("items",)
+
+DEFAULT_CAPACITY = 2000
+
+
+def _state_key(msg):
+    return msg["type"], msg.get("id")
+
+
+def coalesce(events):
+    """`events` with superseded state events removed (only the last "progress" and the
+    last "subjob" per id are kept); everything else keeps its order."""
+    last = {_state_key(msg): i for i, msg in enumerate(events) if msg.get("type") in STATE_EVENTS}
+    return [msg for i, msg in enumerate(events)
+            if msg.get("type") not in STATE_EVENTS or last[_state_key(msg)] == i]
+
+
+class EventLog:
+    """Event ring buffer of at most `capacity` events. put() has the signature of
+    queue.Queue.put, so producers that used a queue need no change."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._events = deque()      # (number, msg)
+        self._state = OrderedDict()  # state key -> (number, msg) of the latest state event
+        self._kept = []              # (number, msg) of KEPT_EVENTS that fell out of the buffer
+        self._next = 0              # number of the next event
+        self._cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0            # log lines that fell out of the buffer
+
+    def put(self, msg):
+        with self._cond:
+            self._events.append((self._next, msg))
+            if msg.get("type") in STATE_EVENTS:
+                key = _state_key(msg)
+                self._state.pop(key, None)
+                self._state[key] = (self._next, msg)
+            self._next += 1
+            while len(self._events) > self.capacity:
+                number, old = self._events.popleft()
+                if old is None:
+                    continue
+                if old.get("type") == "log":
+                    self.dropped += 1
+                elif old.get("type") in KEPT_EVENTS:
+                    self._kept.append((number, old))
+            if msg.get("type") in TERMINAL_EVENTS:
+                self.closed = True
+            self._cond.notify_all()
+
+    def read(self, start, timeout=None):
+        """Events from number `start` on, waiting up to `timeout` seconds if there are
+        none yet. Returns (events, next start, closed). A reader that fell behind the
+        buffer first gets a notice about the dropped lines, the latest state events and
+        the kept events it missed."""
+        with self._cond:
+            if self._next <= start and not self.closed:
+                self._cond.wait(timeout)
+            start = min(max(start, 0), self._next)
+            first = self._events[0][0] if self._events else self._next
+            events = []
+            if start < first:
+                if self.dropped:
+                    events.append({"type": "log", "level": "warn",
+                                   "text": f"... {self.dropped} aeltere Log-Zeilen ausgelassen ..."})
+                missed = [(number, msg) for number, msg in self._state.values() if start <= number < first]
+                missed += [(number, msg) for number, msg in self._kept if start <= number]
+                events.extend(msg for _, msg in sorted(missed, key=lambda entry: entry[0]))
+                start = first
+            events.extend(msg for _, msg in islice(self._events, start - first, None) if msg is not None)
+            return events, self._next, self.closed
+
+    def discard(self, kind):
+        """Forget all events of type `kind` (their numbers stay taken)."""
+        with self._cond:
+            self._events = deque((number, None if msg is not None and msg.get("type") == kind else msg)
+                                 for number, msg in self._events)
+            self._kept = [(number, msg) for number, msg in self._kept if msg.get("type") != kind]
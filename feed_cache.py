@@ -0,0 +1,130 @@
+"""
+Serverseitiger Cache fuer abonnierbare ICS-Feeds (/feed/<kategorie>/<jahr>.ics).
+
+Jeder Feed wird einmal gerendert und dann aus dem Speicher ausgeliefert
+(mit ETag, auch gzip-komprimiert). Ist er aelter als das Refresh-Intervall,
+bekommt der Abrufer trotzdem sofort die vorhandene Version, und im
+Hintergrund startet genau ein Crawl, der den Feed erneuert -- beliebig viele
+Abonnenten kosten also hoechstens einen Crawl pro Intervall.
+
+Beim Erneuern wird mit der vorherigen Version abgeglichen (calendar_diff):
+unveraenderte Termine bleiben byte-gleich, sodass auch das ETag gleich
+bleibt, solange sich nichts geaendert hat. Die gerenderten Feeds liegen
+zusaetzlich als Datei im Feed-Verzeichnis und ueberstehen so einen Neustart.
+
+Schlaegt ein Crawl fehl (auch einer ohne Termine), bleibt die vorherige
+Version bestehen und der naechste Versuch startet fruehestens nach
+RETRY_AFTER Sekunden -- ist die Seite down, wird sie nicht bei jedem Abruf
+erneut gecrawlt.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+from calendar_diff import load_previous, diff_events
+from ics_writer import iter_calendar
+
+FEED_DIR = "feeds"
+DEFAULT_REFRESH_MINUTES = 360
+RETRY_AFTER = 60  # seconds; Retry-After of the 503 while a feed is built for the first time
+
+
+class Feed:
+    """One rendered feed."""
+
+    def __init__(self, body, built_at):
+        self.body = body
+        self.gzip_body = gzip.compress(body, 6)
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.built_at = built_at  # epoch seconds
+        self.events = body.count(b"BEGIN:VEVENT")
+
+
+class FeedCache:
+    """Feeds by (category, year). `build(category, year)` crawls and returns the event
+    dicts of a feed (without DTSTAMP/SEQUENCE, those come from the diff); `submit(fn)`
+    runs a refresh in the background (e.g. ThreadPoolExecutor.submit)."""
+
+    def __init__(self, directory, build, submit):
+        self.directory = Path(directory)
+        self.build = build
+        self.submit = submit
+        self._feeds = {}
+        self._refreshing = set()
+        self._errors = {}
+        self._failed_at = {}  # key -> epoch seconds of the last failed refresh
+        self._lock = threading.Lock()
+
+    def _path(self, category, year):
+        return self.directory / f"{category}_{year}.ics"
+
+    def get(self, category, year, max_age):
+        """The current feed, or None while it is built for the first time. Starts a
+        background refresh if the feed is missing or older than `max_age` seconds."""
+        key = (category, year)
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is None:
+                path = self._path(category, year)
+                if path.exists():
+                    feed = self._feeds[key] = Feed(path.read_bytes(), path.stat().st_mtime)
+            now = time.time()
+            stale = feed is None or now - feed.built_at >= max_age
+            # back off after a failed refresh instead of crawling again on every poll
+            backing_off = now - self._failed_at.get(key, 0) < min(max_age, RETRY_AFTER)
+            if stale and not backing_off and key not in self._refreshing:
+                self._refreshing.add(key)
+                self.submit(lambda: self._refresh_in_background(category, year))
+        return feed
+
+    def _refresh_in_background(self, category, year):
+        try:
+            self.refresh(category, year)
+        except Exception as e:
+            with self._lock:
+                self._errors[(category, year)] = f"{type(e).__name__}: {e}"
+                self._failed_at[(category, year)] = time.time()
+        finally:
+            with self._lock:
+                self._refreshing.discard((category, year))
+
+    def refresh(self, category, year):
+        """Crawl and re-render one feed now (blocking). Returns the diff statistics."""
+        events = self.build(category, year)
+        if not events:
+            # an empty result is far more likely a failed crawl than an empty calendar;
+            # never serve (or cache) it as a valid feed, with or without a previous version
+            raise RuntimeError("Crawl ohne Ergebnis, Feed wird nicht erneuert")
+        path = self._path(category, year)
+        previous = load_previous(path)
+        calendar, _, stats = diff_events(previous, events)
+        body = b"".join(iter_calendar(calendar))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        with self._lock:
+            self._feeds[(category, year)] = Feed(body, time.time())
+            self._errors.pop((category, year), None)
+            self._failed_at.pop((category, year), None)
+        return stats
+
+    def status(self):
+        """[{category, year, events, built_at, refreshing, error}] of all known feeds."""
+        with self._lock:
+            keys = set(self._feeds) | self._refreshing | set(self._errors)
+            return [
+                {
+                    "category": category,
+                    "year": year,
+                    "events": self._feeds[(category, year)].events if (category, year) in self._feeds else None,
+                    "built_at": self._feeds[(category, year)].built_at if (category, year) in self._feeds else None,
+                    "refreshing": (category, year) in self._refreshing,
+                    "error": self._errors.get((category, year)),
+                }
+                for category, year in sorted(keys)
+            ]
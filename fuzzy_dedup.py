@@ -0,0 +1,112 @@
+"""
+Unscharfe Duplikaterkennung fuer Titel-Schluessel (aus title_normalizer).
+
+Zwei Schluessel gelten als Duplikat, wenn die Jaccard-Aehnlichkeit ihrer
+Zeichen-3-Gramme mindestens `threshold` betraegt und sie dieselben Zahlen
+enthalten (damit "Staffel 3" / "Staffel 4" oder "Terminator 2" / "Terminator 3"
+getrennt bleiben). Vorher werden "Teil"/"Part", roemische Zahlen und
+Zahlwoerter vereinheitlicht, sodass "Teil 2" und "Part II" zusammenfallen;
+Leerzeichen zaehlen nicht ("Spider-Man" = "Spiderman").
+
+Kandidatenpaare kommen aus einem invertierten 3-Gramm-Index mit Praefix-
+Filter (seltene 3-Gramme zuerst): nur Schluessel, die eines der seltensten
+3-Gramme teilen, werden ueberhaupt verglichen. Das findet alle Paare ueber
+der Schwelle, ohne n^2 Vergleiche -- auch bei zehntausenden Eintraegen.
+"""
+
+import math
+from collections import defaultdict
+
+DEFAULT_THRESHOLD = 0.8
+_NGRAM = 3
+
+_CANONICAL_WORDS = {
+    "teil": "part", "kapitel": "chapter", "vol": "volume",
+    "one": "1", "eins": "1", "two": "2", "zwei": "2", "three": "3", "drei": "3",
+    # roman numerals ("i" is left alone: too often a word)
+    "ii": "2", "iii": "3", "iv": "4", "v": "5", "vi": "6", "vii": "7", "viii": "8", "ix": "9", "x": "10",
+}
+
+
+def _profile(key):
+    """(set of character n-grams, set of numbers) of a normalized title key."""
+    words = [_CANONICAL_WORDS.get(w, w) for w in key.split()]
+    # n-grams over the words without spaces, so "spider man" and "spiderman" match
+    text = f" {''.join(words)} "
+    grams = frozenset(text[i:i + _NGRAM] for i in range(len(text) - _NGRAM + 1))
+    return grams, frozenset(w for w in words if w.isdigit())
+
+
+def similarity(key_a, key_b):
+    """Jaccard similarity of two keys' n-gram sets; 0.0 if their numbers differ."""
+    grams_a, numbers_a = _profile(key_a)
+    grams_b, numbers_b = _profile(key_b)
+    if numbers_a != numbers_b or not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def duplicate_groups(keys, threshold=DEFAULT_THRESHOLD):
+    """
+    Group id for every key in `keys` (same order): the index of the first key of its
+    group. Keys in one group are duplicates of each other, directly or through a chain
+    of similar keys. Empty keys are never grouped. threshold >= 1 means exact matching.
+    """
+    first_index = {}
+    for i, key in enumerate(keys):
+        if key and key not in first_index:
+            first_index[key] = i
+    unique = list(first_index)
+
+    parent = {key: key for key in unique}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            # the key seen first stays the root, so group ids follow the input order
+            if first_index[ra] < first_index[rb]:
+                parent[rb] = ra
+            else:
+                parent[ra] = rb
+
+    if threshold < 1:
+        profiles = {key: _profile(key) for key in unique}
+        df = defaultdict(int)
+        for grams, _ in profiles.values():
+            for gram in grams:
+                df[gram] += 1
+        index = defaultdict(list)  # n-gram -> keys whose prefix contains it
+        # smaller sets first: every indexed key is at most as large as the probing one
+        for key in sorted(unique, key=lambda k: (len(profiles[k][0]), k)):
+            grams, numbers = profiles[key]
+            size = len(grams)
+            if not size:
+                continue
+            min_size = math.ceil(threshold * size)
+            # a pair with Jaccard >= threshold shares at least min_size n-grams, so it
+            # must share one of the first size - min_size + 1 rarest n-grams
+            ordered = sorted(grams, key=lambda g: (df[g], g))
+            prefix = ordered[:size - min_size + 1]
+            candidates = set()
+            for gram in prefix:
+                for other in index[gram]:
+                    if other not in candidates and len(profiles[other][0]) >= min_size \
+                            and profiles[other][1] == numbers:
+                        candidates.add(other)
+            for other in candidates:
+                other_grams = profiles[other][0]
+                common = len(grams & other_grams)
+                if common / (size + len(other_grams) - common) >= threshold:
+                    union(key, other)
+            # indexing a shorter prefix is enough, because later keys are at least as large
+            # (overlap >= 2t/(1+t) * size for any pair above the threshold)
+            for gram in ordered[:size - math.ceil(2 * threshold / (1 + threshold) * size) + 1]:
+                index[gram].append(key)
+
+    return [first_index[find(key)] if key else i for i, key in enumerate(keys)]
@@ -0,0 +1,171 @@
+"""
+Austauschbare HTML-Parser-Backends fuer Kalender- und Detailseiten.
+
+Alle Backends liefern dieselben Rohdaten, aus denen scraper.py Links, Titel,
+Datum, Jahr und Format ermittelt:
+
+    scan_detail(html) -> (heading_text or None, [breadcrumb_text, ...], page_text)
+    iter_hrefs(html)  -> href-Werte aller <a>-Elemente in Dokument-Reihenfolge
+
+Verfuegbar:
+    html.parser  BeautifulSoup + Python-Standardparser (immer vorhanden, Fallback)
+    lxml         BeautifulSoup + lxml (pip install lxml)
+    selectolax   selectolax/lexbor ohne BeautifulSoup-Baum (pip install selectolax)
+    auto         das schnellste installierte Backend
+"""
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+try:
+    import lxml  # noqa: F401
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAVE_SELECTOLAX = True
+except ImportError:
+    HAVE_SELECTOLAX = False
+
+DEFAULT_PARSER = "auto"
+PARSER_CHOICES = ("auto", "html.parser", "lxml", "selectolax")
+
+_BREADCRUMB_CLASSES = {"breadcrumb", "breadcrumbs"}
+# string types that BeautifulSoup's get_text() considers (no comments, scripts, styles, ...)
+_TEXT_TYPES = (NavigableString, CData)
+# elements whose text BeautifulSoup keeps out of get_text() (<template> content is not
+# part of the lexbor tree at all)
+_NON_CONTENT_TAGS = frozenset(("script", "style", "rt", "rp"))
+
+
+def _is_breadcrumb_class(class_value):
+    # same elements as soup.select(".breadcrumb, .breadcrumbs, ol.breadcrumb")
+    return bool(class_value) and not _BREADCRUMB_CLASSES.isdisjoint(class_value)
+
+
+class Bs4Backend:
+    """BeautifulSoup tree built by html.parser or lxml."""
+
+    def __init__(self, features="html.parser"):
+        self.name = features
+        self._features = features
+        # of duplicate attributes the first one counts, as in lxml, lexbor and browsers
+        # (html.parser would keep the last one)
+        self._options = {"on_duplicate_attribute": "ignore"} if features == "html.parser" else {}
+
+    def scan_detail(self, html):
+        """Single walk over the document: first h1/h2, breadcrumb elements and page text
+        (identical to soup.get_text(" ", strip=True))."""
+        soup = BeautifulSoup(html, self._features, **self._options)
+        heading = None
+        breadcrumbs = []
+        parts = []
+        for el in soup.descendants:
+            el_type = type(el)
+            if el_type in _TEXT_TYPES:
+                stripped = el.strip()
+                if stripped:
+                    parts.append(stripped)
+            elif el_type is Tag:
+                if heading is None and el.name in ("h1", "h2"):
+                    heading = el
+                if el.name == "nav" or _is_breadcrumb_class(el.get("class")):
+                    breadcrumbs.append(el)
+        title = heading.get_text(strip=True) if heading is not None else None
+        return title, [nav.get_text(" ", strip=True) for nav in breadcrumbs], " ".join(parts)
+
+    def iter_hrefs(self, html):
+        soup = BeautifulSoup(html, self._features, **self._options)
+        for a in soup.find_all("a"):
+            yield a.get("href", "")
+
+
+class SelectolaxBackend:
+    """lexbor-based engine; never builds a BeautifulSoup tree."""
+
+    name = "selectolax"
+
+    @staticmethod
+    def _walk(node):
+        """Elements and text nodes below `node` in document order, without the subtrees
+        whose text get_text() ignores (script, style, rt, rp) and without comments."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            tag = current.tag
+            if tag != "-text" and (tag in _NON_CONTENT_TAGS or tag[0] in "-!"):
+                continue
+            yield current
+            children = []
+            child = current.child
+            while child is not None:
+                children.append(child)
+                child = child.next
+            stack.extend(reversed(children))
+
+    def _strings(self, node):
+        for current in self._walk(node):
+            if current.tag == "-text":
+                stripped = current.text(deep=False).strip()
+                if stripped:
+                    yield stripped
+
+    def scan_detail(self, html):
+        root = LexborHTMLParser(html).root
+        if root is None:
+            return None, [], ""
+        heading = None
+        breadcrumbs = []
+        parts = []
+        for current in self._walk(root):
+            tag = current.tag
+            if tag == "-text":
+                stripped = current.text(deep=False).strip()
+                if stripped:
+                    parts.append(stripped)
+                continue
+            if heading is None and tag in ("h1", "h2"):
+                heading = current
+            if tag == "nav" or _is_breadcrumb_class((current.attributes.get("class") or "").split()):
+                breadcrumbs.append(current)
+        title = "".join(self._strings(heading)) if heading is not None else None
+        return title, [" ".join(self._strings(nav)) for nav in breadcrumbs], " ".join(parts)
+
+    def iter_hrefs(self, html):
+        for a in LexborHTMLParser(html).css("a"):
+            yield a.attributes.get("href") or ""
+
+
+def available_parsers():
+    names = ["html.parser"]
+    if HAVE_LXML:
+        names.append("lxml")
+    if HAVE_SELECTOLAX:
+        names.append("selectolax")
+    return names
+
+
+_backends = {}
+
+
+def get_backend(name=None):
+    """Resolve a parser name (or "auto") to a backend instance.
+    Raises ValueError for unknown or uninstalled backends."""
+    name = (name or DEFAULT_PARSER).strip().lower()
+    if name == "auto":
+        name = available_parsers()[-1]
+    if name not in _backends:
+        if name == "html.parser":
+            _backends[name] = Bs4Backend("html.parser")
+        elif name == "lxml":
+            if not HAVE_LXML:
+                raise ValueError("Parser 'lxml' ist nicht installiert (pip install lxml)")
+            _backends[name] = Bs4Backend("lxml")
+        elif name == "selectolax":
+            if not HAVE_SELECTOLAX:
+                raise ValueError("Parser 'selectolax' ist nicht installiert (pip install selectolax)")
+            _backends[name] = SelectolaxBackend()
+        else:
+            raise ValueError(f"Unbekannter Parser '{name}' (erlaubt: {', '.join(PARSER_CHOICES)})")
+    return _backends[name]
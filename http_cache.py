@@ -0,0 +1,134 @@
+"""
+Persistenter HTTP-Cache fuer scraper.fetch().
+
+Antworten werden pro URL in einer SQLite-Datei abgelegt, zusammen mit ETag und
+Last-Modified. Beim naechsten Lauf wird mit If-None-Match / If-Modified-Since
+revalidiert; ein 304 liefert den gespeicherten Body ohne erneuten Download.
+Eintraege, die laenger als die TTL nicht benutzt wurden, werden verworfen, und
+die Gesamtgroesse wird auf ein Limit begrenzt (least recently used zuerst).
+"""
+
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = "http_cache.sqlite"
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_MB = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class ResponseCache:
+    """URL-keyed response store with conditional revalidation, TTL and size cap.
+
+    `fresh_for` is the number of seconds a stored response is served without
+    contacting the server at all; after that it is revalidated (default: always).
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_days=DEFAULT_TTL_DAYS,
+                 max_mb=DEFAULT_MAX_MB, fresh_for=0):
+        self.path = str(path)
+        self.ttl = ttl_days * 24 * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.fresh_for = fresh_for
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # one connection shared by the fetch workers; several scraper processes
+        # may use the same file concurrently, hence WAL and a generous busy timeout
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self.evict()
+
+    def lookup(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?",
+                (url,)).fetchone()
+        if row is None:
+            return None
+        return {"body": row[0], "etag": row[1], "last_modified": row[2], "stored_at": row[3]}
+
+    def is_fresh(self, entry):
+        return self.fresh_for > 0 and time.time() - entry["stored_at"] < self.fresh_for
+
+    @staticmethod
+    def validators(entry):
+        """Conditional request headers for a stored entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record_hit(self, url):
+        self.hits += 1
+        self._touch(url, refreshed=False)
+
+    def record_not_modified(self, url):
+        self.revalidated += 1
+        self._touch(url, refreshed=True)
+
+    def _touch(self, url, refreshed):
+        now = time.time()
+        with self._lock:
+            if refreshed:
+                self._conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?",
+                                   (now, now, url))
+            else:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+
+    def store(self, url, body, etag=None, last_modified=None):
+        self.misses += 1
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, len(body.encode("utf-8")), now, now))
+            self._conn.commit()
+
+    def evict(self):
+        """Drop entries unused for longer than the TTL, then trim to the size cap (LRU)."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM responses WHERE accessed_at < ?",
+                                     (time.time() - self.ttl,))
+            removed = cur.rowcount
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT url, size FROM responses ORDER BY accessed_at ASC").fetchall()
+                doomed = []
+                for url, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((url,))
+                    total -= size
+                self._conn.executemany("DELETE FROM responses WHERE url = ?", doomed)
+                removed += len(doomed)
+            self._conn.commit()
+        return removed
+
+    def summary(self):
+        return f"{self.hits} frisch, {self.revalidated} revalidiert (304), {self.misses} geladen"
+
+    def close(self):
+        self.evict()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,187 @@
+"""
+Streamender ICS-Writer (RFC 5545) fuer grosse Kalender.
+
+Statt einen kompletten icalendar.Calendar im Speicher aufzubauen und am Ende
+mit to_ical() in einem Stueck zu serialisieren, wird jedes VEVENT sofort
+geschrieben (Datei) bzw. einzeln erzeugt (Generator fuer eine gestreamte
+HTTP-Antwort). Der Speicherbedarf haengt damit nicht mehr von der Anzahl der
+Termine ab, und das erste Byte ist sofort da.
+
+Escaping (\\ ; , Zeilenumbruch) und Zeilenfaltung nach 75 Oktetten (ohne
+UTF-8-Zeichen zu zerteilen) entsprechen der Ausgabe von icalendar.
+
+event_uid() leitet die UID aus der Quell-URL ab, sodass ein Film in jedem
+Lauf dieselbe UID bekommt; iter_events() liest einen so geschriebenen
+Kalender wieder ein (fuer den Abgleich in calendar_diff).
+"""
+
+import hashlib
+from datetime import date, datetime, timezone
+
+PRODID = "-//BlurayDisc Scraper//de//"
+
+_FOLD = 74  # octets of content per line; continuation lines add the leading space
+
+
+def escape_text(value):
+    """Escape a TEXT property value."""
+    return (str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold_line(line):
+    """One content line as CRLF-terminated bytes, folded so no line exceeds 75 octets."""
+    data = line.encode("utf-8")
+    if len(data) <= _FOLD:
+        return data + b"\r\n"
+    parts = []
+    start = 0
+    while len(data) - start > _FOLD:
+        end = start + _FOLD
+        # step back to the start of a UTF-8 character (continuation bytes are 10xxxxxx)
+        while data[end] & 0xC0 == 0x80:
+            end -= 1
+        # keep escape sequences (backslash or ^ plus the next character) on one line,
+        # some clients need that
+        if data[end - 1] in b"\\^" and end - 1 > start + 1:
+            end -= 1
+        parts.append(data[start:end])
+        start = end
+    parts.append(data[start:])
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def unescape_text(value):
+    """Inverse of escape_text()."""
+    out = []
+    chars = iter(value)
+    for ch in chars:
+        if ch == "\\":
+            ch = next(chars, "")
+            ch = "\n" if ch in "nN" else ch
+        out.append(ch)
+    return "".join(out)
+
+
+def event_uid(url):
+    """Stable UID of the event for a detail page URL (same URL, same UID in every run)."""
+    return f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}@bluray-disc.de"
+
+
+def _format_stamp(value):
+    """DATE-TIME in UTC; naive datetimes are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _parse_stamp(value):
+    return datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+
+
+def format_event(summary, uid, dtstamp=None, dtstart=None, description=None,
+                 sequence=None, last_modified=None, status=None):
+    """One VEVENT as bytes. `dtstart` is a date (all-day event) or None (no DTSTART).
+    `sequence`, `last_modified` and `status` (e.g. "CANCELLED") are only written if set."""
+    lines = ["BEGIN:VEVENT", f"SUMMARY:{escape_text(summary)}"]
+    if dtstart is not None:
+        lines.append(f"DTSTART;VALUE=DATE:{dtstart.strftime('%Y%m%d')}")
+    lines.append(f"DTSTAMP:{_format_stamp(dtstamp or datetime.now(timezone.utc))}")
+    lines.append(f"UID:{escape_text(uid)}")
+    if description is not None:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    if sequence is not None:
+        lines.append(f"SEQUENCE:{int(sequence)}")
+    if last_modified is not None:
+        lines.append(f"LAST-MODIFIED:{_format_stamp(last_modified)}")
+    if status is not None:
+        lines.append(f"STATUS:{status}")
+    lines.append("END:VEVENT")
+    return b"".join(fold_line(line) for line in lines)
+
+
+def calendar_header(prodid=PRODID):
+    return fold_line("BEGIN:VCALENDAR") + fold_line("VERSION:2.0") + fold_line(f"PRODID:{escape_text(prodid)}")
+
+
+def calendar_footer():
+    return fold_line("END:VCALENDAR")
+
+
+def iter_calendar(events, prodid=PRODID):
+    """Yield a complete calendar in chunks: header, one chunk per event, footer.
+    `events` is an iterable of dicts with the keyword arguments of format_event()."""
+    yield calendar_header(prodid)
+    for event in events:
+        yield format_event(**event)
+    yield calendar_footer()
+
+
+def _unfolded(fp):
+    """Content lines of a binary file object, with folded lines joined again."""
+    line = None
+    for raw in fp:
+        raw = raw.rstrip(b"\r\n")
+        if raw[:1] in (b" ", b"\t") and line is not None:
+            line += raw[1:]
+            continue
+        if line is not None:
+            yield line.decode("utf-8")
+        line = raw
+    if line is not None:
+        yield line.decode("utf-8")
+
+
+def iter_events(fp):
+    """Read the VEVENTs of a calendar written by this module from a binary file object.
+    Yields dicts with the keyword arguments of format_event(); other properties are skipped."""
+    event = None
+    for line in _unfolded(fp):
+        name, _, value = line.partition(":")
+        name = name.split(";", 1)[0].upper()
+        if name == "BEGIN" and value == "VEVENT":
+            event = {"summary": "", "uid": ""}
+        elif event is None:
+            continue
+        elif name == "END" and value == "VEVENT":
+            yield event
+            event = None
+        elif name in ("SUMMARY", "UID", "DESCRIPTION", "STATUS"):
+            event[name.lower()] = unescape_text(value)
+        elif name == "DTSTART":
+            event["dtstart"] = date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        elif name == "DTSTAMP":
+            event["dtstamp"] = _parse_stamp(value)
+        elif name == "LAST-MODIFIED":
+            event["last_modified"] = _parse_stamp(value)
+        elif name == "SEQUENCE":
+            event["sequence"] = int(value)
+
+
+class IcsWriter:
+    """Writes a calendar event by event to a binary file object.
+
+        with IcsWriter(f) as cal:
+            cal.add_event("Titel", uid, dtstart=date(2026, 3, 1))
+    """
+
+    def __init__(self, fp, prodid=PRODID):
+        self.fp = fp
+        self.count = 0
+        fp.write(calendar_header(prodid))
+
+    def add_event(self, summary, uid, dtstamp=None, dtstart=None, description=None,
+                  sequence=None, last_modified=None, status=None):
+        self.fp.write(format_event(summary, uid, dtstamp, dtstart, description,
+                                   sequence, last_modified, status))
+        self.count += 1
+
+    def close(self):
+        self.fp.write(calendar_footer())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
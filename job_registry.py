@@ -0,0 +1,221 @@
+"""
+Begrenzte Job-Verwaltung der Web-UI mit Speicher-Budget.
+
+Jobs werden nicht mehr fuer die ganze Laufzeit des Prozesses gehalten:
+fertige Jobs verfallen nach einer TTL (gemessen ab dem letzten Zugriff),
+und ueber der Hoechstzahl werden die am laengsten unbenutzten verdraengt.
+Laufende Jobs werden nie entfernt. Ein Verweis-Job (create(..., source=...),
+z.B. ein aus dem Ergebnis-Cache beantworteter Start) zeigt nur auf die
+Eintraege eines anderen Jobs: Verweise zaehlen nicht zur Hoechstzahl (sie
+haben ein eigenes Limit in derselben Hoehe), und solange es einen Verweis
+gibt, wird der Job, auf den er zeigt, nicht verdraengt.
+
+Die Vorschau-Eintraege eines fertigen Jobs werden sofort als gzip-JSON in
+das Spill-Verzeichnis geschrieben. Im Speicher bleiben nur die zuletzt
+benutzten, solange ihre Groesse (JSON-Bytes) zusammen unter dem Budget
+liegt; wird ein verdraengter Eintrag wieder gebraucht, kommt er von der
+Platte. stats() zeigt Jobs, Speicherbedarf, Spills und Verdraengungen.
+
+Jeder Prozess schreibt in ein eigenes Unterverzeichnis, das er bei jeder
+Benutzung auffrischt. Mehrere Web-UI-Prozesse koennen sich so dasselbe
+Verzeichnis teilen: beim Start werden nur Unterverzeichnisse entfernt, die
+laenger als die TTL nicht benutzt wurden (z.B. von beendeten Prozessen).
+"""
+
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+JOB_DIR = "jobs"
+DEFAULT_MAX_JOBS = 50
+DEFAULT_TTL_HOURS = 6
+DEFAULT_MEMORY_MB = 64
+_TOUCH_INTERVAL = 60  # seconds between two refreshes of the spill directory's mtime
+
+
+class JobRegistry:
+    """job_id -> job dict (fields chosen by the caller, e.g. "events" and "status").
+    Thread-safe; the job dicts themselves are shared with the caller."""
+
+    def __init__(self, spill_dir, max_jobs=DEFAULT_MAX_JOBS, ttl_hours=DEFAULT_TTL_HOURS,
+                 memory_mb=DEFAULT_MEMORY_MB):
+        root = Path(spill_dir)
+        self.spill_dir = root / uuid.uuid4().hex[:8]  # this process only
+        self.max_jobs = max_jobs
+        self.ttl = ttl_hours * 3600
+        self.budget = int(memory_mb * 1024 * 1024)
+        self._jobs = OrderedDict()      # LRU order: least recently used first
+        self._resident = OrderedDict()  # job_id -> items kept in memory, LRU order
+        self._resident_bytes = 0
+        self.evicted_ttl = 0
+        self.evicted_lru = 0
+        self.spilled = 0                # items dropped from memory (they stay on disk)
+        self.loaded = 0                 # items read back from disk
+        self._touched = 0.0
+        self._lock = threading.Lock()
+        # Spill directories of other processes: a running one refreshes its directory on
+        # every access, so one unused for longer than the TTL only holds expired jobs.
+        # Loose files are spills of an older version of the registry.
+        if root.is_dir():
+            now = time.time()
+            for path in root.iterdir():
+                try:
+                    if now - path.stat().st_mtime <= self.ttl:
+                        continue
+                except FileNotFoundError:
+                    continue
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink(missing_ok=True)
+
+    def create(self, job_id, source=None, **fields):
+        """Register a running job and return its dict. With `source`, the job is a reference
+        to the items of that job, which is kept as long as the reference exists."""
+        now = time.time()
+        job = {**fields, "source": source, "created": now, "accessed": now, "finished": None,
+               "item_count": 0, "items_bytes": 0}
+        with self._lock:
+            self._jobs[job_id] = job
+            self._touch(now)
+            self._evict(now)
+        return job
+
+    def get(self, job_id):
+        """The job dict, or None if it is unknown or was evicted."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["accessed"] = time.time()
+                self._jobs.move_to_end(job_id)
+                self._touch(job["accessed"])
+            return job
+
+    def finish(self, job_id, items=None, status="preview"):
+        """Mark a job finished; its `items` (list of dicts, may be None) are written to
+        disk and kept in memory as far as the budget allows."""
+        data = json.dumps(items, ensure_ascii=False).encode("utf-8") if items is not None else None
+        if data is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            self._path(job_id).write_bytes(gzip.compress(data, 1))
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            now = time.time()
+            job["status"] = status
+            job["finished"] = job["accessed"] = now
+            self._touch(now)
+            if data is not None:
+                job["item_count"] = len(items)
+                job["items_bytes"] = len(data)
+                self._keep(job_id, items, len(data))
+            self._evict(now)
+
+    def items(self, job_id):
+        """Preview items of a finished job (from memory or disk), or None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job["items_bytes"]:
+                return None
+            job["accessed"] = time.time()
+            self._jobs.move_to_end(job_id)
+            self._touch(job["accessed"])
+            items = self._resident.get(job_id)
+            if items is not None:
+                self._resident.move_to_end(job_id)
+                return items
+        try:
+            items = json.loads(gzip.decompress(self._path(job_id).read_bytes()))
+        except FileNotFoundError:
+            return None  # evicted meanwhile
+        with self._lock:
+            if job_id in self._jobs and job_id not in self._resident:
+                self.loaded += 1
+                self._keep(job_id, items, self._jobs[job_id]["items_bytes"])
+                self._evict(time.time())
+        return items
+
+    def _touch(self, now):
+        """Refresh the mtime of the spill directory (see __init__), at most once a minute."""
+        if now - self._touched < _TOUCH_INTERVAL:
+            return
+        try:
+            os.utime(self.spill_dir)
+        except FileNotFoundError:
+            return  # nothing spilled yet
+        self._touched = now
+
+    def _path(self, job_id):
+        return self.spill_dir / f"{job_id}.json.gz"
+
+    def _keep(self, job_id, items, size):
+        self._resident[job_id] = items
+        self._resident_bytes += size
+
+    def _drop_resident(self, job_id):
+        if self._resident.pop(job_id, None) is not None:
+            self._resident_bytes -= self._jobs[job_id]["items_bytes"]
+
+    def _remove(self, job_id):
+        self._drop_resident(job_id)
+        del self._jobs[job_id]
+        self._path(job_id).unlink(missing_ok=True)
+
+    def _evict(self, now):
+        # references first, so the jobs they pin are released in the same pass
+        for references in (True, False):
+            pinned = {job["source"] for job in self._jobs.values() if job["source"] is not None}
+            for job_id, job in list(self._jobs.items()):
+                if ((job["source"] is not None) == references and job["finished"] is not None
+                        and job_id not in pinned and now - job["accessed"] > self.ttl):
+                    self._remove(job_id)
+                    self.evicted_ttl += 1
+            # references and other jobs each have their own limit of max_jobs
+            jobs = [job_id for job_id, job in self._jobs.items() if (job["source"] is not None) == references]
+            finished = [job_id for job_id in jobs if self._jobs[job_id]["finished"] is not None
+                        and job_id not in pinned]
+            excess = len(jobs) - self.max_jobs
+            while excess > 0 and finished:
+                self._remove(finished.pop(0))
+                self.evicted_lru += 1
+                excess -= 1
+        # the most recently used items always stay, even if they alone exceed the budget
+        while self._resident_bytes > self.budget and len(self._resident) > 1:
+            job_id = next(iter(self._resident))
+            self._drop_resident(job_id)
+            self.spilled += 1
+
+    def stats(self):
+        with self._lock:
+            now = time.time()
+            return {
+                "jobs": [
+                    {
+                        "id": job_id,
+                        "status": job.get("status"),
+                        "age": round(now - job["created"]),
+                        "idle": round(now - job["accessed"]),
+                        "items": job["item_count"],
+                        "items_bytes": job["items_bytes"],
+                        "resident": job_id in self._resident,
+                        "source": job["source"],
+                    }
+                    for job_id, job in self._jobs.items()
+                ],
+                "running": sum(1 for job in self._jobs.values() if job["finished"] is None),
+                "resident_bytes": self._resident_bytes,
+                "memory_budget": self.budget,
+                "max_jobs": self.max_jobs,
+                "ttl_hours": self.ttl / 3600,
+                "evicted_ttl": self.evicted_ttl,
+                "evicted_lru": self.evicted_lru,
+                "spilled": self.spilled,
+                "loaded": self.loaded,
+            }
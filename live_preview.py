@@ -0,0 +1,70 @@
+"""
+Live-Vorschau der Web-UI: Eintraege erscheinen schon waehrend des Crawls.
+
+Statt am Ende eine einzige grosse "preview"-Nachricht mit allen Eintraegen zu
+schicken, wird jeder Kandidat, den der Scraper meldet (eine Detailseite, die
+die Filter einer Kategorie besteht), sofort als Delta ins Ereignisprotokoll
+des Jobs gestellt ({"type": "items", "add": [...]}). Ist ein Teil-Job fertig,
+gleicht ein Delta seine Kandidaten mit dem deduplizierten Ergebnis ab
+("remove" fuer aussortierte, "add" fuer noch nicht gezeigte Eintraege). Zum
+Schluss legt ein letztes Delta die endgueltige Liste fest: Reihenfolge,
+Duplikate zwischen den Teil-Jobs und Duplikat-Gruppen ("order", "groups").
+
+Jeder Eintrag bekommt dafuer eine im Job eindeutige "id".
+"""
+
+import itertools
+import threading
+
+
+class LivePreview:
+    """Puts the "items" deltas of one web job into `put` (EventLog.put). Thread-safe,
+    all sub-jobs of the job share one instance."""
+
+    def __init__(self, put):
+        self.put = put
+        self.deltas = 0              # number of deltas put so far
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, item):
+        """Give a candidate its id and show it."""
+        with self._lock:
+            item["id"] = next(self._ids)
+            # put under the lock, so every reader sees the deltas in the same order
+            self._put({"type": "items", "add": [item]})
+
+    def settle(self, shown, items):
+        """Replace the candidates of a finished sub-job (`shown`: (url, category) -> item
+        passed to add()) by its final `items`. Items that were shown keep their id, the
+        other candidates are removed, items never shown are added. Returns `items`, each
+        with its id."""
+        with self._lock:
+            shown = dict(shown)
+            added = []
+            for item in items:
+                old = shown.pop((item["url"], item["category"]), None)
+                if old is not None:
+                    item["id"] = old["id"]
+                else:
+                    item["id"] = next(self._ids)
+                    added.append(item)
+            delta = {"type": "items"}
+            if shown:
+                delta["remove"] = [item["id"] for item in shown.values()]
+            if added:
+                delta["add"] = added
+            if len(delta) > 1:
+                self._put(delta)
+            return items
+
+    def finish(self, items):
+        """Final order and duplicate groups of `items` (the final preview list); shown
+        items that are not in it are removed."""
+        with self._lock:
+            self._put({"type": "items", "order": [item["id"] for item in items],
+                       "groups": [item.get("dup_group") for item in items]})
+
+    def _put(self, delta):
+        self.deltas += 1
+        self.put(delta)
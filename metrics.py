@@ -0,0 +1,144 @@
+"""
+Metriken des Scrapers: Zaehler und Histogramme fuer die einzelnen Stufen.
+
+Bisher liess sich nur aus den Log-Zeilen erahnen, wo ein Crawl seine Zeit
+verbringt. scrape() zaehlt deshalb in ein Metrics-Objekt mit:
+
+- Antwortzeit der Fetches je URL-Klasse (Kalender- bzw. Detailseiten),
+  heruntergeladene Bytes, Wiederholungen (Retries) und Fehler
+- Parse-Zeit der Detailseiten
+- vom Filter abgelehnte Seiten je Kategorie und Grund
+- Entscheidungen der Deduplizierung (neu, ersetzt, behalten)
+- Treffer des HTTP-Caches (frisch, revalidiert, geladen)
+
+render() liefert alles im Prometheus-Textformat (Endpoint /metrics der
+Web-UI, dort ueber alle Laeufe des Prozesses summiert), summary() eine
+kompakte JSON-Zusammenfassung (Ausgabe am Ende eines CLI-Laufs).
+"""
+
+import threading
+
+PREFIX = "scraper_"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PARSE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# name -> (type, help text, histogram buckets)
+METRICS = {
+    "fetch_seconds": ("histogram", "Antwortzeit bis zu den Headern je URL-Klasse (inkl. Retries)", LATENCY_BUCKETS),
+    "downloaded_bytes": ("counter", "Heruntergeladene Bytes (uebertragen, vor dem Entpacken)", None),
+    "retries": ("counter", "Wiederholte Anfragen (429/5xx, Verbindungsfehler)", None),
+    "errors": ("counter", "Seiten, die nicht geladen oder geparst werden konnten", None),
+    "cache_requests": ("counter", "Anfragen ueber den HTTP-Cache nach Ergebnis", None),
+    "parse_seconds": ("histogram", "Parse-Zeit einer Detailseite", PARSE_BUCKETS),
+    "rejections": ("counter", "Vom Filter abgelehnte Detailseiten je Kategorie und Grund", None),
+    "dedup_decisions": ("counter", "Entscheidungen der Deduplizierung", None),
+}
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+
+class Metrics:
+    """Thread-safe counters and histograms of METRICS, each with free-form labels.
+    scrape() takes one (several runs may share it); without, each run counts into its own."""
+
+    def __init__(self):
+        self._values = {}  # (name, sorted label items) -> number or _Histogram
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._values.get(key)
+            if hist is None:
+                hist = self._values[key] = _Histogram(METRICS[name][2])
+            hist.observe(value)
+
+    def _snapshot(self):
+        """name -> [(labels, value)]; histograms as (counts, count, sum, max)."""
+        with self._lock:
+            series = {}
+            for (name, labels), value in sorted(self._values.items()):
+                if isinstance(value, _Histogram):
+                    value = (list(value.counts), value.count, value.sum, value.max)
+                series.setdefault(name, []).append((labels, value))
+            return series
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        series = self._snapshot()
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            full = PREFIX + name + ("_total" if kind == "counter" else "")
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            for labels, value in series.get(name, ()):
+                if kind == "counter":
+                    lines.append(f"{full}{_labels(labels)} {_number(value)}")
+                    continue
+                counts, count, total, _ = value
+                cumulative = 0
+                for bound, n in zip(buckets + (float("inf"),), counts + [count - sum(counts)]):
+                    cumulative += n
+                    lines.append(f"{full}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{full}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{full}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Compact dict of all metrics: counters by their label values ("kind=detail"),
+        histograms as count/sum/avg/max, plus the cache hit rate."""
+        out = {}
+        cache = {}
+        for name, entries in self._snapshot().items():
+            values = {}
+            for labels, value in entries:
+                key = ",".join(f"{k}={v}" for k, v in labels) or "all"
+                if name == "cache_requests":
+                    result = dict(labels).get("result")
+                    cache[result] = cache.get(result, 0) + value
+                if isinstance(value, tuple):
+                    _, count, total, peak = value
+                    value = {"count": count, "sum": round(total, 3),
+                             "avg": round(total / count, 4) if count else None, "max": round(peak, 3)}
+                values[key] = value
+            out[name] = values
+        if cache:
+            out["cache_hit_rate"] = round((cache.get("fresh", 0) + cache.get("revalidated", 0)) / sum(cache.values()), 3)
+        return out
@@ -0,0 +1,168 @@
+"""
+Bausteine fuer die Crawl-Pipeline von scraper.scrape().
+
+Die Stufen (Kalenderseiten -> Detail-Fetch -> Parsen) laufen in eigenen
+Worker-Threads und sind ueber begrenzte Queues verbunden. Ist eine Queue voll,
+blockiert die vorgelagerte Stufe (Backpressure); es liegen also nie mehr Links
+bzw. HTML-Seiten im Speicher, als die Queues fassen.
+
+Pro Stufe wird gemessen, wie lange sie gearbeitet hat, wie lange sie auf
+Eingaben gewartet hat und wie lange sie auf Platz in der nachfolgenden Queue
+warten musste -- daran sieht man, wo die Pipeline stockt.
+"""
+
+import queue
+import threading
+import time
+
+_POLL = 0.1  # seconds; how often blocked workers check whether the pipeline was stopped
+_DONE = object()  # end-of-input marker, one per worker of the consuming stage
+
+
+class PipelineStopped(Exception):
+    """Raised in a worker when the pipeline is torn down while it waits on a queue."""
+
+
+class StageStats:
+    """Timing of one pipeline stage, summed over its workers."""
+
+    def __init__(self, name, unit):
+        self.name = name
+        self.unit = unit
+        self.workers = 0
+        self.items = 0
+        self.busy = 0.0      # working (including network time)
+        self.starved = 0.0   # waiting for input from the previous stage
+        self.blocked = 0.0   # waiting for room in the next stage's queue
+        self.peak_queue = 0  # highest fill level of the output queue
+        self.queue_size = 0
+        self._lock = threading.Lock()
+
+    def add(self, items=0, busy=0.0, starved=0.0, blocked=0.0):
+        with self._lock:
+            self.items += items
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+
+    def as_dict(self):
+        return {
+            "workers": self.workers, "items": self.items, "busy": round(self.busy, 3),
+            "starved": round(self.starved, 3), "blocked": round(self.blocked, 3),
+            "peak_queue": self.peak_queue, "queue_size": self.queue_size,
+        }
+
+    def summary(self):
+        text = (f"{self.name}: {self.items} {self.unit} mit {self.workers} Worker(n), "
+                f"{self.busy:.1f}s Arbeit, {self.starved:.1f}s ohne Eingabe, {self.blocked:.1f}s blockiert")
+        if self.queue_size:
+            text += f" (Queue max {self.peak_queue}/{self.queue_size})"
+        return text
+
+
+class Pipeline:
+    """Runs stages of worker threads connected by bounded queues.
+
+    A stage consumes items from its input queue and calls `handler(item)`, a
+    generator whose yielded values are put into the stage's output queue. When
+    all workers of a stage are finished, the next stage receives end markers.
+    `stop()` makes every worker leave at its next queue operation.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._stop = threading.Event()
+        self._threads = []
+
+    def queue(self, maxsize=0):
+        return queue.Queue(maxsize)
+
+    def put(self, q, item, stats=None):
+        t0 = time.monotonic()
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                q.put(item, timeout=_POLL)
+                break
+            except queue.Full:
+                pass
+        if stats is not None:
+            stats.add(blocked=time.monotonic() - t0)
+            stats.peak_queue = max(stats.peak_queue, q.qsize())
+
+    def get(self, q, stats=None):
+        t0 = time.monotonic()
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                item = q.get(timeout=_POLL)
+                break
+            except queue.Empty:
+                pass
+        if stats is not None:
+            stats.add(starved=time.monotonic() - t0)
+        return item
+
+    def feed(self, q, items, workers):
+        """Fill an (unbounded) input queue up front and close it for `workers` consumers."""
+        for item in items:
+            q.put(item)
+        for _ in range(workers):
+            q.put(_DONE)
+
+    def stage(self, name, unit, handler, inq, workers, outq=None, next_workers=0, on_error=None, on_done=None):
+        """Start `workers` threads for a stage. `on_error(item, exc)` is called for
+        exceptions escaping the handler; `on_done()` after the last worker finished."""
+        stats = self.stats[name] = StageStats(name, unit)
+        stats.workers = workers
+        stats.queue_size = outq.maxsize if outq is not None else 0
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def run():
+            try:
+                while True:
+                    item = self.get(inq, stats)
+                    if item is _DONE:
+                        break
+                    t0 = time.monotonic()
+                    blocked = 0.0
+                    try:
+                        for out in handler(item):
+                            t_put = time.monotonic()
+                            self.put(outq, out, stats)
+                            blocked += time.monotonic() - t_put
+                    except PipelineStopped:
+                        raise
+                    except Exception as e:
+                        if on_error is None:
+                            raise
+                        on_error(item, e)
+                    stats.add(items=1, busy=time.monotonic() - t0 - blocked)
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    for _ in range(next_workers):
+                        self.put(outq, _DONE)
+                    if on_done is not None:
+                        on_done()
+            except PipelineStopped:
+                pass
+
+        for i in range(workers):
+            t = threading.Thread(target=run, name=f"{name}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return stats
+
+    def stop(self):
+        """Tear down: wake all workers and wait for them (a running request finishes first)."""
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+
+    def summary(self):
+        return " | ".join(st.summary() for st in self.stats.values())
@@ -0,0 +1,93 @@
+"""
+Serverseitige Abfrage der Vorschau-Eintraege eines Jobs (/jobs/<id>/items).
+
+Der Browser haelt nicht mehr die ganze Liste: er holt nur die Zeilen, die
+gerade sichtbar sind, gefiltert (Textsuche im Titel) und sortiert. Die
+sortierte Reihenfolge einer Abfrage wird zwischengespeichert, damit das
+Blaettern nicht jedes Mal neu sortiert. Auch die Duplikat-Markierung und die
+Auswahl fuer die ICS-Erstellung laufen ueber die Eintrags-IDs.
+"""
+
+import threading
+from collections import OrderedDict
+
+# Cross-category dedup keeps the best version per normalized title (lower number = better)
+CATEGORY_PRIORITY = {"4K UHD": 0, "Blu-ray Filme": 1, "3D Blu-ray": 2, "Serien": 3, "Importe": 4}
+SORT_FIELDS = ("title", "release_date", "production_year", "category")
+MAX_VIEWS = 16
+
+
+def _sort_value(item, field):
+    value = item.get(field)
+    return value.casefold() if isinstance(value, str) else value
+
+
+def filter_and_sort(items, query="", sort=""):
+    """Indexes into `items` of the entries whose title contains `query` (case-insensitive),
+    ordered by `sort`: a field of SORT_FIELDS, "-" in front for descending, "" for the
+    list order. Entries without a value come last either way."""
+    needle = query.strip().casefold()
+    indexes = [i for i, item in enumerate(items) if needle in (item.get("title") or "").casefold()]
+    field = sort.lstrip("-")
+    if not field:
+        return indexes
+    present = [i for i in indexes if items[i].get(field) is not None]
+    missing = [i for i in indexes if items[i].get(field) is None]
+    present.sort(key=lambda i: _sort_value(items[i], field), reverse=sort.startswith("-"))
+    return present + missing
+
+
+def duplicate_ids(items):
+    """Ids of all entries that are duplicates of a better one: per duplicate group
+    (dup_group, else the dedup_key) the entry with the best category, then the earliest
+    release date, is kept."""
+    groups = {}
+    for i, item in enumerate(items):
+        key = item["dup_group"] if item.get("dup_group") is not None else item.get("dedup_key")
+        groups.setdefault(key, []).append(i)
+    duplicates = []
+    for indexes in groups.values():
+        if len(indexes) < 2:
+            continue
+        best = min(indexes, key=lambda i: (CATEGORY_PRIORITY.get(items[i].get("category"), 99),
+                                           items[i].get("release_date") or "9999", i))
+        duplicates.extend(items[i]["id"] for i in indexes if i != best)
+    return sorted(duplicates)
+
+
+def select(items, ids=None, exclude=None):
+    """The entries whose id is in `ids`, or (ids None) all but those in `exclude`; in list order."""
+    if ids is not None:
+        wanted = set(ids)
+        return [item for item in items if item.get("id") in wanted]
+    excluded = set(exclude or ())
+    return [item for item in items if item.get("id") not in excluded]
+
+
+class PreviewViews:
+    """Cache of filtered and sorted orders, by (job_id, query, sort). The items of a
+    finished job never change, so entries stay valid until they are pushed out."""
+
+    def __init__(self, max_views=MAX_VIEWS):
+        self.max_views = max_views
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key, compute):
+        with self._lock:
+            if key in self._views:
+                self._views.move_to_end(key)
+                return self._views[key]
+        value = compute()
+        with self._lock:
+            self._views[key] = value
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        return value
+
+    def view(self, job_id, items, query="", sort=""):
+        return self._cached((job_id, query.strip().casefold(), sort),
+                            lambda: filter_and_sort(items, query, sort))
+
+    def duplicates(self, job_id, items):
+        return self._cached((job_id, None, "duplicates"), lambda: duplicate_ids(items))
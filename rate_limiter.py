@@ -0,0 +1,207 @@
+"""
+Adaptiver Rate-Limiter fuer alle Requests des Scrapers.
+
+Pro Host ein Token-Bucket, dessen Rate sich nach der Antwort des Servers
+richtet (AIMD): solange die Antwortzeiten niedrig bleiben, steigt die Rate
+langsam bis zur Obergrenze; bei 429/5xx, Verbindungsfehlern oder deutlich
+steigender Latenz wird sie halbiert bzw. gedrosselt. Ein Retry-After-Header
+sperrt den Host fuer alle Worker bis zum angegebenen Zeitpunkt.
+
+ThrottleRetry meldet zusaetzlich jeden Wiederholungsversuch von urllib3 an
+den Limiter, damit auch intern wiederholte Requests die Rate beeinflussen.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from urllib3.util.retry import Retry
+
+DEFAULT_MAX_RATE = 8.0    # requests per second per host (upper bound)
+DEFAULT_START_RATE = 4.0
+DEFAULT_MIN_RATE = 0.5
+DEFAULT_BURST = 1
+_RATE_FLOOR = 0.01         # req/s; the rate never drops below this (it is divided by)
+
+# additive increase: about +INCREASE req/s per second of healthy traffic
+_INCREASE = 0.5
+_ERROR_DECREASE = 0.5      # factor on 429/5xx/connection errors
+_LATENCY_DECREASE = 0.8    # factor when the response time rises
+_LATENCY_FACTOR = 2.0      # "rising" = smoothed latency above this multiple of the baseline ...
+_LATENCY_MARGIN = 0.05     # ... and at least this many seconds above it
+_LATENCY_ALPHA = 0.2       # EWMA weight of a new latency sample
+_BASELINE_DRIFT = 1.01     # baseline creeps up 1% per sample so it follows a slower server
+_COOLDOWN = 1.0            # seconds between two decreases (in-flight requests fail together)
+
+
+def retry_after_seconds(value):
+    """Seconds until a Retry-After header value (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class _HostState:
+    __slots__ = ("rate", "tat", "blocked_until", "waiting", "waited", "latency", "baseline",
+                 "last_decrease", "requests", "backoffs")
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tat = 0.0            # theoretical arrival time of the next request (GCRA)
+        self.blocked_until = 0.0  # Retry-After
+        self.waiting = 0
+        self.waited = 0.0         # total seconds requests spent waiting for a slot
+        self.latency = None
+        self.baseline = None
+        self.last_decrease = 0.0
+        self.requests = 0
+        self.backoffs = 0
+
+
+class AdaptiveThrottle:
+    """Per-host token bucket (capacity `burst`) whose rate adapts between `min_rate`
+    and `max_rate`, starting at `start_rate`. `max_rate` 0 disables the rate limit;
+    Retry-After is honoured in any case. Thread-safe; one instance may be shared by
+    any number of workers and scraper runs."""
+
+    def __init__(self, max_rate=DEFAULT_MAX_RATE, start_rate=DEFAULT_START_RATE,
+                 min_rate=DEFAULT_MIN_RATE, burst=DEFAULT_BURST):
+        self.max_rate = max_rate if max_rate and max_rate > 0 else 0.0
+        min_rate = max(min_rate or 0.0, _RATE_FLOOR)
+        if self.max_rate:
+            min_rate = min(min_rate, self.max_rate)
+            start_rate = min(max(start_rate, min_rate), self.max_rate)
+        self.min_rate = min_rate
+        self.start_rate = start_rate
+        self.burst = max(1, int(burst))
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url):
+        return urlsplit(url).hostname or url
+
+    def _state(self, host):
+        st = self._hosts.get(host)
+        if st is None:
+            st = self._hosts[host] = _HostState(self.start_rate)
+        return st
+
+    def wait(self, url):
+        """Block until the host of `url` may receive the next request."""
+        host = self._host(url)
+        with self._lock:
+            st = self._state(host)
+            now = time.monotonic()
+            start = max(now, st.blocked_until)
+            if self.max_rate:
+                interval = 1.0 / st.rate
+                tat = max(st.tat, now)
+                start = max(start, tat - (self.burst - 1) * interval)
+                st.tat = max(tat, start) + interval
+            st.waiting += 1
+        delay = start - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            st.waiting -= 1
+            st.requests += 1
+            st.waited += max(0.0, delay)
+
+    def record(self, url, status=None, latency=None, retry_after=None, error=False):
+        """Feed back the outcome of one request attempt: HTTP status, response time in
+        seconds, Retry-After in seconds, or `error` for connection errors/timeouts."""
+        host = self._host(url)
+        with self._lock:
+            st = self._state(host)
+            now = time.monotonic()
+            if retry_after:
+                st.blocked_until = max(st.blocked_until, now + retry_after)
+            if error or status == 429 or (status is not None and status >= 500):
+                self._decrease(st, now, _ERROR_DECREASE)
+                return
+            if latency is None:
+                return
+            st.latency = latency if st.latency is None else (
+                (1 - _LATENCY_ALPHA) * st.latency + _LATENCY_ALPHA * latency)
+            st.baseline = st.latency if st.baseline is None else min(st.baseline * _BASELINE_DRIFT, st.latency)
+            if st.latency > _LATENCY_FACTOR * st.baseline and st.latency - st.baseline > _LATENCY_MARGIN:
+                self._decrease(st, now, _LATENCY_DECREASE)
+            elif self.max_rate:
+                st.rate = min(self.max_rate, st.rate + _INCREASE / st.rate)
+
+    def _decrease(self, st, now, factor):
+        if now - st.last_decrease < _COOLDOWN:
+            return
+        st.last_decrease = now
+        st.backoffs += 1
+        if self.max_rate:
+            st.rate = max(self.min_rate, st.rate * factor)
+
+    def metrics(self):
+        """{host: {"rate", "queue", "latency_ms", "requests", "backoffs", "waited"}}; rate 0 = unlimited."""
+        with self._lock:
+            return {
+                host: {
+                    "rate": round(st.rate, 2) if self.max_rate else 0.0,
+                    "queue": st.waiting,
+                    "latency_ms": round(st.latency * 1000) if st.latency is not None else None,
+                    "requests": st.requests,
+                    "backoffs": st.backoffs,
+                    "waited": round(st.waited, 3),
+                }
+                for host, st in self._hosts.items()
+            }
+
+    def summary(self):
+        parts = []
+        for host, m in self.metrics().items():
+            rate = f"{m['rate']:.1f} req/s" if m["rate"] else "unbegrenzt"
+            latency = f", Latenz {m['latency_ms']} ms" if m["latency_ms"] is not None else ""
+            parts.append(f"{host}: {rate}{latency}, {m['requests']} Requests, {m['backoffs']} Backoffs, "
+                         f"{m['waited']:.1f}s gewartet")
+        return "; ".join(parts) or "keine Requests"
+
+
+class ThrottleRetry(Retry):
+    """urllib3 Retry that reports every failed attempt (status or connection error)
+    to an AdaptiveThrottle, and lets the retry wait for a throttle slot after its
+    backoff, so retries of many workers do not hit the host all at once when a
+    Retry-After period ends."""
+
+    def __init__(self, *args, throttle=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.throttle = throttle
+        self.host = None
+
+    def new(self, **kw):
+        kw.setdefault("throttle", self.throttle)
+        return super().new(**kw)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        host = _pool.host if _pool is not None else None
+        if self.throttle is not None and host:
+            retry_after = self.get_retry_after(response) if response is not None else None
+            self.throttle.record(host, status=response.status if response is not None else None,
+                                 retry_after=retry_after, error=error is not None)
+        new_retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        new_retry.host = host
+        return new_retry
+
+    def sleep(self, response=None):
+        if self.throttle is None or not self.host:
+            return super().sleep(response)
+        # Retry-After is already enforced by the throttle (for all workers of the host)
+        self._sleep_backoff()
+        self.throttle.wait(self.host)
@@ -0,0 +1,88 @@
+"""
+Ergebnis-Cache und Zusammenlegen identischer Anfragen fuer die Web-UI.
+
+Der Schluessel ist das normalisierte Formular (Jahre, Monate, Kategorien,
+Release-/Produktions-Filter): "1-3" und "01,02,03" bei den Monaten oder
+Leerzeichen in den Listen ergeben denselben Schluessel. Laeuft fuer einen
+Schluessel bereits ein Job, wird eine neue Anfrage an diesen Job gehaengt
+(gemeinsamer SSE-Stream); ist ein Ergebnis juenger als die TTL, wird es
+sofort ausgeliefert, ohne neu zu crawlen. Gespeichert wird nur die Job-ID
+des Ergebnisses; die Eintraege selbst haelt die Job-Verwaltung (job_registry).
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from scraper import parse_months
+
+DEFAULT_TTL_MINUTES = 30
+DEFAULT_MAX_ENTRIES = 32
+
+
+def _csv(value):
+    """Comma-separated list without blanks and repetitions (order is kept, it decides
+    the order of the preview items)."""
+    return list(dict.fromkeys(v.strip() for v in str(value or "").split(",") if v.strip()))
+
+
+def form_key(data):
+    """Cache key of a /start request: everything that changes the preview items."""
+    try:
+        months = parse_months(str(data.get("months") or ""))
+    except ValueError:
+        months = str(data.get("months"))
+    return json.dumps({
+        "calendar_years": _csv(data.get("calendar_years")),
+        "months": months,
+        "categories": _csv(data.get("categories")),
+        "release_years": _csv(data.get("release_years")),
+        "production_years": _csv(data.get("production_years")),
+        "ignore_production": bool(data.get("ignore_production", True)),
+        "fuzzy_threshold": data.get("fuzzy_threshold"),
+    }, sort_keys=True)
+
+
+class ResultCache:
+    """Finished preview results and running jobs by form key. Thread-safe."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._results = OrderedDict()  # key -> (job_id, cached_at)
+        self._running = {}             # key -> job_id
+        self._lock = threading.Lock()
+
+    def claim(self, key, job_id, ttl, use_cache=True):
+        """Decide how to serve a request:
+        ("running", job_id of the job already working on `key`),
+        ("cached", (job_id, cached_at)) with the job holding a result younger than `ttl` seconds, or
+        ("new", job_id) -- the caller starts `job_id`, which is now registered as running."""
+        with self._lock:
+            running = self._running.get(key)
+            if running is not None:
+                return "running", running
+            if use_cache and key in self._results:
+                result_job, cached_at = self._results[key]
+                if time.time() - cached_at < ttl:
+                    self._results.move_to_end(key)
+                    return "cached", (result_job, cached_at)
+                del self._results[key]
+            self._running[key] = job_id
+            return "new", job_id
+
+    def finish(self, key, job_id):
+        """Remember `job_id` as the result for `key`."""
+        with self._lock:
+            if self._running.get(key) == job_id:
+                del self._running[key]
+            self._results[key] = (job_id, time.time())
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def fail(self, key, job_id):
+        """Forget a job that ended without a result."""
+        with self._lock:
+            if self._running.get(key) == job_id:
+                del self._running[key]
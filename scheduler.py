@@ -0,0 +1,125 @@
+"""
+Hintergrund-Scheduler fuer periodische Vorwaerm-Crawls der Web-UI.
+
+Ein Thread crawlt in einem einstellbaren Intervall (mit zufaelliger
+Streuung, damit nicht alle Instanzen gleichzeitig loslegen) die in
+config.json eingestellten Kategorien und Jahre. Die Seiten landen dabei im
+HTTP-Cache; interaktive Jobs duerfen sie innerhalb des Intervalls ohne
+Rueckfrage beim Server verwenden und sind dadurch deutlich schneller.
+
+status() liefert Dauer, Ergebnis und Alter des letzten Laufs sowie den
+Zeitpunkt des naechsten.
+"""
+
+import random
+import threading
+import time
+
+DEFAULT_INTERVAL_MINUTES = 180
+DEFAULT_JITTER = 0.1      # +-10% of the interval
+_DISABLED_POLL = 60.0     # seconds; how often a disabled scheduler re-reads its interval
+
+
+class PrewarmScheduler:
+    """Calls `run()` every `interval()` minutes (re-read before each wait; 0 disables
+    the scheduler) in a daemon thread. `run()` returns a dict that is shown in the
+    status as the result of the last run."""
+
+    def __init__(self, run, interval, jitter=DEFAULT_JITTER):
+        self.run = run
+        self.interval = interval
+        self.jitter = jitter
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.running = False
+        self.runs = 0
+        self.next_run = None       # epoch seconds
+        self.last_started = None
+        self.last_finished = None
+        self.last_success = None   # end of the last run without error
+        self.last_duration = None
+        self.last_result = None
+        self.last_error = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="prewarm", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def trigger(self):
+        """Start the next run right away."""
+        self._wake.set()
+
+    def _interval_minutes(self):
+        try:
+            return max(0.0, float(self.interval()))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _delay(self):
+        """Seconds until the next run, or None if the scheduler is disabled."""
+        minutes = self._interval_minutes()
+        if not minutes:
+            return None
+        return minutes * 60 * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _loop(self):
+        # first run after a random part of the interval, not right at startup
+        delay = self._delay()
+        delay = delay * random.uniform(0.05, 0.25) if delay is not None else None
+        while not self._stop.is_set():
+            with self._lock:
+                self.next_run = time.time() + delay if delay is not None else None
+            woken = self._wake.wait(delay if delay is not None else _DISABLED_POLL)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if woken or delay is not None:
+                self._run_once()
+            delay = self._delay()
+
+    def _run_once(self):
+        with self._lock:
+            self.running = True
+            self.next_run = None
+            self.last_started = time.time()
+        result, error = None, None
+        try:
+            result = self.run()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished = time.time()
+        with self._lock:
+            self.running = False
+            self.runs += 1
+            self.last_finished = finished
+            self.last_duration = finished - self.last_started
+            self.last_result = result
+            self.last_error = error
+            if error is None:
+                self.last_success = finished
+
+    def status(self):
+        with self._lock:
+            now = time.time()
+            return {
+                "enabled": self._interval_minutes() > 0,
+                "interval_minutes": self._interval_minutes(),
+                "running": self.running,
+                "runs": self.runs,
+                "next_run": self.next_run,
+                "next_run_in": round(self.next_run - now) if self.next_run else None,
+                "last_started": self.last_started,
+                "last_finished": self.last_finished,
+                "last_duration": round(self.last_duration, 1) if self.last_duration is not None else None,
+                "last_result": self.last_result,
+                "last_error": self.last_error,
+                # age of the data of the last successful run
+                "freshness": round(now - self.last_success) if self.last_success else None,
+            }
@@ -2,17 +2,35 @@
 # pip install requests beautifulsoup4 icalendar
 
 import argparse
+import json
+import os
+import sys
 import requests
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from bs4 import BeautifulSoup
-from icalendar import Calendar, Event
 from datetime import datetime, timezone
-import time
+from dataclasses import dataclass, field
+from typing import Optional
 import re
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import time
+from html.parser import HTMLParser
 from urllib.parse import urljoin
 import logging
 
+from http_cache import ResponseCache, DEFAULT_CACHE_PATH, DEFAULT_TTL_DAYS, DEFAULT_MAX_MB
+from state_store import StateStore, DEFAULT_STATE_PATH, DEFAULT_MAX_AGE_DAYS
+from html_backends import get_backend, DEFAULT_PARSER, PARSER_CHOICES
+from pipeline import Pipeline
+from title_normalizer import normalize_title
+from fuzzy_dedup import duplicate_groups
+from ics_writer import IcsWriter, event_uid
+from calendar_diff import load_previous, diff_events
+from rate_limiter import (AdaptiveThrottle, ThrottleRetry, retry_after_seconds,
+                          DEFAULT_MAX_RATE, DEFAULT_START_RATE, DEFAULT_MIN_RATE)
+from metrics import Metrics
+
 BASE = "https://bluray-disc.de"
 
 # Listing pages to crawl (we paginate these). Focus is on year, not specific months.
@@ -23,63 +41,247 @@ MONTH_PAGES = [
 ]
 MAX_PAGES = 20
 
+# Detail pages are fetched in parallel; the per-host rate keeps us polite towards the site.
+DEFAULT_CONCURRENCY = 4
+DEFAULT_LISTING_WORKERS = 2
+DEFAULT_PARSE_WORKERS = 1
+
 HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; BluRayScraper/1.0)"}
-logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
 
-def create_session():
+def create_session(pool_size=10, throttle=None):
     s = requests.Session()
-    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=(500,502,503,504))
-    s.mount('https://', HTTPAdapter(max_retries=retries))
+    # failed attempts (429/5xx, connection errors) are reported to the throttle, which
+    # slows down and honours Retry-After for all workers, not just the retrying one
+    retries = ThrottleRetry(total=3, backoff_factor=0.5, status_forcelist=(429,500,502,503,504), throttle=throttle)
+    # pool_maxsize must cover the worker count, otherwise urllib3 discards connections
+    adapter = HTTPAdapter(max_retries=retries, pool_maxsize=max(10, pool_size))
+    s.mount('https://', adapter)
+    s.mount('http://', adapter)
     s.headers.update(HEADERS)
     return s
 
 
-def fetch(session, url, timeout=15):
+def fetch(session, url, timeout=15, cache=None, throttle=None, metrics=None, kind="detail"):
+    """Body of `url` (from the cache if possible). `metrics` counts the request under the
+    URL class `kind` ("calendar" or "detail")."""
+    entry = cache.lookup(url) if cache else None
+    if entry is not None and cache.is_fresh(entry):
+        logging.debug(f"CACHE -> {url}")
+        cache.record_hit(url)
+        _count_cache(metrics, cache, kind, "fresh")
+        return entry["body"]
+    if throttle:
+        throttle.wait(url)
     logging.debug(f"FETCH -> {url}")
-    r = session.get(url, timeout=timeout)
+    r = session.get(url, timeout=timeout, headers=cache.validators(entry) if entry else None)
+    if throttle:
+        _record_response(throttle, url, r)
+    if r.status_code == 304 and entry is not None:
+        _record_fetch(metrics, kind, r)
+        cache.record_not_modified(url)
+        _count_cache(metrics, cache, kind, "revalidated")
+        return entry["body"]
     r.raise_for_status()
-    return r.text
+    body = r.text
+    _record_fetch(metrics, kind, r)
+    if cache:
+        cache.store(url, body, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        _count_cache(metrics, cache, kind, "miss")
+    return body
+
+
+def _record_response(throttle, url, r):
+    # r.elapsed runs up to the response headers, but includes urllib3's retry backoffs;
+    # those attempts were already reported by ThrottleRetry, so no latency sample then
+    retries = getattr(r.raw, "retries", None)
+    latency = None if retries is not None and retries.history else r.elapsed.total_seconds()
+    throttle.record(url, status=r.status_code, latency=latency,
+                    retry_after=retry_after_seconds(r.headers.get("Retry-After")))
+
+
+def _record_fetch(metrics, kind, r):
+    """Latency, transferred bytes and retries of a response whose body has been read."""
+    if metrics is None:
+        return
+    metrics.observe("fetch_seconds", r.elapsed.total_seconds(), kind=kind)
+    metrics.inc("downloaded_bytes", r.raw.tell(), kind=kind)
+    retries = getattr(r.raw, "retries", None)
+    if retries is not None and retries.history:
+        metrics.inc("retries", len(retries.history), kind=kind)
+
+
+def _count_cache(metrics, cache, kind, result):
+    if metrics is not None and cache is not None:
+        metrics.inc("cache_requests", kind=kind, result=result)
+
+
+_DETAIL_LINK_RE = re.compile(r"/blu-ray-filme/\d+|/blu-ray-news/filme/\d+")
+
 
-def extract_item_links_from_month_page(html):
+def _detail_link(href):
+    """Absolute detail-page URL for an href, or None if it does not point to a film."""
+    if not href:
+        return None
+    full = urljoin(BASE, href.split("?")[0].split('#')[0])
+    return full if _DETAIL_LINK_RE.search(full) else None
+
+
+def extract_item_links_from_month_page(html, parser=None):
     """
     sucht auf der Monatsseite nach Links zu Film-/Item-Detailseiten.
     Die Struktur kann sich ändern; daher werden mehrere Selektoren probiert.
+    `parser` wählt das HTML-Backend (siehe html_backends.py).
     """
-    soup = BeautifulSoup(html, "html.parser")
     links = set()
 
     # Try to find links that point to film detail pages. Accept both
     # /blu-ray-filme/<id>-... and /blu-ray-news/filme/<id>-... (both occur on the site).
-    for a in soup.select("a"):
-        href = a.get("href", "")
-        if not href:
-            continue
-        full = urljoin(BASE, href.split("?")[0].split('#')[0])
-        # accept film detail pages when they contain a numeric id segment
-        if re.search(r"/blu-ray-filme/\d+", full) or re.search(r"/blu-ray-news/filme/\d+", full):
+    for href in get_backend(parser).iter_hrefs(html):
+        full = _detail_link(href)
+        if full:
             links.add(full)
     return list(links)
 
-def parse_detail_page(html):
+
+class _LinkStreamParser(HTMLParser):
+    """Tokenizes listing HTML incrementally and collects detail links as their <a> tags appear."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found = []
+        self._seen = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        # the first of duplicate attributes wins, like in the parser backends and browsers
+        href = next((value for name, value in attrs if name == "href"), None)
+        full = _detail_link(href)
+        if full and full not in self._seen:
+            self._seen.add(full)
+            self.found.append(full)
+
+
+def iter_item_links(chunks):
+    """
+    Streaming-Variante von extract_item_links_from_month_page(): nimmt HTML-Textstücke
+    entgegen und liefert passende Detail-Links, sobald sie im Markup auftauchen,
+    ohne einen DOM aufzubauen.
+    """
+    tokenizer = _LinkStreamParser()
+    for chunk in chunks:
+        tokenizer.feed(chunk)
+        yield from tokenizer.found
+        tokenizer.found.clear()
+    tokenizer.close()
+    yield from tokenizer.found
+
+
+def fetch_chunks(session, url, timeout=15, cache=None, throttle=None, chunk_size=16384,
+                 metrics=None, kind="calendar"):
+    """
+    Wie fetch(), liefert den Body aber stückweise (iter_content), während er noch geladen wird.
+    Cache-Treffer und 304-Antworten liefern den gespeicherten Body.
+    """
+    entry = cache.lookup(url) if cache else None
+    if entry is not None and cache.is_fresh(entry):
+        cache.record_hit(url)
+        _count_cache(metrics, cache, kind, "fresh")
+        yield entry["body"]
+        return
+    if throttle:
+        throttle.wait(url)
+    logging.debug(f"FETCH (stream) -> {url}")
+    with session.get(url, timeout=timeout, stream=True,
+                     headers=cache.validators(entry) if entry else None) as r:
+        if throttle:
+            _record_response(throttle, url, r)
+        if r.status_code == 304 and entry is not None:
+            _record_fetch(metrics, kind, r)
+            cache.record_not_modified(url)
+            _count_cache(metrics, cache, kind, "revalidated")
+            yield entry["body"]
+            return
+        r.raise_for_status()
+        if r.encoding is None:
+            r.encoding = "utf-8"
+        body = []
+        for chunk in r.iter_content(chunk_size=chunk_size, decode_unicode=True):
+            if chunk:
+                body.append(chunk)
+                yield chunk
+        _record_fetch(metrics, kind, r)
+        if cache:
+            cache.store(url, "".join(body), r.headers.get("ETag"), r.headers.get("Last-Modified"))
+            _count_cache(metrics, cache, kind, "miss")
+
+# Precompiled patterns for parse_detail_page(). The section end markers and the
+# month names are combined into single alternations so each needs only one scan.
+_SERIES_TITLE_RE = re.compile(r"\bstaffel\b|\bseason\b|\bkomplette\s+serie\b")
+_UHD_TITLE_RE = re.compile(r"\b4k\b|\buhd\b|\bultra\s*hd\b")
+_3D_TITLE_RE = re.compile(r"\b3d\b")
+_PRODUCTION_RE = re.compile(r"Produktion\b", re.IGNORECASE)
+_SECTION_END_RE = re.compile(r"\b(?:Regie|Darsteller|Genre|Laufzeit|Sprache|Bildformat|Tonformat|FSK)\b", re.IGNORECASE)
+_YEAR_RE = re.compile(r"([0-9]{4})")
+_COUNTRY_YEAR_RE = re.compile(r"([A-Za-zäöüÄÖÜß]+(?:\s*/\s*[A-Za-zäöüÄÖÜß]+)*)\s*/\s*([0-9]{4})")
+_PAREN_YEAR_RE = re.compile(r"\(([0-9]{4})\)")
+
+_MONTHS = {
+    "januar": "01", "februar": "02", "märz": "03", "april": "04", "mai": "05", "juni": "06",
+    "juli": "07", "august": "08", "september": "09", "oktober": "10", "november": "11", "dezember": "12",
+}
+# Release-Datum: Formate wie "Ab 07.11.2025", "07.11.2025" oder "07. November 2025" (in dieser Priorität)
+_DATE_PATTERNS = [
+    re.compile(r"Ab\s+([0-3]?\d\.[01]?\d\.[0-9]{4})", re.IGNORECASE),
+    re.compile(r"([0-3]?\d\.\s*(?:Januar|Februar|März|April|Mai|Juni|Juli|August|September|Oktober|November|Dezember)\s*[0-9]{4})", re.IGNORECASE),
+    re.compile(r"([0-3]?\d\.[01]?\d\.[0-9]{4})", re.IGNORECASE),
+]
+_MONTH_NAME_RE = re.compile("|".join(_MONTHS), re.IGNORECASE)
+_DATE_JUNK_RE = re.compile(r"[^0-9\.\s]")
+_MULTI_DOT_RE = re.compile(r"\.{2,}")
+_SHORT_DATE_RE = re.compile(r"([0-3]?\d\.[01]?\d)\.?$")
+_NEAR_DATE_RE = re.compile(r"([0-3]?\d\.[01]?\d)\D{0,30}([0-9]{4})")
+def _month_to_number(m):
+    return "." + _MONTHS[m.group(0).lower()] + "."
+
+
+def _parse_date_string(s):
+    """Normalisiert einen gefundenen Datums-String und versucht ihn zu parsen -> (date, raw) oder (None, s)."""
+    s = s.strip()
+    # replace month names with numeric month, keep only digits, dots and whitespace, collapse duplicate dots
+    s = _MONTH_NAME_RE.sub(_month_to_number, s)
+    s = _DATE_JUNK_RE.sub("", s)
+    s = _MULTI_DOT_RE.sub(".", s)
+    s = s.replace(" ", "")
+    for fmt in ("%d.%m.%Y", "%d.%m.%y"):
+        try:
+            return datetime.strptime(s, fmt).date(), s
+        except ValueError:
+            pass
+    return None, s
+
+
+def parse_detail_page(html, parser=None):
     """
     Extrahiert Titel, Release-Datum (wenn vorhanden) und Produktionsjahr (falls angezeigt).
     Rückgabe: dict mit keys: title, release_date (datetime.date oder None), production_year (int or None)
+    `parser` wählt das HTML-Backend (siehe html_backends.py).
     """
-    soup = BeautifulSoup(html, "html.parser")
     result = {"title": None, "release_date": None, "production_year": None, "url": None, "detected_formats": []}
+    current_year = datetime.now().year
+    title, breadcrumb_texts, text = get_backend(parser).scan_detail(html)
 
     # Titel
-    h1 = soup.find(["h1", "h2"])
-    if h1:
-        result["title"] = h1.get_text(strip=True)
+    if title is not None:
+        result["title"] = title
 
     # Detect format/category from breadcrumbs and title (NOT sidebar/full page)
     formats = set()
     title_lower = (result.get("title") or "").lower()
 
     # Check breadcrumbs only (reliable category indicator)
-    for nav in soup.select("nav, .breadcrumb, .breadcrumbs, ol.breadcrumb"):
-        nav_text = nav.get_text(" ", strip=True).lower()
+    for nav_text in breadcrumb_texts:
+        nav_text = nav_text.lower()
         if "4k" in nav_text or "uhd" in nav_text or "ultra hd" in nav_text:
             formats.add("4k-uhd")
         if "serie" in nav_text:
@@ -89,526 +291,827 @@ def parse_detail_page(html):
         if "import" in nav_text:
             formats.add("blu-ray-importe")
 
-    # Check the TITLE for series indicators (Staffel, Season, komplette Serie)
-    if re.search(r"\bstaffel\b|\bseason\b|\bkomplette\s+serie\b", title_lower):
+    # Check the TITLE for series (Staffel, Season, komplette Serie), 4K/UHD and 3D indicators
+    if _SERIES_TITLE_RE.search(title_lower):
         formats.add("serien")
-
-    # Check the title for 4K/UHD indicators
-    if re.search(r"\b4k\b|\buhd\b|\bultra\s*hd\b", title_lower):
+    if _UHD_TITLE_RE.search(title_lower):
         formats.add("4k-uhd")
-    if re.search(r"\b3d\b", title_lower):
+    if _3D_TITLE_RE.search(title_lower):
         formats.add("3d-blu-ray-filme")
-    # Check the URL itself for category hints
-    result["detected_formats"] = list(formats)
+    # sorted, so the order does not depend on string hashing (differs between processes)
+    result["detected_formats"] = sorted(formats)
 
-    # Suche nach Produktionsjahr - die Seite führt öfters "Produktion: 2025" oder es ist in Klammern im Titel
-    text = soup.get_text(" ", strip=True)
-    # Erweiterte Suche nach Produktionsjahr unter "Produktion:" Abschnitt
-    # Try to find an explicit "Produktion" label and extract ALL 4-digit years
+    # Produktionsjahr: look for an explicit "Produktion" label and extract ALL 4-digit years
     # that appear in the production section. This covers variants like:
     #   Produktion: USA / 1990
     #   Produktion: Neuseeland / 2025
     #   Produktion\nUSA / 1990
     #   Produktion: Deutschland/Frankreich 2024
-    production_years = []
-    m = re.search(r"Produktion\b", text, flags=re.IGNORECASE)
+    m = _PRODUCTION_RE.search(text)
     if m:
-        # look at the next 500 characters after the label for all 4-digit years
         start = m.start()
-        # Find the end of the production section (until next major section or end of reasonable text)
-        end_markers = [r"\bRegie\b", r"\bDarsteller\b", r"\bGenre\b", r"\bLaufzeit\b", r"\bSprache\b", r"\bBildformat\b", r"\bTonformat\b", r"\bFSK\b"]
+        # The section ends at the first following section label (skip the first 50 chars to
+        # avoid false matches) and is limited to a reasonable size (max 800 chars).
         end_pos = len(text)
-        for marker in end_markers:
-            match = re.search(marker, text[start+50:], flags=re.IGNORECASE)  # skip first 50 chars to avoid false matches
-            if match:
-                candidate_end = start + 50 + match.start()
-                end_pos = min(end_pos, candidate_end)
-        
-        # Limit to reasonable section size (max 800 chars)
+        marker = _SECTION_END_RE.search(text[start+50:])
+        if marker:
+            end_pos = start + 50 + marker.start()
         end_pos = min(end_pos, start + 800)
-        snippet = text[start:end_pos]
-        
-        # Find all 4-digit years in the production section
-        for y_match in re.finditer(r"([0-9]{4})", snippet):
-            year = int(y_match.group(1))
-            # Only consider years that could realistically be production years (1900-2030)
-            if 1900 <= year <= 2030:
-                production_years.append(year)
-        
-        # Choose the most recent/relevant production year
+
+        # Only consider years that could realistically be production years (1900-2030)
+        production_years = {int(y) for y in _YEAR_RE.findall(text, start, end_pos) if 1900 <= int(y) <= 2030}
         if production_years:
-            # Remove duplicates and sort
-            production_years = sorted(set(production_years), reverse=True)
-            # Prefer years closer to current time (within reasonable range)
-            current_year = datetime.now().year
-            # Look for years within a reasonable production range (current year - 5 to current year + 5)
+            # Prefer the most recent year within current year +/- 5, else the most recent overall
             reasonable_years = [y for y in production_years if current_year - 5 <= y <= current_year + 5]
-            if reasonable_years:
-                result["production_year"] = reasonable_years[0]  # Most recent reasonable year
-            else:
-                result["production_year"] = production_years[0]  # Most recent year overall
-    
-    # Additional pattern: look for "Country / YYYY" format which is common on bluray-disc.de
+            result["production_year"] = max(reasonable_years or production_years)
+
+    # Additional pattern: "Country / YYYY" format which is common on bluray-disc.de
     if result["production_year"] is None:
-        # Pattern like "Deutschland / 2025" or "USA / 2024"
-        country_year_pattern = r"([A-Za-zäöüÄÖÜß]+(?:\s*/\s*[A-Za-zäöüÄÖÜß]+)*)\s*/\s*([0-9]{4})"
-        for match in re.finditer(country_year_pattern, text):
+        for match in _COUNTRY_YEAR_RE.finditer(text):
             year = int(match.group(2))
-            current_year = datetime.now().year
-            # Only consider reasonable production years
             if current_year - 5 <= year <= current_year + 5:
                 result["production_year"] = year
                 break
-    
-    # Fallback: if no production section found, try looking for years in parentheses near the title
-    # but be more selective about this
+
+    # Fallback: (YYYY) near the title (first 500 chars), only recent/upcoming years
     if result["production_year"] is None and result["title"]:
-        # Look for (YYYY) patterns near the title, but only consider reasonable production years
-        title_area = text[:500]  # First 500 chars should contain title area
-        for y_match in re.finditer(r"\(([0-9]{4})\)", title_area):
+        for y_match in _PAREN_YEAR_RE.finditer(text, 0, 500):
             year = int(y_match.group(1))
-            current_year = datetime.now().year
-            if current_year - 5 <= year <= current_year + 5:  # Only recent/upcoming years
+            if current_year - 5 <= year <= current_year + 5:
                 result["production_year"] = year
                 break
-    
-    # NOTE: Improved logic now searches entire production section for any valid years
-    # and uses heuristics to pick the most likely production year
-
-    # Release-Datum: suche nach Formaten wie "Ab 07.11.2025" oder "07.11.2025" oder "07. November 2025"
-    # mehrere Muster versuchen:
-    date_patterns = [
-        r"Ab\s+([0-3]?\d\.[01]?\d\.[0-9]{4})",
-        r"ab\s+([0-3]?\d\.[01]?\d\.[0-9]{4})",
-        r"([0-3]?\d\.\s*(?:Januar|Februar|März|April|Mai|Juni|Juli|August|September|Oktober|November|Dezember)\s*[0-9]{4})",
-        r"([0-3]?\d\.[01]?\d\.[0-9]{4})"
-    ]
-    month_dict = {
-        "Januar":"01","Februar":"02","März":"03","April":"04","Mai":"05","Juni":"06",
-        "Juli":"07","August":"08","September":"09","Oktober":"10","November":"11","Dezember":"12"
-    }
-    # prefer searching close to the title (avoid finding page meta publish dates)
-    snippet = text
+
+    # Release-Datum: prefer searching close to the title (avoid finding page meta publish dates)
+    snip_start, snip_end = 0, len(text)
     if result["title"]:
         idx = text.find(result["title"])
         if idx >= 0:
-            snippet = text[idx:idx+800]
+            snip_start, snip_end = idx, idx + 800
 
-    for pat in date_patterns:
-        mm = re.search(pat, snippet, flags=re.IGNORECASE)
+    for pat in _DATE_PATTERNS:
+        mm = pat.search(text, snip_start, snip_end) or pat.search(text)
         if not mm:
-            mm = re.search(pat, text, flags=re.IGNORECASE)
-        if mm:
-            s = mm.group(1)
-            s = s.strip()
-            # replace month names with numeric month
-            for name, num in month_dict.items():
-                if re.search(name, s, flags=re.IGNORECASE):
-                    s = re.sub(name, "."+num+".", s, flags=re.IGNORECASE)
-            # keep only digits, dots and whitespace, then collapse duplicate dots
-            s = re.sub(r"[^0-9\.\s]", "", s)
-            s = re.sub(r"\.{2,}", ".", s)
-            s = s.replace(" ", "")
-            # try several parse attempts
-            for fmt in ("%d.%m.%Y", "%d.%m.%y"):
-                try:
-                    dt = datetime.strptime(s, fmt)
-                    result["release_date"] = dt.date()
-                    result["raw_date"] = s
-                    break
-                except Exception:
-                    pass
-
-            # if we only found day.month (no year), try to infer year 2025 when sensible
-            if result.get("release_date") is None:
-                m_short = re.search(r"([0-3]?\d\.[01]?\d)\.?$", s)
-                if m_short:
-                    daymonth = m_short.group(1)
-                    # infer year 2025 if month is 11 or 12
-                    try:
-                        inferred_year = str(datetime.now().year)
-                        dm = datetime.strptime(daymonth + "." + inferred_year, "%d.%m.%Y")
-                        result["release_date"] = dm.date()
-                        result["raw_date"] = daymonth + "." + inferred_year
-                    except Exception:
-                        pass
-
-            # fallback: if no date yet, try to find day.month + year within nearby text
-            if result.get("release_date") is None:
-                m2 = re.search(r"([0-3]?\d\.[01]?\d)\D{0,30}([0-9]{4})", snippet)
-                if not m2:
-                    m2 = re.search(r"([0-3]?\d\.[01]?\d)\D{0,30}([0-9]{4})", text)
-                if m2:
-                    candidate = f"{m2.group(1)}.{m2.group(2)}"
-                    candidate = re.sub(r"\.{2,}", ".", candidate)
-                    try:
-                        dt = datetime.strptime(candidate, "%d.%m.%Y")
-                        result["release_date"] = dt.date()
-                        result["raw_date"] = candidate
-                    except Exception:
-                        pass
-            if result.get("release_date"):
+            continue
+        rdate, s = _parse_date_string(mm.group(1))
+        if rdate:
+            result["release_date"] = rdate
+            result["raw_date"] = s
+            break
+
+        # if we only found day.month (no year), infer the current year
+        m_short = _SHORT_DATE_RE.search(s)
+        if m_short:
+            daymonth = m_short.group(1) + "." + str(current_year)
+            try:
+                result["release_date"] = datetime.strptime(daymonth, "%d.%m.%Y").date()
+                result["raw_date"] = daymonth
+                break
+            except ValueError:
+                pass
+
+        # fallback: try to find day.month + year within nearby text
+        m2 = _NEAR_DATE_RE.search(text, snip_start, snip_end) or _NEAR_DATE_RE.search(text)
+        if m2:
+            candidate = _MULTI_DOT_RE.sub(".", f"{m2.group(1)}.{m2.group(2)}")
+            try:
+                result["release_date"] = datetime.strptime(candidate, "%d.%m.%Y").date()
+                result["raw_date"] = candidate
                 break
+            except ValueError:
+                pass
 
     return result
 
-def main():
-    cal = Calendar()
-    cal.add('prodid', '-//BlurayDisc Scraper//de//')
-    cal.add('version', '2.0')
+def parse_detail_record(html, parser=None):
+    """parse_detail_page() as a compact, picklable tuple
+    (title, release_date, production_year, detected_formats, raw_date) for parse processes."""
+    meta = parse_detail_page(html, parser)
+    return (meta["title"], meta["release_date"], meta["production_year"],
+            tuple(meta["detected_formats"]), meta.get("raw_date"))
 
-    found = []
-    visited = set()
-    # candidates: normalized_title -> candidate dict {title, release_date, url}
-    candidates = {}
 
-    parser = argparse.ArgumentParser(description='BlurayDisc scraper')
-    current_year = str(datetime.now().year)
-    parser.add_argument('--year', type=str, default=current_year, help=f'Production year(s) to filter (comma-separated, e.g. "{current_year}" or "{current_year},{int(current_year)+1}", default {current_year})')
-    parser.add_argument('--calendar-year', type=str, default=None, help='Calendar year for URL template (e.g. "2026"). If not specified, uses first production year from --year.')
-    parser.add_argument('--release-years', type=str, default=None, help='Optional: comma-separated RELEASE years to require (based on parsed DTSTART year), e.g. "2024,2025"')
-    parser.add_argument('--only-production', action='store_true', default=False, help='If set, require the production year match (--year). By default all found items are included unless --release-years is used or --only-production is set.')
-    parser.add_argument('--ignore-production', action='store_true', default=False, help='If set, ignore production-year checks even if --year is provided (useful when you only want to filter by --release-years).')
-    parser.add_argument('--out', type=str, default='bluray_YYYY_year.ics', help='Output ICS filename pattern')
-    parser.add_argument('--calendar-template', type=str, default=None, help='Optional URL template for calendar pages, e.g. "https://bluray-disc.de/4k-uhd/kalender?id={year}-{month:02d}"')
-    parser.add_argument('--months', type=str, default=None, help='Comma-separated months or range (e.g. "01,02" or "01-03"). If omitted and --calendar-template given, defaults to all 12 months.')
-    parser.add_argument('--category', type=str, default=None, help='Category slug (e.g. "4k-uhd", "blu-ray-filme", "serien"). Used to filter detail pages by format.')
-    parser.add_argument('--preview', action='store_true', default=False, help='If set, output a JSON preview of found items instead of writing an ICS file.')
-    args = parser.parse_args()
+def meta_from_record(record):
+    """Inverse of parse_detail_record(): the dict parse_detail_page() returns."""
+    title, release_date, production_year, detected_formats, raw_date = record
+    meta = {"title": title, "release_date": release_date, "production_year": production_year,
+            "url": None, "detected_formats": list(detected_formats)}
+    if raw_date is not None:
+        meta["raw_date"] = raw_date
+    return meta
 
-    # Interactive prompt for release-years when not provided and running interactively
-    # Default behavior: all years (None). If user types comma-separated years, we keep that string.
-    try:
-        import sys
-        if args.release_years is None and sys.stdin.isatty():
-            resp = input('Release-Jahr(e) eingeben (komma-getrennt), oder leer für alle [Enter]: ').strip()
-            if resp == '':
-                args.release_years = None
-            else:
-                args.release_years = resp
-    except Exception:
-        # if anything goes wrong (non-interactive environment), keep args as-is
-        pass
 
+class _Reporter:
+    """Routes the messages of scrape() to its on_progress callback as {"type": "log", ...}
+    events (INFO and above), or to the logging module when no callback is given."""
+
+    def __init__(self, on_progress=None):
+        self._callback = on_progress
+
+    def event(self, type_, **fields):
+        if self._callback is not None:
+            self._callback({"type": type_, **fields})
+
+    def _log(self, level, msg):
+        if self._callback is None:
+            logging.log(level, msg)
+        elif level >= logging.INFO:
+            self._callback({"type": "log", "level": logging.getLevelName(level).lower(), "text": msg})
+
+    def debug(self, msg):
+        self._log(logging.DEBUG, msg)
+
+    def info(self, msg):
+        self._log(logging.INFO, msg)
+
+    def warning(self, msg):
+        self._log(logging.WARNING, msg)
+
+
+@dataclass
+class ScrapeConfig:
+    """Settings of one scraper run. The fields mirror the command line flags of main()."""
+    year: str = field(default_factory=lambda: str(datetime.now().year))
+    # production filter only applies when the production years were chosen explicitly
+    explicit_year: bool = False
+    calendar_year: Optional[str] = None
+    release_years: Optional[str] = None
+    only_production: bool = False
+    ignore_production: bool = False
+    calendar_template: Optional[str] = None
+    months: Optional[str] = None
+    category: Optional[str] = None
+    concurrency: int = DEFAULT_CONCURRENCY
+    listing_workers: int = DEFAULT_LISTING_WORKERS
+    parse_workers: int = DEFAULT_PARSE_WORKERS
+    parse_processes: int = 0  # > 0: parse in a process pool of this size
+    max_rate: float = DEFAULT_MAX_RATE
+    start_rate: float = DEFAULT_START_RATE
+    min_rate: float = DEFAULT_MIN_RATE
+    cache: Optional[str] = DEFAULT_CACHE_PATH  # None disables the HTTP cache
+    cache_ttl: float = DEFAULT_TTL_DAYS
+    cache_max_mb: float = DEFAULT_MAX_MB
+    cache_fresh: int = 0
+    incremental: bool = False
+    state_db: str = DEFAULT_STATE_PATH
+    max_age: float = DEFAULT_MAX_AGE_DAYS
+    parser: str = DEFAULT_PARSER
+    fuzzy_threshold: Optional[float] = None  # None: dedup on exact normalized titles only
+
+
+# Parse months helper (used for both page generation and release-date filtering)
+def parse_months(s):
+    if not s:
+        return list(range(1,13))
+    parts = s.split(',')
+    months = []
+    for p in parts:
+        p = p.strip()
+        if '-' in p:
+            a,b = p.split('-',1)
+            months.extend(range(int(a), int(b)+1))
+        else:
+            months.append(int(p))
+    return sorted(set(months))
+
+
+def resolve_years(config):
+    """Return (production_years, calendar_year) for a config."""
     # Parse production years from --year parameter (support comma-separated)
     production_years = None
-    if args.year:
+    if config.year:
         try:
-            production_years = [int(x.strip()) for x in args.year.split(',') if x.strip()]
+            production_years = [int(x.strip()) for x in config.year.split(',') if x.strip()]
         except Exception:
             production_years = [datetime.now().year]  # fallback
     else:
         production_years = [datetime.now().year]
-    
+
     # Parse calendar year (for URL template) - can be different from production years
-    if args.calendar_year:
+    if config.calendar_year:
         try:
-            target_year = int(args.calendar_year.strip())
+            target_year = int(config.calendar_year.strip())
         except Exception:
             target_year = production_years[0]
     else:
         target_year = production_years[0]  # fallback to first production year
-    session = create_session()
-
-    # Parse months helper (used for both page generation and release-date filtering)
-    def parse_months(s):
-        if not s:
-            return list(range(1,13))
-        parts = s.split(',')
-        months = []
-        for p in parts:
-            p = p.strip()
-            if '-' in p:
-                a,b = p.split('-',1)
-                months.extend(range(int(a), int(b)+1))
+    return production_years, target_year
+
+
+def scrape(config, on_progress=None, throttle=None, metrics=None):
+    """
+    Scrapes the calendar pages described by `config` and yields one item dict per
+    deduplicated entry and category:
+        {"title", "release_date" (date or None), "url", "production_year", "category"}
+    `on_progress` receives structured events while the run is going on:
+        {"type": "log", "level": "info"|"warning", "text": ...}
+        {"type": "page", "category": slug, "url": ..., "links": n}
+        {"type": "detail", "url": ..., "ok": bool}
+        {"type": "throttle", "hosts": AdaptiveThrottle.metrics()}
+        {"type": "candidate", "title", "release_date", "url", "production_year", "category"}
+            (a page that passes the filters of a category; whether it is yielded is only
+            decided after the dedup at the end)
+    Without a callback, log messages go to the logging module.
+    `throttle` lets several runs share one AdaptiveThrottle; by default each run
+    gets its own from config.max_rate/start_rate/min_rate. Likewise `metrics`
+    (metrics.Metrics) collects fetch, parse, filter, dedup and cache figures.
+    Raises ValueError for an unknown or uninstalled parser backend.
+    """
+    log = _Reporter(on_progress)
+    found = []
+    production_years, target_year = resolve_years(config)
+    backend = get_backend(config.parser)
+
+    if throttle is None:
+        throttle = AdaptiveThrottle(config.max_rate, start_rate=config.start_rate, min_rate=config.min_rate)
+    if metrics is None:
+        metrics = Metrics()
+    # detail fetch workers; the pipeline needs at least one, or it never finishes
+    concurrency = max(1, config.concurrency)
+    session = create_session(pool_size=concurrency, throttle=throttle)
+    cache = None
+    if config.cache:
+        try:
+            cache = ResponseCache(config.cache, ttl_days=config.cache_ttl, max_mb=config.cache_max_mb, fresh_for=config.cache_fresh)
+        except Exception as e:
+            log.warning(f'HTTP-Cache nicht verfügbar ({config.cache}): {e}')
+    store = StateStore(config.state_db, max_age_days=config.max_age) if config.incremental else None
+    log.info(f'HTML-Parser: {backend.name}')
+
+    try:
+        # Categories to crawl: --category accepts a comma-separated list. All of them share
+        # one crawl plan, so a film listed in several category calendars is fetched once.
+        categories = [c.strip().lower() for c in (config.category or '').split(',') if c.strip()] or [None]
+
+        # Build pages list: if user provided a calendar-template, expand months from that template
+        def category_pages(cat_slug):
+            if not config.calendar_template:
+                return MONTH_PAGES
+            month_nums = parse_months(config.months)
+
+            # If the provided calendar_template looks like a full URL (starts with http or contains ://)
+            # we'll use it directly. Otherwise we treat it as a small segment (e.g. "{year}-{month:02d}")
+            # and embed it into the canonical calendar path. "{category}" is replaced by the category slug.
+            def make_page(m):
+                seg = config.calendar_template.format(year=target_year, month=m, category=cat_slug or '')
+                if seg.lower().startswith('http') or '://' in seg:
+                    return seg
+                # embed as id value into the canonical calendar path by default
+                return f"https://bluray-disc.de/calendar_template/kalender?id={seg}"
+
+            return [make_page(m) for m in month_nums]
+
+        def rejection(link, meta, cat_slug, note):
+            """Apply the category, release, production and calendar filters to one detail page.
+            Returns None if it passes, else the filter that rejects it ("series", "not_series",
+            "wrong_category", "release_year", "production_year", "month" or "calendar_year").
+            The details of a skip go to `note` (log.info, or a no-op for the live candidates)."""
+            title = meta.get("title") or link
+            py = meta.get("production_year")
+            rdate = meta.get("release_date")
+            detected_formats = meta.get("detected_formats", [])
+
+            # Category filter: if --category is specified, check if the item matches
+            if cat_slug:
+                # For 4K UHD: skip items detected as series (unless also detected as 4K)
+                if cat_slug == "4k-uhd":
+                    if "serien" in detected_formats and "4k-uhd" not in detected_formats:
+                        note(f'Skipping (Serie, not 4K): {title} | formats={detected_formats}')
+                        return "series"
+                # For blu-ray-filme: skip items that are detected as series
+                elif cat_slug == "blu-ray-filme":
+                    if "serien" in detected_formats and "blu-ray-filme" not in detected_formats:
+                        note(f'Skipping (Serie, not Film): {title} | formats={detected_formats}')
+                        return "series"
+                # For serien: skip items that are clearly only 4K/films (no serie indicator)
+                elif cat_slug == "serien":
+                    if detected_formats and "serien" not in detected_formats:
+                        note(f'Skipping (not Serie): {title} | formats={detected_formats}')
+                        return "not_series"
+                # For other categories: skip if detected formats don't include the category
+                # (only when formats were actually detected, to avoid false negatives)
+                elif detected_formats and cat_slug not in detected_formats:
+                    # Also check the detail page URL for the category slug
+                    if f"/{cat_slug}/" not in link.lower():
+                        note(f'Skipping (wrong category {cat_slug}): {title} | formats={detected_formats}')
+                        return "wrong_category"
+
+            # determine whether to include this candidate based on filters:
+            include_candidate = False
+            # parse release-years argument into list if provided
+            release_years = None
+            if config.release_years:
+                try:
+                    release_years = [int(x.strip()) for x in config.release_years.split(',') if x.strip()]
+                except Exception:
+                    release_years = None
+
+            # Did the caller choose the production years explicitly? (avoid treating the default as intent)
+            has_year_arg = config.explicit_year
+
+            # Active production filter: user explicitly supplied --year OR used --only-production,
+            # unless ignore-production was requested.
+            if config.ignore_production:
+                prod_filter_active = False
             else:
-                months.append(int(p))
-        return sorted(set(months))
-
-    # Build pages list: if user provided a calendar-template, expand months from that template
-    if args.calendar_template:
-        month_nums = parse_months(args.months)
-
-        # If the provided calendar_template looks like a full URL (starts with http or contains ://)
-        # we'll use it directly. Otherwise we treat it as a small segment (e.g. "{year}-{month:02d}")
-        # and embed it into the canonical calendar path.
-        def make_page(m):
-            seg = args.calendar_template.format(year=target_year, month=m)
-            if seg.lower().startswith('http') or '://' in seg:
-                return seg
-            # embed as id value into the canonical calendar path by default
-            return f"https://bluray-disc.de/calendar_template/kalender?id={seg}"
-
-        pages = [make_page(m) for m in month_nums]
-    else:
-        pages = MONTH_PAGES
+                prod_filter_active = has_year_arg or config.only_production
 
-    for month_url in pages:
-        page = 0
-        while True:
-            url = re.sub(r'page=\d+', f'page={page}', month_url)
-            logging.info(f'Loading month page: {url}')
-            try:
-                html = fetch(session, url)
-            except Exception as e:
-                logging.warning(f'Fehler beim Laden {url}: {e}')
-                break
-            links = extract_item_links_from_month_page(html)
-            if not links:
-                break
-            logging.info(f"{len(links)} mögliche Detail-Links gefunden auf {url}")
-            new_links = 0
-            for link in links:
-                if link in visited:
+            # Debug logging to understand filtering decisions
+            log.debug(f"Filter state for '{title}': has_year_arg={has_year_arg}, only_production={config.only_production}, ignore_production={config.ignore_production}, prod_filter_active={prod_filter_active}")
+
+            # Evaluate individual filter predicates (they are ANDed)
+            #  - release predicate: if --release-years provided, require rdate year in that list; otherwise pass
+            if release_years is None:
+                pass_release = True
+            else:
+                pass_release = bool(rdate and getattr(rdate, 'year', None) in release_years)
+
+            #  - production predicate: if production filter active, require production_year in production_years list; otherwise pass
+            if not prod_filter_active:
+                pass_production = True
+            else:
+                pass_production = (py is not None and py in production_years)
+
+            # Debug logging for production filter decision
+            log.debug(f"Production filter for '{title}': prod_filter_active={prod_filter_active}, py={py}, production_years={production_years}, pass_production={pass_production}")
+
+            #  - calendar-year + months predicate: if --months was given,
+            #    require the release date to fall within the selected
+            #    calendar year AND selected months.
+            pass_calendar = True
+            calendar_reason = None
+            if rdate and config.months:
+                selected_months = parse_months(config.months) if config.months else []
+                if selected_months:
+                    if rdate.month not in selected_months:
+                        pass_calendar = False
+                        calendar_reason = "month"
+                        note(f'Skipping (month {rdate.month:02d} not in {selected_months}): {title} | rdate={rdate}')
+            if rdate and target_year:
+                if rdate.year != target_year:
+                    pass_calendar = False
+                    calendar_reason = calendar_reason or "calendar_year"
+                    note(f'Skipping (year {rdate.year} != calendar year {target_year}): {title} | rdate={rdate}')
+
+            include_candidate = bool(pass_release and pass_production and pass_calendar)
+            if not include_candidate:
+                # Log why this candidate was skipped (release / production predicates)
+                try:
+                    note(f'Skipping: {title} | release_ok={pass_release} production_ok={pass_production} prod={py} rdate={rdate}')
+                except Exception:
+                    note(f'Skipping: {title} | prod={py} rdate={rdate}')
+                if not pass_release:
+                    return "release_year"
+                if not pass_production:
+                    return "production_year"
+                return calendar_reason
+            return None
+
+        # Crawl pipeline: listing workers walk the calendar pages of all categories and months
+        # (the pages of one month in order) and hand every new detail URL to the fetch workers,
+        # which pass the HTML on to the parse workers. Bounded queues between the stages keep
+        # memory flat; each unique detail URL is loaded once for all categories. The
+        # per-category filters run afterwards on the shared metadata.
+        chains = [(cat_slug, month_url) for cat_slug in categories for month_url in category_pages(cat_slug)]
+        chain_pages = [[] for _ in chains]  # per chain: the links of each loaded page, in order
+        metas = {}  # link -> parsed meta, shared by all categories
+        scheduled = set()
+        scheduled_lock = threading.Lock()
+        # worker threads report here; logging and progress events are emitted by this thread
+        events = queue.Queue()
+        # With a progress callback, a detail page that passes the filters of a category listing
+        # it is reported right away as a "candidate" event, long before the dedup below (which
+        # needs all pages) decides which items are yielded.
+        live = on_progress is not None
+        link_categories = {}  # link -> categories whose calendar lists it so far
+        announced = set()     # (link, category) reported as candidate
+
+        def announce(link):
+            meta = metas.get(link)
+            if meta is None:
+                return
+            with scheduled_lock:
+                cats = list(link_categories.get(link, ()))
+            for cat_slug in cats:
+                if (link, cat_slug) in announced or rejection(link, meta, cat_slug, lambda msg: None):
                     continue
-                visited.add(link)
-                new_links += 1
-                time.sleep(0.5)
+                announced.add((link, cat_slug))
+                log.event("candidate", title=meta.get("title") or link, release_date=meta.get("release_date"),
+                          url=link, production_year=meta.get("production_year"), category=cat_slug)
+
+        def list_chain(index):
+            cat_slug, month_url = chains[index]
+            seen = set()
+            page = 0
+            while True:
+                url = re.sub(r'page=\d+', f'page={page}', month_url)
+                events.put(("info", f'Loading month page: {url}'))
+                # Stream the listing page: detail fetches start as soon as the first links appear
+                page_links = []
                 try:
-                    d_html = fetch(session, link)
+                    for link in iter_item_links(fetch_chunks(session, url, cache=cache, throttle=throttle,
+                                                             metrics=metrics)):
+                        page_links.append(link)
+                        with scheduled_lock:
+                            new = link not in scheduled
+                            scheduled.add(link)
+                            listed_again = False
+                            if live and cat_slug not in link_categories.setdefault(link, []):
+                                link_categories[link].append(cat_slug)
+                                listed_again = not new
+                        if new:
+                            yield link
+                        elif listed_again:
+                            # already fetched (or on its way) for another category
+                            events.put(("listed", link))
                 except Exception as e:
-                    logging.warning(f"Fehler beim Laden Detailseite {link}: {e}")
-                    continue
-                meta = parse_detail_page(d_html)
-                meta["url"] = link
-                title = meta.get("title") or link
-                py = meta.get("production_year")
-                rdate = meta.get("release_date")
-                detected_formats = meta.get("detected_formats", [])
-
-                # Category filter: if --category is specified, check if the item matches
-                if args.category:
-                    cat_slug = args.category.strip().lower()
-                    # For 4K UHD: skip items detected as series (unless also detected as 4K)
-                    if cat_slug == "4k-uhd":
-                        if "serien" in detected_formats and "4k-uhd" not in detected_formats:
-                            logging.info(f'Skipping (Serie, not 4K): {title} | formats={detected_formats}')
-                            continue
-                    # For blu-ray-filme: skip items that are detected as series
-                    elif cat_slug == "blu-ray-filme":
-                        if "serien" in detected_formats and "blu-ray-filme" not in detected_formats:
-                            logging.info(f'Skipping (Serie, not Film): {title} | formats={detected_formats}')
-                            continue
-                    # For serien: skip items that are clearly only 4K/films (no serie indicator)
-                    elif cat_slug == "serien":
-                        if detected_formats and "serien" not in detected_formats:
-                            logging.info(f'Skipping (not Serie): {title} | formats={detected_formats}')
-                            continue
-                    # For other categories: skip if detected formats don't include the category
-                    # (only when formats were actually detected, to avoid false negatives)
-                    elif detected_formats and cat_slug not in detected_formats:
-                        # Also check the detail page URL for the category slug
-                        if f"/{cat_slug}/" not in link.lower():
-                            logging.info(f'Skipping (wrong category {cat_slug}): {title} | formats={detected_formats}')
-                            continue
-
-                # determine whether to include this candidate based on filters:
-                include_candidate = False
-                # parse release-years argument into list if provided
-                release_years = None
-                if args.release_years:
-                    try:
-                        release_years = [int(x.strip()) for x in args.release_years.split(',') if x.strip()]
-                    except Exception:
-                        release_years = None
+                    chain_pages[index].append(page_links)
+                    metrics.inc("errors", kind="calendar")
+                    events.put(("warning", f'Fehler beim Laden {url}: {e}'))
+                    break
+                chain_pages[index].append(page_links)
+                if not page_links:
+                    break
+                events.put(("page", cat_slug, url, len(page_links)))
+                new_links = len(set(page_links) - seen)
+                seen.update(page_links)
+                if new_links == 0 or page >= MAX_PAGES:
+                    break
+                page += 1
 
-                # Determine if the user explicitly passed --year on the command line (avoid treating default as intent)
-                import sys as _sys
-                has_year_arg = any(a.startswith('--year') for a in _sys.argv[1:])
+        def load_detail(link):
+            if store:
+                meta = store.lookup(link)
+                if meta is not None:
+                    store.mark_seen(link)
+                    events.put(("detail", link, meta, None, True))
+                    return ()
+            return [(link, fetch(session, link, cache=cache, throttle=throttle, metrics=metrics))]
 
-                # Active production filter: user explicitly supplied --year OR used --only-production,
-                # unless ignore-production was requested.
-                if getattr(args, 'ignore_production', False):
-                    prod_filter_active = False
-                else:
-                    prod_filter_active = has_year_arg or args.only_production
-                
-                # Debug logging to understand filtering decisions
-                logging.debug(f"Filter state for '{title}': has_year_arg={has_year_arg}, only_production={args.only_production}, ignore_production={getattr(args, 'ignore_production', False)}, prod_filter_active={prod_filter_active}")
-
-                # Evaluate individual filter predicates (they are ANDed)
-                #  - release predicate: if --release-years provided, require rdate year in that list; otherwise pass
-                if release_years is None:
-                    pass_release = True
-                else:
-                    pass_release = bool(rdate and getattr(rdate, 'year', None) in release_years)
+        def parse_detail(item):
+            link, html = item
+            started = time.perf_counter()
+            if parse_pool is not None:
+                meta = meta_from_record(parse_pool.submit(parse_detail_record, html, backend.name).result())
+            else:
+                meta = parse_detail_page(html, backend.name)
+            metrics.observe("parse_seconds", time.perf_counter() - started)
+            meta["url"] = link
+            if store:
+                store.save(link, meta)
+            events.put(("detail", link, meta, None, False))
+            return ()
 
-                #  - production predicate: if production filter active, require production_year in production_years list; otherwise pass
-                if not prod_filter_active:
-                    pass_production = True
+        def listing_failed(index, err):
+            metrics.inc("errors", kind="calendar")
+            events.put(("warning", f'Fehler beim Laden {chains[index][1]}: {err}'))
+
+        def detail_failed(item, err):
+            metrics.inc("errors", kind="detail")
+            events.put(("detail", item if isinstance(item, str) else item[0], None, err, False))
+
+        listing_workers = max(1, min(config.listing_workers, len(chains)))
+        parse_workers = max(1, config.parse_workers)
+        parse_pool = None
+        if config.parse_processes > 0:
+            # Parsing is GIL-bound: hand the HTML to worker processes. Two parse threads per
+            # process keep the pool fed while results travel back.
+            parse_pool = ProcessPoolExecutor(max_workers=config.parse_processes)
+            parse_workers = max(parse_workers, 2 * config.parse_processes)
+        pipe = Pipeline()
+        chain_q = pipe.queue()
+        detail_q = pipe.queue(concurrency * 4)
+        parse_q = pipe.queue(concurrency * 2)
+        pipe.feed(chain_q, range(len(chains)), listing_workers)
+        crawl_start = time.monotonic()
+        pipe.stage("Kalender", "Monatsseiten", list_chain, chain_q, listing_workers, detail_q, concurrency,
+                   on_error=listing_failed)
+        pipe.stage("Detail-Fetch", "Seiten", load_detail, detail_q, concurrency, parse_q, parse_workers,
+                   on_error=detail_failed)
+        pipe.stage("Parsen", "Seiten", parse_detail, parse_q, parse_workers,
+                   on_error=detail_failed, on_done=lambda: events.put(("done",)))
+        try:
+            while True:
+                event = events.get()
+                kind = event[0]
+                if kind == "done":
+                    break
+                if kind == "info":
+                    log.info(event[1])
+                elif kind == "warning":
+                    log.warning(event[1])
+                elif kind == "page":
+                    _, cat_slug, url, links = event
+                    log.info(f"{links} mögliche Detail-Links gefunden auf {url}")
+                    log.event("page", category=cat_slug, url=url, links=links)
+                    log.event("throttle", hosts=throttle.metrics())
+                elif kind == "listed":
+                    announce(event[1])
                 else:
-                    pass_production = (py is not None and py in production_years)
-                
-                # Debug logging for production filter decision
-                logging.debug(f"Production filter for '{title}': prod_filter_active={prod_filter_active}, py={py}, production_years={production_years}, pass_production={pass_production}")
-
-                #  - calendar-year + months predicate: if --months was given,
-                #    require the release date to fall within the selected
-                #    calendar year AND selected months.
-                pass_calendar = True
-                if rdate and args.months:
-                    selected_months = parse_months(args.months) if args.months else []
-                    if selected_months:
-                        if rdate.month not in selected_months:
-                            pass_calendar = False
-                            logging.info(f'Skipping (month {rdate.month:02d} not in {selected_months}): {title} | rdate={rdate}')
-                if rdate and target_year:
-                    if rdate.year != target_year:
-                        pass_calendar = False
-                        logging.info(f'Skipping (year {rdate.year} != calendar year {target_year}): {title} | rdate={rdate}')
-
-                include_candidate = bool(pass_release and pass_production and pass_calendar)
-
-                if include_candidate:
-                    found.append((title, rdate, link))
-                    # Deduplicate similar titles: collect candidates by normalized base title
-                    def normalize_title(t: str) -> str:
-                        """Stronger normalization for dedup: strip parentheticals, edition tokens, covers,
-                        and common format words like 4K/UHD/Blu-ray/Steelbook/Mediabook, then sanitize.
-                        """
-                        if not t:
-                            return ""
-                        s = t.lower()
-                        # normalize German umlauts to ascii-ish equivalents
-                        s = s.replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue').replace('ß', 'ss')
-
-                        # remove parenthetical and bracketed parts (e.g. (Cover A), (4K UHD + Blu-ray))
-                        s = re.sub(r"\([^)]*\)", ' ', s)
-                        s = re.sub(r"\[[^]]*\]", ' ', s)
-
-                        # remove all blu-ray/format variants first (before token removal)
-                        s = re.sub(r'\b\d+\s*blu[\s-]?rays?\b', ' ', s)  # "2 Blu-ray", "2 Blu-rays"
-                        s = re.sub(r'\bblu[\s-]?ray\s*disc\b', ' ', s)
-                        s = re.sub(r'\bblu[\s-]?rays?\b', ' ', s)
-                        s = re.sub(r'\b\d+k\b', ' ', s)  # "4k", "8k"
-                        s = re.sub(r'\buhd\b', ' ', s)
-                        s = re.sub(r'\bdvd\b', ' ', s)
-
-                        # remove known edition/format tokens
-                        tokens = [
-                            'limited', 'steelbook', 'mediabook', 'wattierte', 'amaray',
-                            'cover', 'edition', 'soundtrack', 'cd', 'deluxe', 'collector',
-                            'exclusive', 'special', 'uncut', 'extended', 'directors cut',
-                        ]
-                        for tok in tokens:
-                            pat = r'\b' + re.escape(tok) + r'\b'
-                            s = re.sub(pat, ' ', s)
-
-                        # remove any remaining non-alphanumeric (allow - and space)
-                        s = re.sub(r'[^a-z0-9\-\s]', ' ', s)
-                        # collapse whitespace and dashes
-                        s = re.sub(r'[-\s]+', ' ', s)
-                        s = s.strip()
-                        return s
-
-                    key = normalize_title(title)
-                    # candidate selection: prefer entries with release_date; if both have dates keep earliest; else prefer longer title
-                    existing = candidates.get(key)
-                    new_cand = { 'title': title, 'release_date': rdate, 'url': link, 'production_year': py }
-                    if existing is None:
-                        candidates[key] = new_cand
-                        logging.info(f'Candidate added for key "{key}": {title} -> {rdate} (prod={py})')
-                    else:
-                        ex_date = existing.get('release_date')
-                        # prefer the one with a date
-                        if ex_date and not rdate:
-                            logging.debug(f'Keep existing candidate (has date) for "{key}": {existing["title"]}')
-                        elif rdate and not ex_date:
+                    _, link, meta, err, reused = event
+                    log.event("detail", url=link, ok=err is None)
+                    if err is not None:
+                        log.warning(f"Fehler beim Laden Detailseite {link}: {err}")
+                        continue
+                    metas[link] = meta
+                    if live:
+                        announce(link)
+                    if store:
+                        if reused:
+                            store.reused += 1
+                        else:
+                            store.fetched += 1
+        finally:
+            pipe.stop()
+            if parse_pool is not None:
+                parse_pool.shutdown()
+        crawl_seconds = time.monotonic() - crawl_start
+        log.info(f'Pipeline ({crawl_seconds:.1f}s): {pipe.summary()}')
+        log.event("pipeline", seconds=round(crawl_seconds, 3),
+                  stages={name: st.as_dict() for name, st in pipe.stats.items()})
+
+        # Detail links per category in page order (months in order, pages in order)
+        category_links = {cat_slug: [] for cat_slug in categories}
+        visited = {cat_slug: set() for cat_slug in categories}
+        for (cat_slug, _), pages in zip(chains, chain_pages):
+            for page_links in pages:
+                for link in page_links:
+                    if link not in visited[cat_slug]:
+                        visited[cat_slug].add(link)
+                        category_links[cat_slug].append(link)
+
+        listed = sum(len(links) for links in category_links.values())
+        log.info(f'Crawl-Plan: {listed} Detail-Links in {len(categories)} Kategorie(n), '
+                 f'{len(scheduled)} eindeutige Detailseiten, {listed - len(scheduled)} doppelte Fetches vermieden')
+
+        def evaluate(link, meta, cat_slug, candidates, key_map):
+            """Merge one detail page that passes the filters into the category's
+            deduplicated candidates."""
+            reason = rejection(link, meta, cat_slug, log.info)
+            if reason is not None:
+                metrics.inc("rejections", category=cat_slug or "alle", reason=reason)
+                return
+            title = meta.get("title") or link
+            py = meta.get("production_year")
+            rdate = meta.get("release_date")
+            found.append((title, rdate, link))
+            # Deduplicate similar titles: collect candidates by normalized base title
+            key = normalize_title(title)
+            key = key_map.get(key, key)
+            # candidate selection: prefer entries with release_date; if both have dates keep earliest; else prefer longer title
+            existing = candidates.get(key)
+            new_cand = { 'title': title, 'release_date': rdate, 'url': link, 'production_year': py }
+            if existing is None:
+                candidates[key] = new_cand
+                log.info(f'Candidate added for key "{key}": {title} -> {rdate} (prod={py})')
+            else:
+                ex_date = existing.get('release_date')
+                # prefer the one with a date
+                if ex_date and not rdate:
+                    log.debug(f'Keep existing candidate (has date) for "{key}": {existing["title"]}')
+                elif rdate and not ex_date:
+                    candidates[key] = new_cand
+                    log.info(f'Replaced candidate for "{key}" with dated entry: {title} -> {rdate} (prod={py})')
+                elif rdate and ex_date:
+                    # both have dates: keep earliest
+                    try:
+                        if rdate < ex_date:
                             candidates[key] = new_cand
-                            logging.info(f'Replaced candidate for "{key}" with dated entry: {title} -> {rdate} (prod={py})')
-                        elif rdate and ex_date:
-                            # both have dates: keep earliest
-                            try:
-                                if rdate < ex_date:
-                                    candidates[key] = new_cand
-                                    logging.info(f'Replaced candidate for "{key}" with earlier date: {title} -> {rdate}')
-                                elif rdate > ex_date:
-                                    logging.debug(f'Existing candidate for "{key}" has earlier date: {existing["title"]} -> {ex_date}')
-                                else:
-                                    # same date: prefer the non-special/standard edition when possible
-                                    edition_tokens = ['steelbook', 'mediabook', 'limited', 'wattierte', 'amaray', 'collector']
-                                    new_has = any(tok in (title or '').lower() for tok in edition_tokens)
-                                    ex_has = any(tok in (existing.get('title') or '').lower() for tok in edition_tokens)
-                                    if ex_has and not new_has:
-                                        candidates[key] = new_cand
-                                        logging.info(f'Replaced special candidate for "{key}" with standard: {title} -> {rdate} (prod={py})')
-                                    elif new_has and not ex_has:
-                                        logging.info(f'Keeping existing standard candidate for "{key}": {existing["title"]}')
-                                    else:
-                                        if len(title) < len(existing.get('title','')):
-                                            candidates[key] = new_cand
-                                            logging.info(f'Replaced candidate for "{key}" with shorter title: {title} (prod={py})')
-                                        else:
-                                            logging.debug(f'Keep existing candidate for "{key}": {existing["title"]}')
-                            except Exception:
-                                logging.debug(f'Could not compare dates for key "{key}"')
+                            log.info(f'Replaced candidate for "{key}" with earlier date: {title} -> {rdate}')
+                        elif rdate > ex_date:
+                            log.debug(f'Existing candidate for "{key}" has earlier date: {existing["title"]} -> {ex_date}')
                         else:
-                            if len(title) > len(existing.get('title','')):
+                            # same date: prefer the non-special/standard edition when possible
+                            edition_tokens = ['steelbook', 'mediabook', 'limited', 'wattierte', 'amaray', 'collector']
+                            new_has = any(tok in (title or '').lower() for tok in edition_tokens)
+                            ex_has = any(tok in (existing.get('title') or '').lower() for tok in edition_tokens)
+                            if ex_has and not new_has:
                                 candidates[key] = new_cand
-                                logging.info(f'Replaced undated candidate for "{key}" with longer title: {title}')
+                                log.info(f'Replaced special candidate for "{key}" with standard: {title} -> {rdate} (prod={py})')
+                            elif new_has and not ex_has:
+                                log.info(f'Keeping existing standard candidate for "{key}": {existing["title"]}')
                             else:
-                                logging.debug(f'Keep existing undated candidate for "{key}": {existing["title"]}')
-                else:
-                    # Log why this candidate was skipped (release / production predicates)
-                    try:
-                        logging.info(f'Skipping: {title} | release_ok={pass_release} production_ok={pass_production} prod={py} rdate={rdate}')
+                                if len(title) < len(existing.get('title','')):
+                                    candidates[key] = new_cand
+                                    log.info(f'Replaced candidate for "{key}" with shorter title: {title} (prod={py})')
+                                else:
+                                    log.debug(f'Keep existing candidate for "{key}": {existing["title"]}')
                     except Exception:
-                        logging.info(f'Skipping: {title} | prod={py} rdate={rdate}')
+                        log.debug(f'Could not compare dates for key "{key}"')
+                else:
+                    if len(title) > len(existing.get('title','')):
+                        candidates[key] = new_cand
+                        log.info(f'Replaced undated candidate for "{key}" with longer title: {title}')
+                    else:
+                        log.debug(f'Keep existing undated candidate for "{key}": {existing["title"]}')
+            if existing is None:
+                metrics.inc("dedup_decisions", decision="added")
+            else:
+                metrics.inc("dedup_decisions", decision="replaced" if candidates[key] is new_cand else "kept")
 
-            if new_links == 0 or page >= MAX_PAGES:
-                break
-            page += 1
+        # Apply the per-category filter logic to the shared metadata, in each category's page order
+        candidates_by_category = {}
+        for cat_slug in categories:
+            # candidates: normalized_title -> candidate dict {title, release_date, url}
+            candidates = {}
+            links = [link for link in category_links[cat_slug] if link in metas]
+            # key_map: normalized title -> key of its fuzzy duplicate group
+            key_map = {}
+            if config.fuzzy_threshold is not None:
+                keys = [normalize_title(metas[link].get("title") or link) for link in links]
+                groups = duplicate_groups(keys, config.fuzzy_threshold)
+                key_map = {key: keys[g] for key, g in zip(keys, groups) if keys[g] != key}
+                if key_map:
+                    log.info(f'Fuzzy-Dedup ({cat_slug or "alle"}): {len(key_map)} Titelvariante(n) zusammengefasst')
+            for link in links:
+                evaluate(link, metas[link], cat_slug, candidates, key_map)
+            candidates_by_category[cat_slug] = candidates
+    finally:
+        log.info(f'Rate-Limit: {throttle.summary()}')
+        if cache:
+            log.info(f'HTTP-Cache: {cache.summary()}')
+            cache.close()
+        if store:
+            log.info(f'Inkrementell: {store.summary()}')
+            store.close()
+        session.close()
+
+    for cat_slug, candidates in candidates_by_category.items():
+        for cand in candidates.values():
+            yield {
+                'title': cand.get('title'),
+                'release_date': cand.get('release_date'),
+                'url': cand.get('url'),
+                'production_year': cand.get('production_year'),
+                'category': cat_slug,
+            }
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser(description='BlurayDisc scraper')
+    current_year = str(datetime.now().year)
+    parser.add_argument('--year', type=str, default=current_year, help=f'Production year(s) to filter (comma-separated, e.g. "{current_year}" or "{current_year},{int(current_year)+1}", default {current_year})')
+    parser.add_argument('--calendar-year', type=str, default=None, help='Calendar year for URL template (e.g. "2026"). If not specified, uses first production year from --year.')
+    parser.add_argument('--release-years', type=str, default=None, help='Optional: comma-separated RELEASE years to require (based on parsed DTSTART year), e.g. "2024,2025"')
+    parser.add_argument('--only-production', action='store_true', default=False, help='If set, require the production year match (--year). By default all found items are included unless --release-years is used or --only-production is set.')
+    parser.add_argument('--ignore-production', action='store_true', default=False, help='If set, ignore production-year checks even if --year is provided (useful when you only want to filter by --release-years).')
+    parser.add_argument('--out', type=str, default='bluray_YYYY_year.ics', help='Output ICS filename pattern')
+    parser.add_argument('--calendar-template', type=str, default=None, help='Optional URL template for calendar pages, e.g. "https://bluray-disc.de/{category}/kalender?id={year}-{month:02d}"')
+    parser.add_argument('--months', type=str, default=None, help='Comma-separated months or range (e.g. "01,02" or "01-03"). If omitted and --calendar-template given, defaults to all 12 months.')
+    parser.add_argument('--category', type=str, default=None, help='Category slug(s), comma-separated (e.g. "4k-uhd" or "4k-uhd,serien"). Used to filter detail pages by format; with several categories use "{category}" in --calendar-template.')
+    parser.add_argument('--diff', action='store_true', default=False, help='Compare with the calendar previously written to --out: unchanged events keep their DTSTAMP/SEQUENCE, changed ones get a higher SEQUENCE, vanished ones are written once as cancelled. Added, changed and cancelled events also go to <out>.delta.ics.')
+    parser.add_argument('--preview', action='store_true', default=False, help='If set, output a JSON preview of found items instead of writing an ICS file.')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help=f'Number of detail pages fetched in parallel (default {DEFAULT_CONCURRENCY}, 1 = serial).')
+    parser.add_argument('--listing-workers', type=int, default=DEFAULT_LISTING_WORKERS, help=f'Number of calendar months whose listing pages are loaded in parallel (default {DEFAULT_LISTING_WORKERS}).')
+    parser.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS, help=f'Number of threads parsing detail pages (default {DEFAULT_PARSE_WORKERS}).')
+    parser.add_argument('--parse-processes', type=int, default=0, help='Parse detail pages in a pool of this many worker processes instead of threads (default 0 = off); worthwhile with several CPU cores.')
+    parser.add_argument('--max-rate', type=float, default=DEFAULT_MAX_RATE, help=f'Politeness budget: upper bound of the adaptive request rate per host in requests per second (default {DEFAULT_MAX_RATE}, 0 = unlimited).')
+    parser.add_argument('--start-rate', type=float, default=DEFAULT_START_RATE, help=f'Initial request rate per host; it rises while the site answers quickly and drops on 429/5xx or slow responses (default {DEFAULT_START_RATE}).')
+    parser.add_argument('--min-rate', type=float, default=DEFAULT_MIN_RATE, help=f'Lower bound of the adaptive request rate per host (default {DEFAULT_MIN_RATE}).')
+    parser.add_argument('--cache', type=str, default=DEFAULT_CACHE_PATH, help=f'Path of the persistent HTTP cache (default {DEFAULT_CACHE_PATH}).')
+    parser.add_argument('--no-cache', action='store_true', default=False, help='Disable the persistent HTTP cache.')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL_DAYS, help=f'Evict cache entries unused for this many days (default {DEFAULT_TTL_DAYS}).')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB, help=f'Size cap of the HTTP cache in MB (default {DEFAULT_MAX_MB}).')
+    parser.add_argument('--cache-fresh', type=int, default=0, help='Serve cached pages younger than this many seconds without revalidation (default 0 = always revalidate).')
+    parser.add_argument('--incremental', action='store_true', default=False, help='Only fetch detail pages that are not yet in the local state store or whose entry is older than --max-age.')
+    parser.add_argument('--state-db', type=str, default=DEFAULT_STATE_PATH, help=f'Path of the state store used by --incremental (default {DEFAULT_STATE_PATH}).')
+    parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE_DAYS, help=f'With --incremental: re-fetch stored detail pages older than this many days (default {DEFAULT_MAX_AGE_DAYS}).')
+    parser.add_argument('--fuzzy-threshold', type=float, default=None, help='Also merge near-duplicate titles (e.g. "Teil 2" / "Part II", spelling variants) whose 3-gram similarity is at least this value, 0..1 (default: exact normalized titles only; 0.8 is a good start).')
+    parser.add_argument('--parser', type=str, default=DEFAULT_PARSER, choices=PARSER_CHOICES, help=f'HTML parser backend (default {DEFAULT_PARSER} = fastest installed, html.parser is always available).')
+    args = parser.parse_args()
+
+    # Interactive prompt for release-years when not provided and running interactively
+    # Default behavior: all years (None). If user types comma-separated years, we keep that string.
+    try:
+        if args.release_years is None and sys.stdin.isatty():
+            resp = input('Release-Jahr(e) eingeben (komma-getrennt), oder leer für alle [Enter]: ').strip()
+            if resp == '':
+                args.release_years = None
+            else:
+                args.release_years = resp
+    except Exception:
+        # if anything goes wrong (non-interactive environment), keep args as-is
+        pass
+
+    try:
+        get_backend(args.parser)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.min_rate <= 0 or args.start_rate <= 0:
+        parser.error('--min-rate and --start-rate must be greater than 0')
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    if args.fuzzy_threshold is not None and not 0 < args.fuzzy_threshold <= 1:
+        parser.error('--fuzzy-threshold must be between 0 and 1')
+
+    config = ScrapeConfig(
+        year=args.year,
+        # the production filter only applies when --year was passed explicitly (not the default)
+        explicit_year=any(a.startswith('--year') for a in sys.argv[1:]),
+        calendar_year=args.calendar_year,
+        release_years=args.release_years,
+        only_production=args.only_production,
+        ignore_production=args.ignore_production,
+        calendar_template=args.calendar_template,
+        months=args.months,
+        category=args.category,
+        concurrency=args.concurrency,
+        listing_workers=args.listing_workers,
+        parse_workers=args.parse_workers,
+        parse_processes=args.parse_processes,
+        max_rate=args.max_rate,
+        start_rate=args.start_rate,
+        min_rate=args.min_rate,
+        cache=None if args.no_cache else args.cache,
+        cache_ttl=args.cache_ttl,
+        cache_max_mb=args.cache_max_mb,
+        cache_fresh=args.cache_fresh,
+        incremental=args.incremental,
+        state_db=args.state_db,
+        max_age=args.max_age,
+        parser=args.parser,
+        fuzzy_threshold=args.fuzzy_threshold,
+    )
+    production_years, _ = resolve_years(config)
+    metrics = Metrics()
+    items = list(scrape(config, metrics=metrics))
+
+    def print_metrics():
+        # machine-readable summary of the crawl, like PREVIEW_JSON
+        print(f"METRICS_JSON:{json.dumps(metrics.summary(), ensure_ascii=False)}")
 
     # Use first production year for filename generation
     outname = args.out.replace('YYYY', str(production_years[0])).replace('MM', 'year')
 
     # Preview mode: output JSON instead of writing ICS
     if args.preview:
-        import json
-        items = []
-        for key, cand in candidates.items():
-            rd = cand.get('release_date')
-            items.append({
-                'title': cand.get('title'),
+        preview_items = []
+        for item in items:
+            rd = item['release_date']
+            entry = {
+                'title': item['title'],
                 'release_date': rd.isoformat() if rd else None,
-                'url': cand.get('url'),
-                'production_year': cand.get('production_year'),
-            })
+                'url': item['url'],
+                'production_year': item['production_year'],
+            }
+            if item['category']:
+                entry['category'] = item['category']
+            preview_items.append(entry)
         # Sort by release_date (None last)
-        items.sort(key=lambda x: x['release_date'] or '9999-99-99')
-        print(f"PREVIEW_JSON:{json.dumps({'items': items}, ensure_ascii=False)}")
-        logging.info(f'Vorschau: {len(items)} Eintraege gefunden (dedupliziert).')
+        preview_items.sort(key=lambda x: x['release_date'] or '9999-99-99')
+        print(f"PREVIEW_JSON:{json.dumps({'items': preview_items}, ensure_ascii=False)}")
+        logging.info(f'Vorschau: {len(preview_items)} Eintraege gefunden (dedupliziert).')
+        print_metrics()
         return
 
-    # After crawling, build calendar events from chosen candidates (deduplicated)
-    for key, cand in candidates.items():
-        title = cand.get('title')
-        rdate = cand.get('release_date')
-        link = cand.get('url')
-        if rdate:
-            ev = Event()
-            ev.add('summary', title)
-            ev.add('dtstamp', datetime.now(timezone.utc))
-            ev.add('dtstart', rdate)
-            ev.add('description', f"Quelle: {link}")
-            ev['uid'] = f"{abs(hash(link))}@bluray-disc.de"
-            cal.add_component(ev)
-            logging.info(f'Added event: {title} -> {rdate}')
-        else:
-            # still include undated productions as informational entries (no DTSTART)
-            ev = Event()
-            ev.add('summary', title)
-            ev.add('dtstamp', datetime.now(timezone.utc))
-            ev.add('description', f"Quelle: {link}")
-            ev['uid'] = f"{abs(hash(link))}@bluray-disc.de"
-            cal.add_component(ev)
-            logging.info(f'Added (no date) production {production_years}: {title} ({link})')
-
-    with open(outname, 'wb') as f:
-        f.write(cal.to_ical())
+    # The calendar holds the union of all categories; a film listed in several of them
+    # becomes a single event
+    candidates = {}
+    for item in items:
+        candidates.setdefault(item['url'], item)
+
+    # After crawling, build the calendar events of the chosen candidates (deduplicated).
+    # Undated productions are still included as informational entries (no DTSTART).
+    def events():
+        for key, cand in candidates.items():
+            title = cand.get('title')
+            rdate = cand.get('release_date')
+            link = cand.get('url')
+            if rdate:
+                logging.info(f'Added event: {title} -> {rdate}')
+            else:
+                logging.info(f'Added (no date) production {production_years}: {title} ({link})')
+            yield {'summary': title, 'uid': event_uid(link), 'dtstamp': datetime.now(timezone.utc),
+                   'dtstart': rdate, 'description': f"Quelle: {link}"}
+
+    if args.diff:
+        if not candidates:
+            # an empty result is far more likely a failed crawl than an empty calendar
+            logging.warning(f'Keine Eintraege gefunden; {outname} bleibt unveraendert (--diff).')
+            print_metrics()
+            return
+        previous = load_previous(outname)
+        calendar, delta, stats = diff_events(previous, events())
+        deltaname = outname[:-4] + '.delta.ics' if outname.endswith('.ics') else outname + '.delta.ics'
+        with open(deltaname, 'wb') as f, IcsWriter(f) as cal:
+            for event in delta:
+                cal.add_event(**event)
+        # write to a temp file first: a subscriber must never see a half-written calendar
+        with open(outname + '.tmp', 'wb') as f, IcsWriter(f) as cal:
+            for event in calendar:
+                cal.add_event(**event)
+        os.replace(outname + '.tmp', outname)
+        logging.info(f'Diff gegen vorherigen Kalender: {stats.summary()}. Delta: {deltaname}')
+    else:
+        # each event goes to the file right away
+        with open(outname, 'wb') as f, IcsWriter(f) as cal:
+            for event in events():
+                cal.add_event(**event)
     logging.info(f'Fertig. {len(candidates)} Einträge (dedupliziert) gefunden. ICS erzeugt: {outname}')
     for key, cand in candidates.items():
         print('-', cand.get('title'), '|', cand.get('release_date'), '|', cand.get('url'))
+    print_metrics()
 
 if __name__ == "__main__":
     main()
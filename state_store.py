@@ -0,0 +1,94 @@
+"""
+Lokaler Zustandsspeicher fuer den inkrementellen Scraper-Modus.
+
+Fuer jede Detailseite werden die von parse_detail_page() ermittelten Metadaten
+und der Zeitpunkt des letzten Ladens bzw. Sehens in SQLite abgelegt. Spaetere
+Laeufe laden nur noch Links, die neu sind oder deren Eintrag aelter als das
+konfigurierte Alter ist.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import date
+
+DEFAULT_STATE_PATH = "scraper_state.sqlite"
+DEFAULT_MAX_AGE_DAYS = 7
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS details (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    release_date TEXT,
+    raw_date TEXT,
+    production_year INTEGER,
+    detected_formats TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+class StateStore:
+    """SQLite-backed record of parsed detail pages, keyed by URL."""
+
+    def __init__(self, path=DEFAULT_STATE_PATH, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.path = str(path)
+        self.max_age = max_age_days * 24 * 3600
+        # instrumentation: detail pages taken from the store vs. fetched from the site
+        self.reused = 0
+        self.fetched = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def lookup(self, url):
+        """Return the stored meta dict for `url` if it is younger than max_age, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, release_date, raw_date, production_year, detected_formats, fetched_at "
+                "FROM details WHERE url = ?", (url,)).fetchone()
+        if row is None or time.time() - row[5] > self.max_age:
+            return None
+        meta = {
+            "title": row[0],
+            "release_date": date.fromisoformat(row[1]) if row[1] else None,
+            "production_year": row[3],
+            "url": url,
+            "detected_formats": json.loads(row[4]),
+        }
+        if row[2] is not None:
+            meta["raw_date"] = row[2]
+        return meta
+
+    def save(self, url, meta):
+        now = time.time()
+        rd = meta.get("release_date")
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO details (url, title, release_date, raw_date, production_year, detected_formats, "
+                "first_seen, last_seen, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET title = excluded.title, release_date = excluded.release_date, "
+                "raw_date = excluded.raw_date, production_year = excluded.production_year, "
+                "detected_formats = excluded.detected_formats, last_seen = excluded.last_seen, "
+                "fetched_at = excluded.fetched_at",
+                (url, meta.get("title"), rd.isoformat() if rd else None, meta.get("raw_date"),
+                 meta.get("production_year"), json.dumps(meta.get("detected_formats", [])), now, now, now))
+            self._conn.commit()
+
+    def mark_seen(self, url):
+        with self._lock:
+            self._conn.execute("UPDATE details SET last_seen = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def summary(self):
+        return (f"{self.reused} Detailseiten aus dem Store übernommen, {self.fetched} geladen "
+                f"({self.reused} Fetches vermieden)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
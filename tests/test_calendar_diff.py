@@ -0,0 +1,117 @@
+"""
+Abgleich mit dem zuletzt erzeugten Kalender: jeder Lauf schreibt den Kalender
+mit dem ICS-Writer und liest ihn fuer den naechsten Lauf mit load_previous()
+wieder ein, wie scraper --diff und der Feed-Cache.
+"""
+
+from datetime import date, datetime, timezone
+
+from calendar_diff import diff_events, load_previous
+from ics_writer import IcsWriter, event_uid
+
+RUN_1 = datetime(2026, 10, 1, 6, 0, 0, tzinfo=timezone.utc)
+RUN_2 = datetime(2026, 10, 2, 6, 0, 0, tzinfo=timezone.utc)
+RUN_3 = datetime(2026, 10, 3, 6, 0, 0, tzinfo=timezone.utc)
+
+
+def _event(slug, summary, dtstart, description=None):
+    url = f"https://bluray-disc.de/blu-ray-filme/{slug}"
+    return {"summary": summary, "uid": event_uid(url), "dtstart": dtstart,
+            "description": description or f"Quelle: {url}"}
+
+
+DUNE = _event("1-dune", "Dune: Part Two", date(2026, 1, 28))
+HEAT = _event("2-heat", "Heat, Director's Cut; 4K", date(2026, 3, 5))
+ALIEN = _event("3-alien", "Alien: Romulus", date(2026, 2, 12))
+BOOT = _event("4-boot", "Das Boot", date(2026, 4, 1))
+
+
+def _run(path, events, now):
+    """One --diff run: diff against the calendar at `path`, write the new one there."""
+    calendar, delta, stats = diff_events(load_previous(path), events, now)
+    with open(path, "wb") as f, IcsWriter(f) as cal:
+        for event in calendar:
+            cal.add_event(**event)
+    return {e["uid"]: e for e in delta}, stats
+
+
+def test_first_run_adds_everything(tmp_path):
+    path = tmp_path / "cal.ics"
+    delta, stats = _run(path, [DUNE, HEAT], RUN_1)
+    assert (stats.added, stats.changed, stats.cancelled, stats.unchanged) == (2, 0, 0, 0)
+    assert set(delta) == {DUNE["uid"], HEAT["uid"]}
+    for event in load_previous(path).values():
+        assert event["sequence"] == 0
+        assert event["dtstamp"] == RUN_1
+        assert event["last_modified"] == RUN_1
+        assert "status" not in event
+
+
+def test_added_changed_cancelled_unchanged(tmp_path):
+    path = tmp_path / "cal.ics"
+    _run(path, [DUNE, HEAT, ALIEN], RUN_1)
+
+    moved = {**HEAT, "dtstart": date(2026, 3, 19)}
+    delta, stats = _run(path, [DUNE, moved, BOOT], RUN_2)
+    assert (stats.added, stats.changed, stats.cancelled, stats.unchanged) == (1, 1, 1, 1)
+    assert set(delta) == {HEAT["uid"], BOOT["uid"], ALIEN["uid"]}
+
+    stored = load_previous(path)
+    assert set(stored) == {DUNE["uid"], HEAT["uid"], ALIEN["uid"], BOOT["uid"]}
+
+    # unchanged: keeps SEQUENCE, DTSTAMP and LAST-MODIFIED of the first run
+    assert stored[DUNE["uid"]]["sequence"] == 0
+    assert stored[DUNE["uid"]]["dtstamp"] == RUN_1
+    assert stored[DUNE["uid"]]["last_modified"] == RUN_1
+
+    # changed: higher SEQUENCE, new stamps, new content
+    assert stored[HEAT["uid"]]["sequence"] == 1
+    assert stored[HEAT["uid"]]["dtstamp"] == RUN_2
+    assert stored[HEAT["uid"]]["last_modified"] == RUN_2
+    assert stored[HEAT["uid"]]["dtstart"] == date(2026, 3, 19)
+    assert stored[HEAT["uid"]]["summary"] == HEAT["summary"]
+
+    # added
+    assert stored[BOOT["uid"]]["sequence"] == 0
+    assert stored[BOOT["uid"]]["dtstamp"] == RUN_2
+
+    # removed: delivered once as cancelled, with a higher SEQUENCE
+    assert stored[ALIEN["uid"]]["status"] == "CANCELLED"
+    assert stored[ALIEN["uid"]]["sequence"] == 1
+    assert stored[ALIEN["uid"]]["summary"] == ALIEN["summary"]
+
+
+def test_cancelled_event_is_dropped_on_the_next_run(tmp_path):
+    path = tmp_path / "cal.ics"
+    _run(path, [DUNE, ALIEN], RUN_1)
+    _run(path, [DUNE], RUN_2)
+    delta, stats = _run(path, [DUNE], RUN_3)
+    assert delta == {}
+    assert (stats.added, stats.changed, stats.cancelled, stats.unchanged) == (0, 0, 0, 1)
+    assert set(load_previous(path)) == {DUNE["uid"]}
+
+
+def test_cancelled_event_that_returns_is_changed(tmp_path):
+    path = tmp_path / "cal.ics"
+    _run(path, [DUNE, ALIEN], RUN_1)
+    _run(path, [DUNE], RUN_2)
+    delta, stats = _run(path, [DUNE, ALIEN], RUN_3)
+    assert stats.changed == 1
+    back = load_previous(path)[ALIEN["uid"]]
+    assert "status" not in back
+    assert back["sequence"] == 2
+    assert set(delta) == {ALIEN["uid"]}
+
+
+def test_unchanged_calendar_is_byte_identical(tmp_path):
+    path = tmp_path / "cal.ics"
+    _run(path, [DUNE, HEAT, ALIEN], RUN_1)
+    first = path.read_bytes()
+    delta, stats = _run(path, [DUNE, HEAT, ALIEN], RUN_2)
+    assert delta == {}
+    assert stats.unchanged == 3
+    assert path.read_bytes() == first
+
+
+def test_load_previous_of_missing_file(tmp_path):
+    assert load_previous(tmp_path / "missing.ics") == {}
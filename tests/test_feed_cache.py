@@ -0,0 +1,123 @@
+"""
+FeedCache: ein fehlgeschlagener Refresh (Ausnahme oder Crawl ohne Termine)
+haelt die vorherige Version, wird nicht als gueltiger Feed gespeichert und
+loest erst nach der Wartezeit den naechsten Crawl aus.
+"""
+
+from datetime import date
+
+import feed_cache
+from feed_cache import FeedCache, RETRY_AFTER
+
+EVENT = {"uid": "a@x", "summary": "Film", "dtstart": date(2026, 1, 1), "description": "Quelle: https://example.org/a"}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class _Crawler:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self, category, year):
+        self.calls += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class _Cache(FeedCache):
+    """Runs the background refresh right after get() (submit is called under the lock)."""
+
+    def __init__(self, directory, build):
+        self._pending = []
+        super().__init__(directory, build, self._pending.append)
+
+    def get(self, category, year, max_age):
+        feed = super().get(category, year, max_age)
+        while self._pending:
+            self._pending.pop()()
+        return feed
+
+
+def _cache(tmp_path, crawler):
+    return _Cache(tmp_path, crawler)
+
+
+def test_failed_refresh_backs_off(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(feed_cache, "time", clock)
+    crawler = _Crawler([RuntimeError("down")])
+    cache = _cache(tmp_path, crawler)
+
+    for _ in range(5):
+        assert cache.get("4k-uhd", "2026", 3600) is None
+    assert crawler.calls == 1
+    assert cache.status()[0]["error"] == "RuntimeError: down"
+
+    clock.now += RETRY_AFTER
+    cache.get("4k-uhd", "2026", 3600)
+    assert crawler.calls == 2
+
+
+def test_backoff_never_exceeds_max_age(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(feed_cache, "time", clock)
+    crawler = _Crawler([RuntimeError("down")])
+    cache = _cache(tmp_path, crawler)
+
+    cache.get("4k-uhd", "2026", 10)
+    clock.now += 10
+    cache.get("4k-uhd", "2026", 10)
+    assert crawler.calls == 2
+
+
+def test_empty_crawl_of_cold_feed_is_not_served(tmp_path):
+    crawler = _Crawler([[]])
+    cache = _cache(tmp_path, crawler)
+
+    assert cache.get("4k-uhd", "2026", 3600) is None
+    assert cache.get("4k-uhd", "2026", 3600) is None
+    assert crawler.calls == 1
+    assert not list(tmp_path.iterdir())
+    assert "Crawl ohne Ergebnis" in cache.status()[0]["error"]
+
+
+def test_empty_crawl_keeps_previous_version(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(feed_cache, "time", clock)
+    crawler = _Crawler([[EVENT], []])
+    cache = _cache(tmp_path, crawler)
+
+    cache.get("4k-uhd", "2026", 3600)
+    first = cache.get("4k-uhd", "2026", 3600)
+    assert first.events == 1
+
+    clock.now += 3600
+    stale = cache.get("4k-uhd", "2026", 3600)
+    assert crawler.calls == 2
+    assert stale is first
+    assert cache.get("4k-uhd", "2026", 3600) is first
+    assert (tmp_path / "4k-uhd_2026.ics").read_bytes() == first.body
+
+
+def test_success_clears_error(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(feed_cache, "time", clock)
+    crawler = _Crawler([RuntimeError("down"), [EVENT]])
+    cache = _cache(tmp_path, crawler)
+
+    cache.get("4k-uhd", "2026", 3600)
+    clock.now += RETRY_AFTER
+    cache.get("4k-uhd", "2026", 3600)
+    entry = cache.get("4k-uhd", "2026", 3600)
+    assert entry is not None and entry.events == 1
+    assert cache.status()[0]["error"] is None
+    assert crawler.calls == 2
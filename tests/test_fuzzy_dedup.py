@@ -0,0 +1,114 @@
+"""
+Unscharfe Duplikaterkennung: der 3-Gramm-Index mit Praefix-Filter muss genau
+die Gruppen liefern, die ein paarweiser Vergleich aller Schluessel mit
+similarity() ergibt (O(n^2)-Referenz), auf zufaelligen Titeln mit
+Tippfehlern, Teil/Part-Varianten, roemischen Zahlen und Zusaetzen.
+"""
+
+import random
+
+import pytest
+
+from fuzzy_dedup import DEFAULT_THRESHOLD, duplicate_groups, similarity
+
+WORDS = ["der", "die", "das", "pate", "herr", "ringe", "gefaehrten", "dune", "alien", "romulus", "heat",
+         "blade", "runner", "spider", "man", "verse", "mission", "impossible", "dead", "reckoning", "john",
+         "wick", "staffel", "boot", "babylon", "berlin", "avatar", "way", "of", "water", "the", "a", "an",
+         "mad", "max", "furiosa", "saga", "rueckkehr", "koenig", "imperium"]
+# spellings of the same part number
+NUMBERS = [[""], [" 2", " teil 2", " part ii", " part two"], [" 3", " iii", " teil drei", " vol 3"],
+           [" kapitel 4", " chapter 4", " iv"]]
+
+
+def _typo(rng, word):
+    if len(word) < 3:
+        return word
+    i = rng.randrange(len(word))
+    edit = rng.choice(("drop", "swap", "replace", "double"))
+    if edit == "drop":
+        return word[:i] + word[i + 1:]
+    if edit == "swap" and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if edit == "double":
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + word[i + 1:]
+
+
+def _random_keys(seed, count):
+    """Normalized title keys: base titles plus variants of them (typos, joined or extra
+    words, other spellings of the part number), some repeated verbatim, some empty."""
+    rng = random.Random(seed)
+    bases = [(" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))), rng.randrange(len(NUMBERS)))
+             for _ in range(count // 8)]
+    keys = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.03:
+            keys.append("")
+            continue
+        base, number = rng.choice(bases)
+        if roll < 0.15 and keys:
+            keys.append(rng.choice(keys))
+            continue
+        words = base.split()
+        if rng.random() < 0.5:
+            i = rng.randrange(len(words))
+            words[i] = _typo(rng, words[i])
+        if rng.random() < 0.2:
+            words.append(rng.choice(WORDS))
+        if rng.random() < 0.15 and len(words) > 1:
+            i = rng.randrange(len(words) - 1)
+            words[i:i + 2] = [words[i] + words[i + 1]]
+        if rng.random() < 0.1:
+            number = rng.randrange(len(NUMBERS))
+        keys.append(" ".join(words) + rng.choice(NUMBERS[number]))
+    return keys
+
+
+def _brute_force_groups(keys, threshold):
+    """Reference: compare every pair with similarity() and merge transitively. threshold >= 1
+    means exact matching (the documented contract of duplicate_groups)."""
+    group = list(range(len(keys)))
+
+    def find(i):
+        while group[i] != i:
+            i = group[i]
+        return i
+
+    for i in range(len(keys)):
+        for j in range(i):
+            if not keys[i] or not keys[j]:
+                continue
+            if keys[i] == keys[j] or (threshold < 1 and similarity(keys[i], keys[j]) >= threshold):
+                a, b = find(i), find(j)
+                if a != b:
+                    # the earlier index becomes the group id
+                    group[max(a, b)] = min(a, b)
+    return [find(i) for i in range(len(keys))]
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.6, 0.7, DEFAULT_THRESHOLD, 0.9, 0.95, 0.99, 1.0])
+@pytest.mark.parametrize("seed", range(3))
+def test_index_matches_all_pairs(seed, threshold):
+    keys = _random_keys(seed, 200)
+    assert duplicate_groups(keys, threshold) == _brute_force_groups(keys, threshold)
+
+
+def test_random_keys_contain_near_duplicates():
+    # guards against a generator whose keys are only ever exact or far apart
+    keys = [k for k in dict.fromkeys(_random_keys(0, 200)) if k]
+    near = sum(1 for i, a in enumerate(keys) for b in keys[:i] if DEFAULT_THRESHOLD <= similarity(a, b) < 1)
+    assert near >= 20
+
+
+def test_threshold_one_is_exact_matching():
+    # "spider man" and "spiderman" have similarity 1.0, but threshold 1 keeps them apart
+    keys = ["spider man", "spiderman", "der pate part 2", "der pate teil ii", "spider man"]
+    assert similarity(keys[0], keys[1]) == 1.0
+    assert duplicate_groups(keys, 1.0) == [0, 1, 2, 3, 0]
+    assert duplicate_groups(keys, 0.99) == [0, 0, 2, 2, 0]
+
+
+def test_numbers_keep_titles_apart():
+    keys = ["babylon berlin staffel 3", "babylon berlin staffel 4", "terminator 2", "terminator part ii"]
+    assert duplicate_groups(keys, 0.5) == [0, 1, 2, 2]
@@ -0,0 +1,77 @@
+"""
+Konformitaet der HTML-Backends: jedes installierte Backend muss auf den
+gespeicherten Seiten in tests/fixtures/pages dieselben Detaildaten und
+dieselben Detail-Links liefern wie html.parser (die Referenz, immer
+installiert). Nicht installierte Backends werden uebersprungen.
+"""
+
+from pathlib import Path
+
+import pytest
+
+import scraper
+from html_backends import available_parsers, get_backend
+
+PAGES = sorted((Path(__file__).parent / "fixtures" / "pages").glob("*.html"))
+REFERENCE = "html.parser"
+# Invalid markup is repaired differently: lexbor builds the HTML5 tree, which drops a
+# stray <td> in the body so that its text merges with the neighbouring text node (the
+# detail title differs in a line break; the links are the same).
+KNOWN_DETAIL_DIFFERENCES = {("detail_malformed.html", "selectolax")}
+
+
+def _read(page):
+    return page.read_text(encoding="utf-8")
+
+
+def _cases(known=()):
+    for page in PAGES:
+        for parser in available_parsers():
+            if parser == REFERENCE:
+                continue
+            marks = ()
+            if (page.name, parser) in known:
+                marks = pytest.mark.xfail(strict=True, reason="HTML5 tree construction of invalid markup")
+            yield pytest.param(page, parser, id=f"{page.stem}-{parser}", marks=marks)
+
+
+@pytest.mark.parametrize("page, parser", list(_cases(KNOWN_DETAIL_DIFFERENCES)))
+def test_detail_matches_reference(page, parser):
+    html = _read(page)
+    assert scraper.parse_detail_page(html, parser) == scraper.parse_detail_page(html, REFERENCE)
+
+
+@pytest.mark.parametrize("page, parser", list(_cases()))
+def test_links_match_reference(page, parser):
+    html = _read(page)
+    assert (sorted(scraper.extract_item_links_from_month_page(html, parser))
+            == sorted(scraper.extract_item_links_from_month_page(html, REFERENCE)))
+
+
+@pytest.mark.parametrize("page", PAGES, ids=[page.stem for page in PAGES])
+def test_streamed_links_match_reference(page):
+    # the crawl tokenizes listing pages while they load, in arbitrary chunks
+    html = _read(page)
+    chunks = [html[i:i + 7] for i in range(0, len(html), 7)]
+    assert sorted(scraper.iter_item_links(chunks)) == sorted(scraper.extract_item_links_from_month_page(html, REFERENCE))
+
+
+def test_fixtures_cover_the_extraction():
+    # guards against fixtures that compare equal only because nothing is found
+    listing = scraper.extract_item_links_from_month_page(_read(PAGES[0].parent / "calendar_month.html"), REFERENCE)
+    assert sorted(listing) == [
+        "https://bluray-disc.de/blu-ray-filme/100001-dune-part-two-4k",
+        "https://bluray-disc.de/blu-ray-filme/100002-oppenheimer-4k",
+        "https://bluray-disc.de/blu-ray-filme/100004-heat-4k",  # first of two href attributes
+        "https://bluray-disc.de/blu-ray-filme/100005-relativ",
+        "https://bluray-disc.de/blu-ray-news/filme/200003-alien-romulus",
+    ]
+    meta = scraper.parse_detail_page(_read(PAGES[0].parent / "detail_4k_uhd.html"), REFERENCE)
+    assert meta["title"] == "Dune: Part Two 4K(4K UHD + Blu-ray)"
+    assert meta["release_date"].isoformat() == "2026-01-28"
+    assert meta["production_year"] == 2024
+    assert meta["detected_formats"] == ["4k-uhd"]
+
+
+def test_auto_is_the_fastest_installed_backend():
+    assert get_backend("auto") is get_backend(available_parsers()[-1])
@@ -0,0 +1,127 @@
+"""
+Streamender ICS-Writer: Escaping und Zeilenfaltung nach RFC 5545, Einlesen
+mit iter_events() und Gegenprobe mit icalendar (Calendar.from_ical und
+byte-gleiche Ausgabe wie to_ical()).
+"""
+
+import io
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from icalendar import Calendar, Event
+
+from ics_writer import IcsWriter, escape_text, fold_line, iter_calendar, iter_events, unescape_text
+
+STAMP = datetime(2026, 10, 16, 12, 0, 0, tzinfo=timezone.utc)
+ALPHABET = "abcdefghijklmnopqrstuvwxyz ÄÖÜäöüß€😀—é,;:\\\"'\n()[]-/0123456789"
+
+
+def _random_events(seed, count):
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        title = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 200)))
+        dtstart = date(2024, 1, 1) + timedelta(days=rng.randint(0, 1500)) if rng.random() < 0.8 else None
+        events.append({"summary": title, "uid": f"{i}@bluray-disc.de", "dtstamp": STAMP, "dtstart": dtstart,
+                       "description": f"Quelle: https://bluray-disc.de/x/{title[:80]}"})
+    return events
+
+
+def _write(events):
+    buf = io.BytesIO()
+    with IcsWriter(buf) as cal:
+        for event in events:
+            cal.add_event(**event)
+    return buf.getvalue()
+
+
+def _lines(data):
+    assert data.endswith(b"\r\n")
+    return data[:-2].split(b"\r\n")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("a,b", "a\\,b"),
+    ("a;b", "a\\;b"),
+    ("a\\b", "a\\\\b"),
+    ("a\nb", "a\\nb"),
+    ("a\r\nb", "a\\nb"),
+    ("\\,;\n", "\\\\\\,\\;\\n"),
+    ("Über: 3D", "Über: 3D"),
+])
+def test_escape_text(text, expected):
+    assert escape_text(text) == expected
+    assert unescape_text(expected) == text.replace("\r\n", "\n")
+
+
+@pytest.mark.parametrize("char", ["a", "ä", "€", "😀"])
+@pytest.mark.parametrize("length", [1, 60, 74, 75, 76, 150, 400])
+def test_fold_line_limits_octets_and_keeps_utf8(char, length):
+    line = "SUMMARY:" + char * length
+    folded = fold_line(line)
+    lines = _lines(folded)
+    assert all(len(part) <= 75 for part in lines)
+    assert all(part.startswith(b" ") for part in lines[1:])
+    # every physical line is valid UTF-8 on its own: no character is split
+    for part in lines:
+        part.decode("utf-8")
+    assert b"".join(part[1:] if i else part for i, part in enumerate(lines)).decode("utf-8") == line
+
+
+def test_folded_escapes_unfold_to_the_original_text():
+    for offset in range(60, 80):
+        text = "x" * offset + ",;\\\n" * 20
+        data = _write([{"summary": text, "uid": "a@x", "dtstamp": STAMP}])
+        assert all(len(line) <= 75 for line in _lines(data))
+        assert next(iter_events(io.BytesIO(data)))["summary"] == text
+
+
+def test_short_line_is_not_folded():
+    assert fold_line("VERSION:2.0") == b"VERSION:2.0\r\n"
+
+
+def test_iter_events_round_trips_writer_output():
+    events = _random_events(1, 500)
+    for i, event in enumerate(events[::5]):
+        event.update(sequence=i, last_modified=STAMP - timedelta(days=i), status="CANCELLED")
+    data = _write(events)
+
+    expected = [{k: v for k, v in event.items() if v is not None} for event in events]
+    assert list(iter_events(io.BytesIO(data))) == expected
+
+
+def test_iter_calendar_matches_writer():
+    events = _random_events(2, 200)
+    assert b"".join(iter_calendar(events)) == _write(events)
+
+
+def test_icalendar_parses_the_same_events():
+    events = _random_events(3, 1000)
+    data = _write(events)
+    parsed = Calendar.from_ical(data).walk("VEVENT")
+    assert len(parsed) == len(events)
+    for vevent, event in zip(parsed, events):
+        assert str(vevent["SUMMARY"]) == event["summary"]
+        assert str(vevent["UID"]) == event["uid"]
+        assert str(vevent["DESCRIPTION"]) == event["description"]
+        assert vevent.decoded("DTSTAMP") == STAMP
+        dtstart = vevent.get("DTSTART")
+        assert (dtstart.dt if dtstart is not None else None) == event["dtstart"]
+
+
+def test_output_is_byte_identical_to_icalendar():
+    events = _random_events(4, 500)
+    cal = Calendar()
+    cal.add("prodid", "-//BlurayDisc Scraper//de//")
+    cal.add("version", "2.0")
+    for event in events:
+        vevent = Event()
+        vevent.add("summary", event["summary"])
+        if event["dtstart"] is not None:
+            vevent.add("dtstart", event["dtstart"])
+        vevent.add("dtstamp", STAMP)
+        vevent["uid"] = event["uid"]
+        vevent.add("description", event["description"])
+        cal.add_component(vevent)
+    assert _write(events) == cal.to_ical()
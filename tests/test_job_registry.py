@@ -0,0 +1,79 @@
+"""
+JobRegistry: Verweis-Jobs (aus dem Ergebnis-Cache beantwortete Starts)
+verdraengen den Job nicht, auf dessen Eintraege sie zeigen, und halten ihn,
+solange es sie gibt.
+"""
+
+import job_registry
+from job_registry import JobRegistry
+
+ITEMS = [{"title": "Dune: Part Two", "url": "https://bluray-disc.de/blu-ray-filme/1-dune"}]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+def _registry(tmp_path, monkeypatch, max_jobs=2, ttl_hours=1):
+    clock = _Clock()
+    monkeypatch.setattr(job_registry, "time", clock)
+    return JobRegistry(tmp_path, max_jobs=max_jobs, ttl_hours=ttl_hours), clock
+
+
+def _finished(registry, job_id, items=None, source=None):
+    registry.create(job_id, source=source, status="running")
+    registry.finish(job_id, items)
+
+
+def test_references_do_not_evict_their_source(tmp_path, monkeypatch):
+    registry, clock = _registry(tmp_path, monkeypatch)
+    _finished(registry, "result", ITEMS)
+    registry.create("running-1", status="running")
+    for n in range(5):
+        clock.now += 1
+        _finished(registry, f"cached-{n}", source="result")
+    assert registry.items("result") == ITEMS
+    assert registry.evicted_lru == 3  # the oldest references, over their own limit
+    assert [job["id"] for job in registry.stats()["jobs"] if job["source"]] == ["cached-3", "cached-4"]
+
+
+def test_source_is_kept_while_referenced(tmp_path, monkeypatch):
+    registry, clock = _registry(tmp_path, monkeypatch)
+    _finished(registry, "result", ITEMS)
+    _finished(registry, "cached", source="result")
+    for n in range(3):
+        clock.now += 1
+        _finished(registry, f"other-{n}", ITEMS)
+    # the least recently used finished jobs go, except the referenced one
+    assert registry.get("result") is not None
+    assert registry.get("other-0") is None
+    assert registry.get("other-1") is None
+    assert registry.get("other-2") is not None
+
+
+def test_source_expires_after_its_references(tmp_path, monkeypatch):
+    registry, clock = _registry(tmp_path, monkeypatch)
+    _finished(registry, "result", ITEMS)
+    clock.now += 1800
+    _finished(registry, "cached", source="result")
+    clock.now += 2400
+    # "result" is past its TTL but still referenced
+    registry.create("next", status="running")
+    assert registry.get("result") is not None
+    clock.now += 3700
+    registry.create("later", status="running")
+    assert registry.get("cached") is None
+    assert registry.get("result") is None
+
+
+def test_other_jobs_still_evicted_over_max_jobs(tmp_path, monkeypatch):
+    registry, clock = _registry(tmp_path, monkeypatch)
+    for n in range(4):
+        clock.now += 1
+        _finished(registry, f"job-{n}", ITEMS)
+    assert [job["id"] for job in registry.stats()["jobs"]] == ["job-2", "job-3"]
+    assert registry.evicted_lru == 2
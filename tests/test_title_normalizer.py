@@ -0,0 +1,84 @@
+"""
+Aequivalenz von normalize_title() mit der frueheren Inline-Normalisierung
+(bis dahin gleichlautend in scrape() und web_ui.run_scraper(), im Browser als
+normalizeTitle()): echte Titel mit Umlauten, Editionszusaetzen und
+Satzzeichen sowie zufaellig zusammengesetzte Titel muessen denselben
+Dedup-Schluessel ergeben.
+"""
+
+import random
+import re
+
+import pytest
+
+from title_normalizer import normalize_title
+
+
+def _legacy_normalize(t):
+    # verbatim copy of the former inline implementation
+    if not t:
+        return ""
+    s = t.lower()
+    s = s.replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue').replace('ß', 'ss')
+    s = re.sub(r"\([^)]*\)", ' ', s)
+    s = re.sub(r"\[[^]]*\]", ' ', s)
+    s = re.sub(r'\b\d+\s*blu[\s-]?rays?\b', ' ', s)
+    s = re.sub(r'\bblu[\s-]?ray\s*disc\b', ' ', s)
+    s = re.sub(r'\bblu[\s-]?rays?\b', ' ', s)
+    s = re.sub(r'\b\d+k\b', ' ', s)
+    s = re.sub(r'\buhd\b', ' ', s)
+    s = re.sub(r'\bdvd\b', ' ', s)
+    tokens = [
+        'limited', 'steelbook', 'mediabook', 'wattierte', 'amaray',
+        'cover', 'edition', 'soundtrack', 'cd', 'deluxe', 'collector',
+        'exclusive', 'special', 'uncut', 'extended', 'directors cut',
+    ]
+    for tok in tokens:
+        s = re.sub(r'\b' + re.escape(tok) + r'\b', ' ', s)
+    s = re.sub(r'[^a-z0-9\-\s]', ' ', s)
+    s = re.sub(r'[-\s]+', ' ', s)
+    return s.strip()
+
+
+FILMS = [
+    "Dune: Part Two", "Oppenheimer", "Der Herr der Ringe - Die Gefährten", "Alien: Romulus",
+    "Gladiator II", "Das Boot", "Babylon Berlin - Staffel 4", "The Walking Dead - Die komplette Serie",
+    "Avatar: Aufbruch nach Pandora 3D", "Mad Max: Furiosa", "Blade Runner 2049",
+    "Jäger des verlorenen Schatzes", "Terminator 2 - Tag der Abrechnung", "Spaß mit Flaggen",
+    "Die Schöne und das Biest", "Ödipussi", "Über den Dächern von Nizza", "2001: Odyssee im Weltraum",
+    "12 Monkeys", "Se7en", "Léon - Der Profi", "Amélie", "Zurück in die Zukunft",
+    "M - Eine Stadt sucht einen Mörder", "Good Bye, Lenin!", "Das weiße Band", "Director's Cut Collection",
+    "The Collector", "Uncut Gems", "Special Forces", "Cover Girl", "8K Wonderland", "Dvd-Ära",
+]
+EDITIONS = [
+    "", " (Steelbook)", " 4K (4K UHD + Blu-ray)", " (Limited Mediabook) (Cover A)", " - Limited Edition",
+    " (2 Blu-rays)", " [Import]", " 4K Ultra HD", " (Blu-ray Disc)", " - Collector's Edition",
+    " (Special Edition) (2 DVDs)", " Directors Cut", " (Wattierte Box)", " Amaray",
+    " - Extended Edition 3 Blu-rays", " (4K UHD) [Steelbook]", " (+ Soundtrack CD)", " Uncut",
+    " - Deluxe Edition (Cover B", " Exclusive]", " (3D Blu-ray + Blu-ray)", " – Ultimate Edition",
+    "  ", " 4k-uhd blu-ray",
+]
+TITLES = [film + edition for film in FILMS for edition in EDITIONS] + ["", None]
+
+
+@pytest.mark.parametrize("title", TITLES)
+def test_matches_legacy_normalization(title):
+    assert normalize_title(title) == _legacy_normalize(title)
+
+
+def test_matches_legacy_normalization_on_random_titles():
+    # fragments that exercise the order of the patterns: brackets, format words at
+    # word boundaries, umlauts, non-ascii letters and separators
+    fragments = ["(", ")", "[", "]", " ", "-", "2", "4", "k", "blu", "ray", "rays", "disc", "uhd",
+                 "dvd", "cd", "edition", "directors", "cut", "ä", "ß", "é", "x", "limited", "s",
+                 "\t", "_", "'", "3", "2k", "Blu-Ray", "UHD", "Ä", "²", "İ"]
+    rnd = random.Random(7)
+    for _ in range(20000):
+        title = "".join(rnd.choice(fragments) + rnd.choice(["", " ", "-"]) for _ in range(rnd.randint(1, 14)))
+        assert normalize_title(title) == _legacy_normalize(title), title
+
+
+def test_examples():
+    assert normalize_title("Jäger des verlorenen Schatzes 4K (4K UHD + Blu-ray)") == "jaeger des verlorenen schatzes"
+    assert normalize_title("Dune: Part Two - Limited Steelbook Edition") == "dune part two"
+    assert normalize_title("Spaß mit Flaggen [Import] 2 Blu-rays") == "spass mit flaggen"
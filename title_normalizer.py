@@ -0,0 +1,53 @@
+"""
+Titel-Normalisierung fuer die Duplikaterkennung (Scraper und Web-UI).
+
+normalize_title() entfernt Klammerzusaetze, Format- und Editionsangaben
+(4K/UHD/Blu-ray/Steelbook/Mediabook/...) und Sonderzeichen, sodass z.B.
+"Dune (Steelbook) 4K UHD" und "Dune - Limited Edition" denselben Schluessel
+bekommen. Die Muster sind vorkompiliert und zu wenigen Durchlaeufen
+zusammengefasst; Ergebnisse werden in einem LRU-Cache gehalten.
+"""
+
+import re
+from functools import lru_cache
+
+# German umlauts to ascii-ish equivalents
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+# Parenthetical and bracketed parts (e.g. "(Cover A)", "[Import]"). Two separate passes
+# on purpose: with mixed, unbalanced brackets the result depends on the order.
+_PARENS_RE = re.compile(r"\([^)]*\)")
+_BRACKETS_RE = re.compile(r"\[[^]]*\]")
+
+# Format variants and edition tokens as one alternation. The order matters where
+# alternatives can start at the same position: multi-word forms come first.
+_EDITION_TOKENS = (
+    "limited", "steelbook", "mediabook", "wattierte", "amaray",
+    "cover", "edition", "soundtrack", "cd", "deluxe", "collector",
+    "exclusive", "special", "uncut", "extended", "directors cut",
+)
+_FORMAT_WORDS_RE = re.compile(
+    r"\b(?:"
+    r"\d+\s*blu[\s-]?rays?"     # "2 Blu-ray", "2 Blu-rays"
+    r"|blu[\s-]?ray\s*disc"
+    r"|blu[\s-]?rays?"
+    r"|\d+k"                    # "4k", "8k"
+    r"|uhd|dvd|"
+    + "|".join(re.escape(tok) for tok in _EDITION_TOKENS)
+    + r")\b"
+)
+
+# everything except ascii letters and digits separates words
+_SEPARATORS_RE = re.compile(r"[^a-z0-9]+")
+
+
+@lru_cache(maxsize=8192)
+def normalize_title(title):
+    """Dedup key of a title: lowercase ascii words without format/edition noise."""
+    if not title:
+        return ""
+    s = title.lower().translate(_UMLAUTS)
+    s = _PARENS_RE.sub(" ", s)
+    s = _BRACKETS_RE.sub(" ", s)
+    s = _FORMAT_WORDS_RE.sub(" ", s)
+    return _SEPARATORS_RE.sub(" ", s).strip()
@@ -8,43 +8,81 @@ import json
 import os
 import sys
 import threading
+import time
 import uuid
-import queue
-import logging
-import subprocess
 import webbrowser
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime
+from urllib.parse import quote
+from datetime import date, datetime, timezone
 
 from flask import Flask, render_template_string, request, jsonify, Response, send_from_directory
-
-# Ensure PyInstaller bundles scraper dependencies (imported here so
-# PyInstaller sees them during analysis; the actual scraper module is
-# imported lazily in _run_scraper_inprocess).
-try:
-    import requests  # noqa: F401
-    import bs4  # noqa: F401
-    import icalendar  # noqa: F401
-except ImportError as _e:
-    print(f"WARNING: Fehlende Abhaengigkeit: {_e}")
+from werkzeug.http import http_date
+
+import scraper
+from title_normalizer import normalize_title
+from fuzzy_dedup import duplicate_groups, DEFAULT_THRESHOLD
+from ics_writer import IcsWriter, event_uid, iter_calendar
+from feed_cache import FeedCache, FEED_DIR, DEFAULT_REFRESH_MINUTES, RETRY_AFTER
+from scheduler import PrewarmScheduler, DEFAULT_INTERVAL_MINUTES, DEFAULT_JITTER
+from event_log import EventLog, coalesce
+from live_preview import LivePreview
+from preview_query import PreviewViews, CATEGORY_PRIORITY, SORT_FIELDS, select
+from result_cache import ResultCache, form_key, DEFAULT_TTL_MINUTES
+from job_registry import JobRegistry, JOB_DIR, DEFAULT_MAX_JOBS, DEFAULT_TTL_HOURS, DEFAULT_MEMORY_MB
+from metrics import Metrics
 
 app = Flask(__name__)
 
-# Directory where this script lives (and where scraper.py / output files are)
-# When running as PyInstaller bundle, bundled data files are in sys._MEIPASS,
-# but we want config and output files next to the .exe (sys.executable's dir).
+# Directory where config, caches and output files are kept: next to this script,
+# or next to the .exe (sys.executable's dir) when running as PyInstaller bundle.
 if getattr(sys, 'frozen', False):
     # Running as compiled exe
-    BUNDLE_DIR = Path(sys._MEIPASS)  # bundled scraper.py lives here
-    BASE_DIR = Path(sys.executable).resolve().parent  # config + output go here
+    BASE_DIR = Path(sys.executable).resolve().parent
 else:
-    BUNDLE_DIR = Path(__file__).resolve().parent
-    BASE_DIR = BUNDLE_DIR
+    BASE_DIR = Path(__file__).resolve().parent
 
 CONFIG_PATH = BASE_DIR / "config.json"
 
-# Active jobs: job_id -> { "queue": Queue, "status": "running"|"done"|"error", "output_file": str }
-jobs = {}
+# Site the calendar pages are loaded from
+SITE_BASE = "https://bluray-disc.de"
+CALENDAR_TEMPLATE = f"{SITE_BASE}/{{category}}/kalender?id={{year}}-{{month:02d}}"
+
+# Streamed /generate-ics responses are sent in pieces of about this many bytes
+ICS_CHUNK_SIZE = 64 * 1024
+
+# /stream sends the events of a job in batches, at most one SSE frame per this many seconds
+SSE_FLUSH_INTERVAL = 0.25
+# The live preview deltas of a finished job are dropped from its event log after this many
+# seconds; clients that connect later load the items with /jobs/<id>/items
+PREVIEW_DELTA_GRACE = 60
+
+# Finished preview results and running jobs by normalized form data (see result_cache)
+_results = ResultCache()
+# Filtered/sorted orders of preview items for /jobs/<id>/items (see preview_query)
+_views = PreviewViews()
+
+# Scraper sub-jobs (one per calendar year, covering all categories) of ALL web jobs share this pool,
+# so "max_parallel_jobs" is a global limit. Created lazily from the config.
+_subjob_pool = None
+_subjob_pool_lock = threading.Lock()
+# One adaptive rate limiter for all sub-jobs: they all hit the same site, so a 429 or
+# slow responses seen by one job slow down the others as well.
+_throttle = scraper.AdaptiveThrottle()
+# Scraper metrics of all runs of this process (sub-jobs, feeds, pre-warming), see /metrics
+_metrics = Metrics()
+
+def _get_subjob_pool():
+    global _subjob_pool
+    with _subjob_pool_lock:
+        if _subjob_pool is None:
+            try:
+                workers = max(1, int(load_config().get("max_parallel_jobs", 3)))
+            except (TypeError, ValueError):
+                workers = 3
+            _subjob_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="subjob")
+        return _subjob_pool
 
 # ---------------------------------------------------------------------------
 # Config helpers
@@ -58,6 +96,21 @@ DEFAULT_CONFIG = {
     "production_years": "",
     "ignore_production": True,
     "output_pattern": "bluray_{year}_{months}.ics",
+    "parser": "auto",
+    "max_parallel_jobs": 3,
+    # similarity from which the preview marks titles as duplicates (1 = exact titles only)
+    "fuzzy_threshold": DEFAULT_THRESHOLD,
+    # /feed/<category>/<year>.ics is re-crawled in the background when older than this
+    "feed_refresh_minutes": DEFAULT_REFRESH_MINUTES,
+    # background crawl of the configured years/categories into the HTTP cache (0 = off)
+    "prewarm_interval_minutes": DEFAULT_INTERVAL_MINUTES,
+    # identical /start requests within this time are answered from the result cache
+    "result_cache_minutes": DEFAULT_TTL_MINUTES,
+    # finished jobs are dropped after this many idle hours or beyond "max_jobs";
+    # preview items are kept on disk and only up to "job_memory_mb" in memory
+    "max_jobs": DEFAULT_MAX_JOBS,
+    "job_ttl_hours": DEFAULT_TTL_HOURS,
+    "job_memory_mb": DEFAULT_MEMORY_MB,
 }
 
 def load_config():
@@ -78,6 +131,31 @@ def save_config(cfg):
     with open(CONFIG_PATH, "w", encoding="utf-8") as f:
         json.dump(cfg, f, indent=2, ensure_ascii=False)
 
+
+def _job_registry():
+    cfg = load_config()
+    try:
+        return JobRegistry(BASE_DIR / JOB_DIR, max_jobs=max(1, int(cfg.get("max_jobs", DEFAULT_MAX_JOBS))),
+                           ttl_hours=float(cfg.get("job_ttl_hours", DEFAULT_TTL_HOURS)),
+                           memory_mb=float(cfg.get("job_memory_mb", DEFAULT_MEMORY_MB)))
+    except (TypeError, ValueError):
+        return JobRegistry(BASE_DIR / JOB_DIR)
+
+
+def _fuzzy_threshold(value):
+    """Similarity threshold of the near-duplicate grouping, in (0, 1]; DEFAULT_THRESHOLD
+    for a missing, non-numeric or non-positive value."""
+    try:
+        threshold = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_THRESHOLD
+    return min(threshold, 1.0) if threshold > 0 else DEFAULT_THRESHOLD
+
+
+# Jobs: job_id -> { "events": EventLog, "status": "running"|"preview"|"error", "output_file": str },
+# finished ones are evicted (see job_registry); their preview items are fetched with _jobs.items()
+_jobs = _job_registry()
+
 # ---------------------------------------------------------------------------
 # Categories
 # ---------------------------------------------------------------------------
@@ -90,6 +168,9 @@ CATEGORIES = {
     "blu-ray-importe": "Importe",
 }
 
+# Years offered by the year pickers; feeds exist only for these calendar years
+YEARS = range(1950, 2029)
+
 # ---------------------------------------------------------------------------
 # HTML Template
 # ---------------------------------------------------------------------------
@@ -293,6 +374,14 @@ HTML_TEMPLATE = r"""
     height: 100%; background: var(--accent); border-radius: 2px;
     width: 0%; transition: width 0.3s;
   }
+  .subjob-list { display: flex; flex-wrap: wrap; gap: 6px; margin-bottom: 12px; }
+  .subjob {
+    font-size: 0.72rem; padding: 3px 9px; border-radius: 12px;
+    background: var(--surface2); border: 1px solid var(--border); color: var(--text-muted);
+  }
+  .subjob.running { border-color: var(--accent); color: var(--accent); }
+  .subjob.done { border-color: rgba(52,211,153,0.4); color: var(--success); }
+  .subjob.error { border-color: rgba(248,113,113,0.4); color: var(--error); }
   .log-output {
     background: #0d0f14; border: 1px solid var(--border); border-radius: 8px;
     padding: 14px; font-family: 'Cascadia Code', 'Fira Code', 'Consolas', monospace;
@@ -312,6 +401,8 @@ HTML_TEMPLATE = r"""
     display: flex; align-items: center; gap: 10px; margin-bottom: 10px; flex-wrap: wrap;
   }
   .preview-toolbar .count { color: var(--text-muted); font-size: 0.85rem; margin-left: auto; }
+  .preview-toolbar .cached { color: var(--text-muted); font-size: 0.85rem; }
+  .preview-toolbar .cached a { color: inherit; }
   .preview-btn {
     padding: 6px 14px; border: 1px solid var(--border); border-radius: 6px;
     background: var(--surface2); color: var(--text-muted); cursor: pointer;
@@ -327,7 +418,7 @@ HTML_TEMPLATE = r"""
     border-radius: 8px; background: #0d0f14;
   }
   .preview-table {
-    width: 100%; border-collapse: collapse; font-size: 0.82rem;
+    width: 100%; border-collapse: collapse; font-size: 0.82rem; table-layout: fixed;
   }
   .preview-table th {
     position: sticky; top: 0; background: var(--surface2);
@@ -348,6 +439,17 @@ HTML_TEMPLATE = r"""
   .preview-table .col-date { width: 100px; white-space: nowrap; }
   .preview-table .col-year { width: 60px; text-align: center; }
   .preview-table .col-cat { width: 90px; font-size: 0.75rem; color: var(--text-muted); }
+  /* one line per row: the virtualized table needs rows of equal height */
+  .preview-table .col-title { overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }
+  .preview-table tr.spacer td { padding: 0; border: 0; }
+  .preview-table th[data-sort] { cursor: pointer; user-select: none; }
+  .preview-table th[data-dir="asc"]::after { content: " \25B2"; }
+  .preview-table th[data-dir="desc"]::after { content: " \25BC"; }
+  .preview-table tr.loading td { color: var(--text-muted); }
+  .preview-search {
+    background: var(--surface2); border: 1px solid var(--border); color: var(--text);
+    border-radius: 6px; padding: 5px 8px; font-size: 0.8rem; width: 160px;
+  }
   .preview-table .title-link {
     color: var(--accent); text-decoration: none;
   }
@@ -518,6 +620,7 @@ HTML_TEMPLATE = r"""
     <div class="progress-bar-container">
       <div class="progress-bar" id="progress-bar"></div>
     </div>
+    <div class="subjob-list" id="subjob-list"></div>
     <div class="log-output" id="log-output"><span class="log-info">Bereit. Wähle Einstellungen und klicke "Scraping starten".</span>
 </div>
     <div class="preview-section" id="preview-section">
@@ -525,17 +628,19 @@ HTML_TEMPLATE = r"""
         <button class="preview-btn" onclick="selectAllPreview(true)">Alle</button>
         <button class="preview-btn" onclick="selectAllPreview(false)">Keine</button>
         <label class="dedup-toggle"><input type="checkbox" id="dedup-toggle" onchange="toggleDedup(this.checked)"> Duplikate markieren</label>
+        <input type="search" class="preview-search" id="preview-search" placeholder="Titel suchen" oninput="onPreviewSearch(this)">
         <span class="count" id="preview-count"></span>
+        <span class="cached" id="preview-cached" style="display:none"></span>
         <button class="preview-btn primary" onclick="generateICS()">ICS erstellen</button>
       </div>
-      <div class="preview-table-wrap">
+      <div class="preview-table-wrap" id="preview-wrap" onscroll="schedulePreviewRender()">
         <table class="preview-table">
           <thead><tr>
             <th class="col-cb"><input type="checkbox" id="preview-select-all" checked onchange="selectAllPreview(this.checked)"></th>
-            <th>Titel</th>
-            <th class="col-date">Release</th>
-            <th class="col-year">Prod.</th>
-            <th class="col-cat">Kategorie</th>
+            <th class="col-title" data-sort="title" onclick="sortPreview('title')">Titel</th>
+            <th class="col-date" data-sort="release_date" onclick="sortPreview('release_date')">Release</th>
+            <th class="col-year" data-sort="production_year" onclick="sortPreview('production_year')">Prod.</th>
+            <th class="col-cat" data-sort="category" onclick="sortPreview('category')">Kategorie</th>
           </tr></thead>
           <tbody id="preview-body"></tbody>
         </table>
@@ -678,8 +783,9 @@ function saveConfig() {
   });
 }
 
-function startScraping() {
+function startScraping(refresh) {
   const data = getFormData();
+  if (refresh) data.refresh = true;  // bypass the server's result cache
   if (!data.calendar_years) {
     alert("Bitte mindestens ein Kalender-Jahr auswählen!");
     return;
@@ -697,17 +803,16 @@ function startScraping() {
   const progressBar = document.getElementById("progress-bar");
   const badge = document.getElementById("status-badge");
   const dlRow = document.getElementById("download-row");
-  const previewSection = document.getElementById("preview-section");
 
   logOutput.innerHTML = "";
+  document.getElementById("subjob-list").innerHTML = "";
   progressBar.style.width = "0%";
   badge.style.display = "";
   badge.className = "status-badge status-running";
   badge.textContent = "Läuft...";
   dlRow.classList.remove("visible");
   dlRow.innerHTML = "";
-  previewSection.classList.remove("visible");
-  window._previewItems = [];
+  resetPreview();
 
   fetch("/start", {
     method: "POST",
@@ -721,47 +826,62 @@ function startScraping() {
       return;
     }
     const es = new EventSource("/stream/" + d.job_id);
+    es.onopen = function() {
+      if (badge.textContent === "Verbinde neu...") badge.textContent = "Läuft...";
+    };
     es.onmessage = function(ev) {
-      const msg = JSON.parse(ev.data);
-      if (msg.type === "log") {
-        appendLog(msg.text, msg.level || "info");
-      } else if (msg.type === "progress") {
-        progressBar.style.width = msg.percent + "%";
-      } else if (msg.type === "preview") {
-        es.close();
-        badge.className = "status-badge status-done";
-        badge.textContent = "Vorschau";
-        progressBar.style.width = "100%";
-        btn.disabled = false;
-        btn.textContent = "Scraping starten";
-        showPreview(msg.items || []);
-      } else if (msg.type === "done") {
-        es.close();
-        badge.className = "status-badge status-done";
-        badge.textContent = "Fertig";
-        progressBar.style.width = "100%";
-        btn.disabled = false;
-        btn.textContent = "Scraping starten";
-        if (msg.files && msg.files.length > 0) {
-          msg.files.forEach(f => {
-            const a = document.createElement("a");
-            a.className = "download-btn";
-            a.href = "/download/" + encodeURIComponent(f);
-            a.innerHTML = '<svg width="18" height="18" fill="none" stroke="currentColor" stroke-width="2" viewBox="0 0 24 24"><path d="M21 15v4a2 2 0 01-2 2H5a2 2 0 01-2-2v-4M7 10l5 5 5-5M12 15V3"/></svg> ' + f;
-            dlRow.appendChild(a);
-          });
-          dlRow.classList.add("visible");
+      // each frame is a batch of events; its log lines go into the DOM in one step
+      const msgs = JSON.parse(ev.data);
+      appendLogLines(msgs.filter(msg => msg.type === "log"));
+      msgs.forEach(msg => {
+        if (msg.type === "progress") {
+          progressBar.style.width = msg.percent + "%";
+        } else if (msg.type === "subjob") {
+          updateSubjob(msg);
+        } else if (msg.type === "items") {
+          applyItemDelta(msg);
+        } else if (msg.type === "preview") {
+          es.close();
+          badge.className = "status-badge status-done";
+          badge.textContent = "Vorschau";
+          progressBar.style.width = "100%";
+          btn.disabled = false;
+          btn.textContent = "Scraping starten";
+          finishPreview(msg);
+        } else if (msg.type === "done") {
+          es.close();
+          badge.className = "status-badge status-done";
+          badge.textContent = "Fertig";
+          progressBar.style.width = "100%";
+          btn.disabled = false;
+          btn.textContent = "Scraping starten";
+          if (msg.files && msg.files.length > 0) {
+            msg.files.forEach(f => {
+              const a = document.createElement("a");
+              a.className = "download-btn";
+              a.href = "/download/" + encodeURIComponent(f);
+              a.innerHTML = '<svg width="18" height="18" fill="none" stroke="currentColor" stroke-width="2" viewBox="0 0 24 24"><path d="M21 15v4a2 2 0 01-2 2H5a2 2 0 01-2-2v-4M7 10l5 5 5-5M12 15V3"/></svg> ' + f;
+              dlRow.appendChild(a);
+            });
+            dlRow.classList.add("visible");
+          }
+        } else if (msg.type === "error") {
+          es.close();
+          badge.className = "status-badge status-error";
+          badge.textContent = "Fehler";
+          btn.disabled = false;
+          btn.textContent = "Scraping starten";
+          appendLog(msg.text || "Unbekannter Fehler", "error");
         }
-      } else if (msg.type === "error") {
-        es.close();
-        badge.className = "status-badge status-error";
-        badge.textContent = "Fehler";
-        btn.disabled = false;
-        btn.textContent = "Scraping starten";
-        appendLog(msg.text || "Unbekannter Fehler", "error");
-      }
+      });
     };
     es.onerror = function() {
+      // the browser reconnects on its own and resumes via Last-Event-ID;
+      // only a stream it gave up on (e.g. job no longer known) is lost
+      if (es.readyState !== EventSource.CLOSED) {
+        badge.textContent = "Verbinde neu...";
+        return;
+      }
       es.close();
       badge.className = "status-badge status-error";
       badge.textContent = "Verbindung verloren";
@@ -775,36 +895,278 @@ function startScraping() {
   });
 }
 
+function updateSubjob(msg) {
+  const list = document.getElementById("subjob-list");
+  let el = document.getElementById("subjob-" + msg.id);
+  if (!el) {
+    el = document.createElement("span");
+    el.id = "subjob-" + msg.id;
+    list.appendChild(el);
+  }
+  el.className = "subjob " + msg.status;
+  const labels = {queued: "wartet", running: "läuft", done: "fertig", error: "Fehler"};
+  let text = msg.label + ": " + (labels[msg.status] || msg.status);
+  if (msg.status === "done") text += " (" + msg.items + ")";
+  else if (msg.status === "running" && msg.details) text += " (" + msg.details + " Detailseiten)";
+  el.textContent = text;
+}
+
 function appendLog(text, level) {
+  appendLogLines([{text: text, level: level}]);
+}
+
+function appendLogLines(lines) {
+  if (!lines.length) return;
   const el = document.getElementById("log-output");
-  const span = document.createElement("span");
-  span.className = "log-" + (level || "info");
-  span.textContent = text + "\n";
-  el.appendChild(span);
+  const frag = document.createDocumentFragment();
+  lines.forEach(line => {
+    const span = document.createElement("span");
+    span.className = "log-" + (line.level || "info");
+    span.textContent = line.text + "\n";
+    frag.appendChild(span);
+  });
+  el.appendChild(frag);
   el.scrollTop = el.scrollHeight;
 }
 
 // ---- Preview table logic ----
-function showPreview(items) {
-  window._previewItems = items;
-  const body = document.getElementById("preview-body");
-  body.innerHTML = "";
-  items.forEach((item, idx) => {
-    const tr = document.createElement("tr");
-    const dateStr = item.release_date || "—";
-    const prodStr = item.production_year || "—";
-    const catStr = item.category || "";
-    tr.innerHTML =
-      '<td class="col-cb"><input type="checkbox" checked data-idx="' + idx + '" onchange="onPreviewCheck(this)"></td>' +
-      '<td><a class="title-link" href="' + (item.url || '#') + '" target="_blank" rel="noopener">' + escHtml(item.title || "Unbekannt") + '</a><span class="dup-badge">Duplikat</span></td>' +
-      '<td class="col-date">' + dateStr + '</td>' +
-      '<td class="col-year">' + prodStr + '</td>' +
-      '<td class="col-cat">' + escHtml(catStr) + '</td>';
-    body.appendChild(tr);
-  });
+// The table is virtualized: only the rows in view are in the DOM. While a job runs,
+// its rows come from the live deltas (window._previewItems); once it is done they are
+// loaded page by page from /jobs/<id>/items, searched and sorted by the server.
+// Selection and duplicate marks are sets of item ids.
+var _previewJob = null;          // job whose items are shown
+var _previewLive = true;         // rows from the live deltas (job still running)
+var _previewById = {};
+var _previewDeltas = 0;          // live deltas applied since the job started
+var _previewComplete = true;     // false once a delta referred to an unknown item
+var _previewCount = 0;           // all items of the job
+var _previewTotal = 0;           // rows of the current view (after the search)
+var _previewRows = {};           // view index -> item, pages loaded so far
+var _previewPending = {};        // page number -> true while it is loading
+var _previewQuery = {q: "", sort: ""};
+var _previewVersion = 0;         // changes with every new view; late pages are ignored
+var _selectAll = true;           // selected: all but _selectionExceptions, or only those
+var _selectionExceptions = new Set();
+var _dupIds = new Set();
+var _previewRowHeight = 33;      // px, measured after the first render
+var _previewRenderPending = false;
+var _previewSearchTimer = null;
+var PREVIEW_OVERSCAN = 10;       // rows rendered above and below the visible ones
+var PREVIEW_PAGE = 200;          // rows per request
+
+function resetPreview() {
+  _previewJob = null;
+  _previewLive = true;
+  window._previewItems = [];
+  _previewById = {};
+  _previewDeltas = 0;
+  _previewComplete = true;
+  _previewCount = 0;
+  _previewTotal = 0;
+  _previewRows = {};
+  _previewPending = {};
+  _previewQuery = {q: "", sort: ""};
+  _previewVersion++;
+  _selectAll = true;
+  _selectionExceptions = new Set();
+  _dupIds = new Set();
+  document.getElementById("preview-search").value = "";
+  updateSortMarkers();
+  document.getElementById("preview-section").classList.remove("visible");
+  document.getElementById("preview-cached").style.display = "none";
   document.getElementById("preview-select-all").checked = true;
+  document.getElementById("preview-wrap").scrollTop = 0;
+  schedulePreviewRender();
+}
+
+// Live delta of a running job: "remove" ids, then "add" items; the last delta of a
+// job sets the final list ("order" of ids, items not in it are dropped) and the
+// duplicate "groups".
+function applyItemDelta(msg) {
+  _previewDeltas++;
+  if (msg.remove) {
+    const removed = {};
+    msg.remove.forEach(id => {
+      removed[id] = true;
+      delete _previewById[id];
+      _selectionExceptions.delete(id);
+    });
+    window._previewItems = window._previewItems.filter(item => !removed[item.id]);
+  }
+  if (msg.add) {
+    msg.add.forEach(item => {
+      _previewById[item.id] = item;
+      window._previewItems.push(item);
+    });
+    document.getElementById("preview-section").classList.add("visible");
+  }
+  if (msg.order) {
+    const rows = [];
+    const byId = {};
+    msg.order.forEach((id, i) => {
+      const item = _previewById[id];
+      if (!item) { _previewComplete = false; return; }
+      item.dup_group = msg.groups[i];
+      rows.push(item);
+      byId[id] = item;
+    });
+    window._previewItems = rows;
+    _previewById = byId;
+  }
+  _previewCount = _previewTotal = window._previewItems.length;
   updatePreviewCount();
+  schedulePreviewRender();
+}
+
+// End of a job: from now on the rows come from the server. The visible live rows are
+// kept as the first page when they are complete, so the table does not flicker.
+function finishPreview(msg) {
+  const live = window._previewItems;
+  const complete = msg.deltas !== undefined && msg.deltas === _previewDeltas && _previewComplete;
+  _previewJob = msg.job;
+  _previewLive = false;
+  _previewCount = _previewTotal = msg.count;
+  _previewRows = {};
+  _previewPending = {};
+  _previewVersion++;
+  if (complete && !_previewQuery.q && !_previewQuery.sort) {
+    const end = Math.min(live.length, visiblePreviewRange().last);
+    for (let idx = 0; idx < end; idx++) _previewRows[idx] = live[idx];
+  } else {
+    _selectionExceptions = new Set();
+  }
+  window._previewItems = [];
+  _previewById = {};
+  showCachedMarker(msg.cached_at);
   document.getElementById("preview-section").classList.add("visible");
+  if (document.getElementById("dedup-toggle").checked) markDuplicates();
+  updatePreviewCount();
+  schedulePreviewRender();
+}
+
+function showCachedMarker(cachedAt) {
+  const cached = document.getElementById("preview-cached");
+  if (cachedAt) {
+    cached.innerHTML = "Stand " + new Date(cachedAt * 1000).toLocaleTimeString("de-DE") +
+      ' (Cache) &middot; <a href="#" onclick="startScraping(true); return false;">neu laden</a>';
+    cached.style.display = "";
+  } else {
+    cached.style.display = "none";
+  }
+}
+
+function previewItemsUrl(params) {
+  return "/jobs/" + encodeURIComponent(_previewJob) + "/items?" + new URLSearchParams(params);
+}
+
+function loadPreviewPage(page) {
+  if (_previewPending[page] || !_previewJob) return;
+  _previewPending[page] = true;
+  const version = _previewVersion;
+  fetch(previewItemsUrl({offset: page * PREVIEW_PAGE, limit: PREVIEW_PAGE,
+                         q: _previewQuery.q, sort: _previewQuery.sort}))
+    .then(r => r.json().then(d => {
+      if (!r.ok) throw new Error(d.error || ("HTTP " + r.status));
+      if (version !== _previewVersion) return;
+      delete _previewPending[page];
+      _previewTotal = d.total;
+      _previewCount = d.count;
+      d.items.forEach((item, i) => { _previewRows[d.offset + i] = item; });
+      updatePreviewCount();
+      schedulePreviewRender();
+    })).catch(err => {
+      if (version === _previewVersion) appendLog("Fehler: " + err.message, "error");
+    });
+}
+
+function previewRow(idx) {
+  if (_previewLive) return window._previewItems[idx];
+  const item = _previewRows[idx];
+  if (!item) loadPreviewPage(Math.floor(idx / PREVIEW_PAGE));
+  return item;
+}
+
+// Search and sort are done by the server; while the job is running they are only
+// remembered and applied when it is done.
+function setPreviewQuery(q, sort) {
+  _previewQuery = {q: q, sort: sort};
+  updateSortMarkers();
+  if (_previewLive) return;
+  _previewRows = {};
+  _previewPending = {};
+  _previewVersion++;
+  document.getElementById("preview-wrap").scrollTop = 0;
+  loadPreviewPage(0);
+}
+
+function onPreviewSearch(input) {
+  clearTimeout(_previewSearchTimer);
+  _previewSearchTimer = setTimeout(() => setPreviewQuery(input.value.trim(), _previewQuery.sort), 250);
+}
+
+// header click: ascending, descending, list order
+function sortPreview(field) {
+  const sort = _previewQuery.sort === field ? "-" + field : (_previewQuery.sort === "-" + field ? "" : field);
+  setPreviewQuery(_previewQuery.q, sort);
+}
+
+function updateSortMarkers() {
+  document.querySelectorAll(".preview-table th[data-sort]").forEach(th => {
+    const field = th.dataset.sort;
+    th.dataset.dir = _previewQuery.sort === field ? "asc" : (_previewQuery.sort === "-" + field ? "desc" : "");
+  });
+}
+
+// many deltas or pages per frame, one render
+function schedulePreviewRender() {
+  if (_previewRenderPending) return;
+  _previewRenderPending = true;
+  requestAnimationFrame(() => {
+    _previewRenderPending = false;
+    renderPreview();
+  });
+}
+
+function visiblePreviewRange() {
+  const wrap = document.getElementById("preview-wrap");
+  const total = _previewTotal;
+  const first = Math.min(total, Math.max(0, Math.floor(wrap.scrollTop / _previewRowHeight) - PREVIEW_OVERSCAN));
+  const last = Math.min(total, Math.ceil((wrap.scrollTop + wrap.clientHeight) / _previewRowHeight) + PREVIEW_OVERSCAN);
+  return {first: first, last: Math.max(first, last)};
+}
+
+function renderPreview() {
+  const body = document.getElementById("preview-body");
+  const range = visiblePreviewRange();
+  let html = spacerRow(range.first * _previewRowHeight);
+  for (let idx = range.first; idx < range.last; idx++) html += previewRowHtml(previewRow(idx));
+  html += spacerRow((_previewTotal - range.last) * _previewRowHeight);
+  body.innerHTML = html;
+  const tr = body.querySelector("tr[data-id]");
+  if (tr && tr.offsetHeight && tr.offsetHeight !== _previewRowHeight) {
+    _previewRowHeight = tr.offsetHeight;
+    schedulePreviewRender();
+  }
+}
+
+function spacerRow(height) {
+  return height > 0 ? '<tr class="spacer"><td colspan="5" style="height:' + height + 'px"></td></tr>' : "";
+}
+
+function previewRowHtml(item) {
+  if (!item) {
+    // page still loading
+    return '<tr class="loading"><td class="col-cb"></td><td class="col-title">…</td><td class="col-date"></td><td class="col-year"></td><td class="col-cat"></td></tr>';
+  }
+  const title = item.title || "Unbekannt";
+  const checked = isPreviewChecked(item.id);
+  return '<tr data-id="' + item.id + '" class="' + (checked ? "" : "unchecked") + (_dupIds.has(item.id) ? " duplicate" : "") + '">' +
+    '<td class="col-cb"><input type="checkbox"' + (checked ? " checked" : "") + ' data-id="' + item.id + '" onchange="onPreviewCheck(this)"></td>' +
+    '<td class="col-title"><a class="title-link" href="' + escAttr(item.url || "#") + '" target="_blank" rel="noopener" title="' + escAttr(title) + '">' + escHtml(title) + '</a><span class="dup-badge">Duplikat</span></td>' +
+    '<td class="col-date">' + (item.release_date || "—") + '</td>' +
+    '<td class="col-year">' + (item.production_year || "—") + '</td>' +
+    '<td class="col-cat">' + escHtml(item.category || "") + '</td>' +
+    '</tr>';
 }
 
 function escHtml(s) {
@@ -813,57 +1175,46 @@ function escHtml(s) {
   return d.innerHTML;
 }
 
+function escAttr(s) {
+  return escHtml(s).replace(/"/g, "&quot;");
+}
+
+function isPreviewChecked(id) {
+  return _selectAll !== _selectionExceptions.has(id);
+}
+
+function setPreviewChecked(id, checked) {
+  if (checked === _selectAll) _selectionExceptions.delete(id);
+  else _selectionExceptions.add(id);
+}
+
+function selectedPreviewCount() {
+  return _selectAll ? _previewCount - _selectionExceptions.size : _selectionExceptions.size;
+}
+
 function onPreviewCheck(cb) {
-  const tr = cb.closest("tr");
-  if (cb.checked) tr.classList.remove("unchecked");
-  else tr.classList.add("unchecked");
+  setPreviewChecked(parseInt(cb.dataset.id, 10), cb.checked);
+  cb.closest("tr").classList.toggle("unchecked", !cb.checked);
   updatePreviewCount();
 }
 
 function selectAllPreview(checked) {
-  document.querySelectorAll("#preview-body input[type=checkbox]").forEach(cb => {
-    cb.checked = checked;
-    const tr = cb.closest("tr");
-    if (checked) tr.classList.remove("unchecked");
-    else tr.classList.add("unchecked");
-  });
+  _selectAll = checked;
+  _selectionExceptions = new Set();
   document.getElementById("preview-select-all").checked = checked;
   updatePreviewCount();
+  schedulePreviewRender();
 }
 
 function updatePreviewCount() {
-  const total = document.querySelectorAll("#preview-body input[type=checkbox]").length;
-  const checked = document.querySelectorAll("#preview-body input[type=checkbox]:checked").length;
-  document.getElementById("preview-count").textContent = checked + " / " + total + " ausgewählt";
+  let text = selectedPreviewCount() + " / " + _previewCount + " ausgewählt";
+  if (_previewQuery.q && !_previewLive) text += " · " + _previewTotal + " Treffer";
+  document.getElementById("preview-count").textContent = text;
 }
 
 // ---- Cross-category dedup logic ----
-function normalizeTitle(t) {
-  if (!t) return "";
-  var s = t.toLowerCase();
-  // normalize German umlauts
-  s = s.replace(/ä/g,'ae').replace(/ö/g,'oe').replace(/ü/g,'ue').replace(/ß/g,'ss');
-  // remove parenthetical and bracketed parts
-  s = s.replace(/\([^)]*\)/g, ' ').replace(/\[[^\]]*\]/g, ' ');
-  // remove blu-ray/format variants first (order matters: multi-word before single)
-  s = s.replace(/\b\d+\s*blu[\s-]?rays?\b/g, ' ');  // "2 Blu-ray"
-  s = s.replace(/\bblu[\s-]?ray\s*disc\b/g, ' ');
-  s = s.replace(/\bblu[\s-]?rays?\b/g, ' ');
-  s = s.replace(/\b\d+k\b/g, ' ');  // "4k", "8k"
-  s = s.replace(/\buhd\b/g, ' ');
-  s = s.replace(/\bdvd\b/g, ' ');
-  // remove known edition/format tokens
-  var tokens = ['limited','steelbook','mediabook','wattierte','amaray','cover','edition',
-    'soundtrack','cd','deluxe','collector','exclusive','special','uncut','extended','directors cut'];
-  tokens.forEach(function(tok) { s = s.replace(new RegExp('\\b' + tok.replace(/[.*+?^${}()|[\]\\]/g,'\\$&') + '\\b','g'), ' '); });
-  // remove non-alphanumeric (keep - and space)
-  s = s.replace(/[^a-z0-9\-\s]/g, ' ');
-  // collapse whitespace
-  s = s.replace(/[-\s]+/g, ' ').trim();
-  return s;
-}
-
-var CAT_PRIORITY = {"4K UHD":0, "Blu-ray Filme":1, "3D Blu-ray":2, "Serien":3, "Importe":4};
+// The server groups the items (fuzzy duplicate group, else normalized title) and keeps
+// the best of each group (category priority, then earliest date); the rest are marked.
 
 function toggleDedup(on) {
   if (on) markDuplicates();
@@ -871,89 +1222,72 @@ function toggleDedup(on) {
 }
 
 function markDuplicates() {
-  var items = window._previewItems;
-  if (!items || items.length === 0) return;
-  // Group by normalized title
-  var groups = {};
-  items.forEach(function(item, idx) {
-    var key = normalizeTitle(item.title);
-    if (!groups[key]) groups[key] = [];
-    groups[key].push(idx);
+  if (_previewLive || !_previewJob) return;  // applied when the job is done
+  fetch(previewItemsUrl({limit: 0, group: "dups"})).then(r => r.json().then(d => {
+    if (!r.ok) throw new Error(d.error || ("HTTP " + r.status));
+    _dupIds = new Set(d.duplicates);
+    _dupIds.forEach(id => setPreviewChecked(id, false));
+    updatePreviewCount();
+    schedulePreviewRender();
+  })).catch(err => {
+    appendLog("Fehler: " + err.message, "error");
   });
-  var rows = document.querySelectorAll("#preview-body tr");
-  // For each group with >1 entry, keep the best and mark the rest as duplicates
-  Object.keys(groups).forEach(function(key) {
-    var idxs = groups[key];
-    if (idxs.length <= 1) return;
-    // Find the best: lowest category priority, then earliest date
-    idxs.sort(function(a, b) {
-      var catA = CAT_PRIORITY[items[a].category] !== undefined ? CAT_PRIORITY[items[a].category] : 99;
-      var catB = CAT_PRIORITY[items[b].category] !== undefined ? CAT_PRIORITY[items[b].category] : 99;
-      if (catA !== catB) return catA - catB;
-      var dA = items[a].release_date || "9999";
-      var dB = items[b].release_date || "9999";
-      return dA < dB ? -1 : dA > dB ? 1 : 0;
-    });
-    // First is best, rest are duplicates
-    for (var i = 1; i < idxs.length; i++) {
-      var row = rows[idxs[i]];
-      if (!row) continue;
-      row.classList.add("duplicate");
-      var cb = row.querySelector("input[type=checkbox]");
-      if (cb) { cb.checked = false; row.classList.add("unchecked"); }
-    }
-  });
-  updatePreviewCount();
 }
 
 function clearDuplicateMarks() {
-  document.querySelectorAll("#preview-body tr.duplicate").forEach(function(row) {
-    row.classList.remove("duplicate");
-    var cb = row.querySelector("input[type=checkbox]");
-    if (cb) { cb.checked = true; row.classList.remove("unchecked"); }
-  });
+  _dupIds.forEach(id => setPreviewChecked(id, true));
+  _dupIds = new Set();
   updatePreviewCount();
+  schedulePreviewRender();
 }
 
 function generateICS() {
-  const checkboxes = document.querySelectorAll("#preview-body input[type=checkbox]:checked");
-  const selected = [];
-  checkboxes.forEach(cb => {
-    const idx = parseInt(cb.dataset.idx, 10);
-    if (window._previewItems && window._previewItems[idx]) {
-      selected.push(window._previewItems[idx]);
-    }
-  });
-  if (selected.length === 0) {
+  const count = selectedPreviewCount();
+  if (count === 0) {
     alert("Bitte mindestens einen Eintrag auswählen!");
     return;
   }
+  if (_previewLive) {
+    appendLog("Die Vorschau ist noch nicht fertig.", "warn");
+    return;
+  }
   const outputPattern = document.getElementById("output_pattern").value.trim() || "bluray_{year}_{months}.ics";
-  appendLog("Erstelle ICS mit " + selected.length + " Einträgen...", "info");
+  appendLog("Erstelle ICS mit " + count + " Einträgen...", "info");
+  // the server has the items, only the selection (as ids) is sent
+  const exceptions = Array.from(_selectionExceptions);
+  const selection = _selectAll ? {exclude: exceptions} : {ids: exceptions};
 
+  // The calendar comes back directly as the response body (no file on the server)
   fetch("/generate-ics", {
     method: "POST",
     headers: {"Content-Type": "application/json"},
-    body: JSON.stringify({items: selected, output_pattern: outputPattern}),
-  }).then(r => r.json()).then(d => {
-    if (d.ok) {
-      appendLog("ICS erstellt: " + d.file + " (" + d.count + " Einträge)", "success");
-      const badge = document.getElementById("status-badge");
-      badge.className = "status-badge status-done";
-      badge.textContent = "Fertig";
-      const dlRow = document.getElementById("download-row");
-      dlRow.innerHTML = "";
-      const a = document.createElement("a");
-      a.className = "download-btn";
-      a.href = "/download/" + encodeURIComponent(d.file);
-      a.innerHTML = '<svg width="18" height="18" fill="none" stroke="currentColor" stroke-width="2" viewBox="0 0 24 24"><path d="M21 15v4a2 2 0 01-2 2H5a2 2 0 01-2-2v-4M7 10l5 5 5-5M12 15V3"/></svg> ' + d.file;
-      dlRow.appendChild(a);
-      dlRow.classList.add("visible");
-    } else {
-      appendLog("Fehler: " + (d.error || "unbekannt"), "error");
-    }
+    body: JSON.stringify(Object.assign({job: _previewJob, output_pattern: outputPattern, stream: true}, selection)),
+  }).then(r => {
+    if (!r.ok) return r.json().then(d => { throw new Error(d.error || ("HTTP " + r.status)); });
+    const disposition = r.headers.get("Content-Disposition") || "";
+    const m = disposition.match(/filename\*=UTF-8''([^;]+)/);
+    const file = m ? decodeURIComponent(m[1]) : "bluray_selected.ics";
+    const events = r.headers.get("X-Event-Count") || count;
+    return r.blob().then(blob => ({blob: blob, file: file, count: events}));
+  }).then(d => {
+    appendLog("ICS erstellt: " + d.file + " (" + d.count + " Einträge)", "success");
+    const badge = document.getElementById("status-badge");
+    badge.className = "status-badge status-done";
+    badge.textContent = "Fertig";
+    if (window._icsUrl) URL.revokeObjectURL(window._icsUrl);
+    window._icsUrl = URL.createObjectURL(d.blob);
+    const dlRow = document.getElementById("download-row");
+    dlRow.innerHTML = "";
+    const a = document.createElement("a");
+    a.className = "download-btn";
+    a.href = window._icsUrl;
+    a.download = d.file;
+    a.innerHTML = '<svg width="18" height="18" fill="none" stroke="currentColor" stroke-width="2" viewBox="0 0 24 24"><path d="M21 15v4a2 2 0 01-2 2H5a2 2 0 01-2-2v-4M7 10l5 5 5-5M12 15V3"/></svg> ' + d.file;
+    dlRow.appendChild(a);
+    dlRow.classList.add("visible");
+    a.click();
   }).catch(err => {
-    appendLog("Netzwerkfehler: " + err, "error");
+    appendLog("Fehler: " + err.message, "error");
   });
 }
 </script>
@@ -969,7 +1303,7 @@ function generateICS() {
 def index():
     cfg = load_config()
     current_year = datetime.now().year
-    year_range = list(range(2028, 1949, -1))  # 2028 down to 1950, newest first
+    year_range = list(reversed(YEARS))  # newest first
     return render_template_string(
         HTML_TEMPLATE,
         config=cfg,
@@ -980,18 +1314,50 @@ def index():
 
 @app.route("/save-config", methods=["POST"])
 def save_config_route():
-    data = request.get_json(force=True)
+    # merge so settings that are not part of the form (e.g. "parser") survive
+    data = {**load_config(), **request.get_json(force=True)}
     save_config(data)
     return jsonify({"ok": True})
 
 @app.route("/start", methods=["POST"])
 def start_scraping():
-    data = request.get_json(force=True)
+    form = request.get_json(force=True)
+    refresh = bool(form.pop("refresh", False))  # bypass the result cache
+    data = {**load_config(), **form}
     save_config(data)
 
-    job_id = str(uuid.uuid4())[:8]
-    q = queue.Queue()
-    jobs[job_id] = {"queue": q, "status": "running", "output_file": None}
+    # identical requests share the running job, or get a recent result right away
+    key = form_key(data)
+    try:
+        ttl = float(data.get("result_cache_minutes", DEFAULT_TTL_MINUTES)) * 60
+    except (TypeError, ValueError):
+        ttl = DEFAULT_TTL_MINUTES * 60
+    kind, value = _results.claim(key, str(uuid.uuid4())[:8], ttl, use_cache=not refresh)
+    if kind == "running":
+        return jsonify({"job_id": value, "coalesced": True})
+
+    events = EventLog()
+    if kind == "cached":
+        result_job, cached_at = value
+        source = _jobs.get(result_job)
+        if source is not None and source["item_count"]:
+            job_id = str(uuid.uuid4())[:8]
+            # a reference to result_job: keeps it from being evicted while this job exists
+            _jobs.create(job_id, source=result_job, events=events, status="preview", output_file=None)
+            _jobs.finish(job_id)
+            stamp = datetime.fromtimestamp(cached_at).strftime("%H:%M:%S")
+            events.put({"type": "log", "text": f"Ergebnis aus dem Cache (Stand {stamp}): {source['item_count']} Eintraege.", "level": "success"})
+            # the items stay with the job that produced them, /stream fills them in
+            events.put({"type": "preview", "job": result_job, "count": source["item_count"],
+                        "cached_at": cached_at})
+            return jsonify({"job_id": job_id, "cached_at": cached_at})
+        # the result's job has been evicted meanwhile: crawl again
+        kind, value = _results.claim(key, str(uuid.uuid4())[:8], ttl, use_cache=False)
+        if kind == "running":
+            return jsonify({"job_id": value, "coalesced": True})
+
+    job_id = value
+    _jobs.create(job_id, events=events, status="running", output_file=None, cache_key=key)
 
     t = threading.Thread(target=run_scraper, args=(job_id, data), daemon=True)
     t.start()
@@ -1000,24 +1366,119 @@ def start_scraping():
 
 @app.route("/stream/<job_id>")
 def stream(job_id):
-    job = jobs.get(job_id)
+    job = _jobs.get(job_id)
     if not job:
         return "Job not found", 404
 
+    # every stream replays the job's events from the start, so several clients can follow one job;
+    # a reconnecting EventSource sends the number of the next event it needs as Last-Event-ID
+    try:
+        start = max(0, int(request.headers.get("Last-Event-ID", 0)))
+    except ValueError:
+        start = 0
+
     def generate():
+        pos = start
+        log = job["events"]
         while True:
-            try:
-                msg = job["queue"].get(timeout=30)
-            except queue.Empty:
-                yield "data: {}\n\n"
+            events, pos, closed = log.read(pos, timeout=30)
+            if not events:
+                if closed:
+                    break
+                yield ": keepalive\n\n"
                 continue
-            yield f"data: {json.dumps(msg, ensure_ascii=False)}\n\n"
-            if msg.get("type") in ("done", "error", "preview"):
-                break
+            if not closed:
+                # collect what arrives within the flush interval into the same frame
+                time.sleep(SSE_FLUSH_INTERVAL)
+                more, pos, closed = log.read(pos, timeout=0)
+                events += more
+            # one frame per flush: a JSON list of events, its id is the number to resume from
+            yield f"id: {pos}\ndata: {json.dumps(coalesce(events), ensure_ascii=False)}\n\n"
 
     return Response(generate(), mimetype="text/event-stream",
                     headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
+@app.route("/feed/<category>/<year>.ics")
+def feed(category, year):
+    """Subscribable calendar of one category and calendar year, served from the feed cache."""
+    # only the years of the UI: every other year would start an upstream crawl and
+    # a cached feed of its own
+    if category not in CATEGORIES or not (year.isdigit() and len(year) == 4 and int(year) in YEARS):
+        return "Unbekannter Feed", 404
+    try:
+        max_age = float(load_config().get("feed_refresh_minutes", DEFAULT_REFRESH_MINUTES)) * 60
+    except (TypeError, ValueError):
+        max_age = DEFAULT_REFRESH_MINUTES * 60
+    entry = _feeds.get(category, year, max_age)
+    if entry is None:
+        return Response("Feed wird erstellt, bitte spaeter erneut abrufen.\n", status=503,
+                        mimetype="text/plain", headers={"Retry-After": str(RETRY_AFTER)})
+
+    gz = "gzip" in request.accept_encodings
+    # strong ETag per representation
+    etag = entry.etag + ("-gz" if gz else "")
+    headers = {
+        "ETag": f'"{etag}"',
+        "Last-Modified": http_date(entry.built_at),
+        "Cache-Control": f"max-age={max(0, int(entry.built_at + max_age - time.time()))}",
+        "Vary": "Accept-Encoding",
+    }
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    if gz:
+        headers["Content-Encoding"] = "gzip"
+    return Response(entry.gzip_body if gz else entry.body, mimetype="text/calendar", headers=headers)
+
+@app.route("/feeds/status")
+def feeds_status():
+    """Known feeds with their event count, build time, running refresh and last error."""
+    return jsonify(_feeds.status())
+
+@app.route("/metrics")
+def scraper_metrics():
+    """Scraper metrics of all runs since the start, in the Prometheus text format."""
+    return Response(_metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/jobs")
+def jobs_status():
+    """Live jobs with their memory/disk footprint and the eviction counters."""
+    return jsonify(_jobs.stats())
+
+@app.route("/jobs/<job_id>/items")
+def job_items(job_id):
+    """Preview items of a finished job: `limit` items from `offset` on (default: all) of
+    the list filtered by `q` (title) and sorted by `sort` (a field, "-" in front for
+    descending). `group=dups` adds the ids of all duplicates ("duplicates")."""
+    items = _jobs.items(job_id)
+    if items is None:
+        return jsonify({"error": "Ergebnis nicht mehr vorhanden, bitte neu starten."}), 404
+    query = request.args.get("q", "")
+    sort = request.args.get("sort", "")
+    if sort.lstrip("-") and sort.lstrip("-") not in SORT_FIELDS:
+        return jsonify({"error": f"Unbekannte Sortierung: {sort}"}), 400
+    try:
+        offset = max(0, int(request.args.get("offset", 0)))
+        limit = request.args.get("limit")
+        limit = max(0, int(limit)) if limit else None
+    except ValueError:
+        return jsonify({"error": "offset/limit muessen Zahlen sein"}), 400
+
+    view = _views.view(job_id, items, query, sort)
+    page = view[offset:] if limit is None else view[offset:offset + limit]
+    body = {"items": [items[i] for i in page], "offset": offset, "total": len(view), "count": len(items)}
+    if request.args.get("group") == "dups":
+        body["duplicates"] = _views.duplicates(job_id, items)
+    return jsonify(body)
+
+@app.route("/scheduler/status")
+def scheduler_status():
+    return jsonify(_prewarm.status())
+
+@app.route("/scheduler/run", methods=["POST"])
+def scheduler_run():
+    _prewarm.trigger()
+    return jsonify({"ok": True})
+
 @app.route("/download/<path:filename>")
 def download(filename):
     safe_name = Path(filename).name
@@ -1029,87 +1490,138 @@ def download(filename):
 # Scraper runner (in background thread)
 # ---------------------------------------------------------------------------
 
-def _process_scraper_line(line, q, cat_label, all_preview_items):
-    """Process a single line of scraper output (shared by subprocess and in-process modes)."""
-    line = line.rstrip("\n\r")
-    if not line:
-        return
-    # Intercept PREVIEW_JSON lines
-    if line.startswith("PREVIEW_JSON:"):
-        json_str = line[len("PREVIEW_JSON:"):]
-        try:
-            preview_data = json.loads(json_str)
-            for item in preview_data.get("items", []):
-                item["category"] = cat_label
-            all_preview_items.extend(preview_data.get("items", []))
-        except Exception:
-            pass
-        return
-    level = "info"
-    if "WARNING" in line or "Fehler" in line:
-        level = "warn"
-    elif "ERROR" in line:
-        level = "error"
-    elif "Vorschau:" in line or "Candidate added" in line:
-        level = "success"
-    q.put({"type": "log", "text": line, "level": level})
-
-
-class _LineWriter:
-    """A file-like object that forwards each written line to the job queue in real-time."""
-    def __init__(self, q, cat_label, all_preview_items):
-        self._q = q
-        self._cat_label = cat_label
-        self._items = all_preview_items
-        self._buf = ""
-
-    def write(self, text):
-        self._buf += text
-        while "\n" in self._buf:
-            line, self._buf = self._buf.split("\n", 1)
-            _process_scraper_line(line, self._q, self._cat_label, self._items)
-
-    def flush(self):
-        if self._buf.strip():
-            _process_scraper_line(self._buf, self._q, self._cat_label, self._items)
-            self._buf = ""
-
-
-def _run_scraper_inprocess(args_list, q, cat_label, all_preview_items):
-    """Run scraper.main() directly in-process (for frozen exe).
-    Streams output to the job queue in real-time."""
-    import contextlib
-
-    # Save and replace sys.argv so argparse inside scraper.main() sees our args
-    orig_argv = sys.argv
-    sys.argv = ["scraper"] + args_list
-
-    writer = _LineWriter(q, cat_label, all_preview_items)
+# scrape() log levels -> CSS classes of the log view
+_LOG_LEVELS = {"warning": "warn", "error": "error"}
+
+
+def _build_feed_events(category, year):
+    """Crawl one category calendar for the feed cache and return its event dicts."""
+    config = scraper.ScrapeConfig(
+        year=year,
+        calendar_year=year,
+        calendar_template=CALENDAR_TEMPLATE,
+        ignore_production=True,
+        category=category,
+        parser=load_config().get("parser") or "auto",
+        cache=str(BASE_DIR / scraper.DEFAULT_CACHE_PATH),
+    )
+    return [
+        {"summary": item["title"], "uid": event_uid(item["url"]), "dtstart": item["release_date"],
+         "description": f"Quelle: {item['url']}"}
+        for item in scraper.scrape(config, throttle=_throttle, metrics=_metrics)
+    ]
+
+
+# Feed refreshes run in the sub-job pool, so they count towards "max_parallel_jobs"
+_feeds = FeedCache(BASE_DIR / FEED_DIR, _build_feed_events, lambda fn: _get_subjob_pool().submit(fn))
+
+
+def _year_and_category_lists(calendar_years, categories_csv):
+    year_list = [y.strip() for y in calendar_years.split(",") if y.strip()]
+    if not year_list:
+        year_list = [str(datetime.now().year)]
+    cat_list = [c.strip() for c in categories_csv.split(",") if c.strip()]
+    if not cat_list:
+        cat_list = ["4k-uhd"]
+    return year_list, cat_list
+
+
+def _prewarm_run():
+    """One pre-warming crawl: every configured calendar year with all configured
+    categories (as a /start job would request them) into the HTTP cache."""
+    cfg = load_config()
+    year_list, cat_list = _year_and_category_lists(cfg.get("calendar_years", ""), cfg.get("categories", ""))
+    configs = [
+        scraper.ScrapeConfig(
+            year=y,
+            calendar_year=y,
+            calendar_template=CALENDAR_TEMPLATE,
+            ignore_production=True,
+            category=",".join(cat_list),
+            parser=cfg.get("parser") or "auto",
+            cache=str(BASE_DIR / scraper.DEFAULT_CACHE_PATH),
+        )
+        for y in year_list
+    ]
+    # in the sub-job pool, so pre-warming counts towards "max_parallel_jobs"
+    pool = _get_subjob_pool()
+    futures = [pool.submit(lambda c=c: sum(1 for _ in scraper.scrape(c, throttle=_throttle, metrics=_metrics))) for c in configs]
+    return {"years": year_list, "categories": cat_list, "items": sum(f.result() for f in futures)}
+
+
+_prewarm = PrewarmScheduler(_prewarm_run, lambda: load_config().get("prewarm_interval_minutes", DEFAULT_INTERVAL_MINUTES))
+
+
+def _cache_fresh_seconds():
+    """Once the scheduler has warmed the cache, interactive jobs use cached pages younger
+    than one pre-warm interval without asking the server again."""
+    st = _prewarm.status()
+    if not st["enabled"] or st["freshness"] is None:
+        return 0
+    return int(st["interval_minutes"] * 60 * (1 + DEFAULT_JITTER))
+
+
+def _preview_item(item):
+    """Preview entry of a scrape() item or "candidate" event."""
+    rd = item["release_date"]
+    return {
+        "title": item["title"],
+        "release_date": rd.isoformat() if rd else None,
+        "url": item["url"],
+        "production_year": item["production_year"],
+        "category": CATEGORIES.get(item["category"], item["category"]),
+        # same key as the scraper's dedup, also used by the preview's duplicate marking
+        "dedup_key": normalize_title(item["title"]),
+    }
+
+
+def _run_subjob(sub, q, live):
+    """Run one scraper invocation (calendar year, all categories) in this thread and
+    return its preview items. Candidates are shown through `live` as the scraper finds
+    them and settled against the result at the end."""
+    items = []
+    shown = {}  # (url, category) -> candidate shown live
+    details = 0
+    prefix = f"[{sub['label']}] "
+    q.put({"type": "subjob", "id": sub["id"], "label": sub["label"], "status": "running"})
+    q.put({"type": "log", "text": f"--- Starte: Jahr {sub['year']}, Kategorien: {sub['cat_label']} ---", "level": "info"})
+
+    def on_progress(event):
+        nonlocal details
+        if event["type"] == "log":
+            text = event["text"]
+            level = _LOG_LEVELS.get(event["level"], "info")
+            if level == "info" and "Candidate added" in text:
+                level = "success"
+            q.put({"type": "log", "text": prefix + text, "level": level})
+        elif event["type"] == "detail":
+            details += 1
+            q.put({"type": "subjob", "id": sub["id"], "label": sub["label"], "status": "running",
+                   "details": details})
+        elif event["type"] == "candidate":
+            item = _preview_item(event)
+            shown[(item["url"], item["category"])] = item
+            live.add(item)
+
     try:
-        import scraper
-        with contextlib.redirect_stdout(writer), contextlib.redirect_stderr(writer):
-            # Also redirect the logging handler to our real-time stream
-            root_logger = logging.getLogger()
-            temp_handler = logging.StreamHandler(writer)
-            temp_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(message)s'))
-            orig_handlers = root_logger.handlers[:]
-            root_logger.handlers = [temp_handler]
-            try:
-                scraper.main()
-            finally:
-                root_logger.handlers = orig_handlers
-    except SystemExit:
-        pass  # argparse may call sys.exit
+        for item in scraper.scrape(sub["config"], on_progress=on_progress, throttle=_throttle, metrics=_metrics):
+            items.append(_preview_item(item))
     except Exception as e:
-        q.put({"type": "log", "text": f"Scraper Fehler: {e}", "level": "error"})
-    finally:
-        sys.argv = orig_argv
-        writer.flush()
+        q.put({"type": "log", "text": f"{prefix}Scraper Fehler: {e}", "level": "error"})
+        q.put({"type": "subjob", "id": sub["id"], "label": sub["label"], "status": "error", "items": len(items)})
+        sub["failed"] = True
+        return live.settle(shown, items)
+
+    items = live.settle(shown, items)
+
+    q.put({"type": "log", "text": f"{prefix}Vorschau: {len(items)} Eintraege gefunden (dedupliziert).", "level": "success"})
+    q.put({"type": "subjob", "id": sub["id"], "label": sub["label"], "status": "done", "items": len(items)})
+    return items
 
 
 def run_scraper(job_id, data):
-    job = jobs[job_id]
-    q = job["queue"]
+    job = _jobs.get(job_id)
+    q = job["events"]
 
     try:
         calendar_years = data.get("calendar_years", str(datetime.now().year))
@@ -1118,103 +1630,66 @@ def run_scraper(job_id, data):
         release_years = data.get("release_years", "")
         production_years = data.get("production_years", "")
         ignore_production = data.get("ignore_production", True)
+        html_parser = data.get("parser") or "auto"
 
-        year_list = [y.strip() for y in calendar_years.split(",") if y.strip()]
-        if not year_list:
-            year_list = [str(datetime.now().year)]
-
-        cat_list = [c.strip() for c in categories_csv.split(",") if c.strip()]
-        if not cat_list:
-            cat_list = ["4k-uhd"]
-
-        total_steps = len(year_list) * len(cat_list)
-        step = 0
-        all_preview_items = []
-        is_frozen = getattr(sys, 'frozen', False)
+        year_list, cat_list = _year_and_category_lists(calendar_years, categories_csv)
 
+        # One sub-job per calendar year; it crawls all selected categories with a shared
+        # crawl plan, so a film listed in several category calendars is only fetched once.
+        # The sub-jobs run concurrently in the shared pool.
+        cat_label = ", ".join(CATEGORIES.get(cat, cat) for cat in cat_list)
+        cache_fresh = _cache_fresh_seconds()
+        subjobs = []
         for y in year_list:
-            for cat in cat_list:
-                tpl_url = f"https://bluray-disc.de/{cat}/kalender?id={{year}}-{{month:02d}}"
-                prod_arg = production_years if production_years else (release_years if release_years else y)
-
-                cat_label = CATEGORIES.get(cat, cat)
-
-                # Build scraper arguments
-                scraper_args = ["--year", prod_arg]
-                scraper_args += ["--calendar-year", y]
-                scraper_args += ["--calendar-template", tpl_url]
-                if months:
-                    scraper_args += ["--months", months]
-                if release_years:
-                    scraper_args += ["--release-years", release_years]
-                if ignore_production:
-                    scraper_args += ["--ignore-production"]
-                scraper_args += ["--category", cat]
-                scraper_args += ["--preview"]
-                scraper_args += ["--out", "preview_temp.ics"]
-
-                q.put({"type": "log", "text": f"--- Starte: Jahr {y}, Kategorie: {cat_label} ---", "level": "info"})
-
-                if is_frozen:
-                    # Frozen exe: run scraper directly in-process
-                    _run_scraper_inprocess(scraper_args, q, cat_label, all_preview_items)
-                else:
-                    # Development: run as subprocess
-                    cmd = [sys.executable, "-u", str(BUNDLE_DIR / "scraper.py")] + scraper_args
-
-                    proc = subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        encoding="utf-8",
-                        errors="replace",
-                        cwd=str(BASE_DIR),
-                    )
-
-                    for line in proc.stdout:
-                        _process_scraper_line(line, q, cat_label, all_preview_items)
-
-                    proc.wait()
-                    if proc.returncode != 0:
-                        q.put({"type": "log", "text": f"Scraper beendet mit Exit-Code {proc.returncode}", "level": "error"})
-
-                step += 1
-                percent = int((step / total_steps) * 100)
-                q.put({"type": "progress", "percent": percent})
+            prod_arg = production_years if production_years else (release_years if release_years else y)
+
+            config = scraper.ScrapeConfig(
+                year=prod_arg,
+                explicit_year=True,
+                calendar_year=y,
+                calendar_template=CALENDAR_TEMPLATE,
+                months=months or None,
+                release_years=release_years or None,
+                ignore_production=bool(ignore_production),
+                category=",".join(cat_list),
+                parser=html_parser,
+                cache=str(BASE_DIR / scraper.DEFAULT_CACHE_PATH),
+                cache_fresh=cache_fresh,
+            )
+            subjobs.append({"id": len(subjobs), "year": y, "cat_label": cat_label,
+                            "label": y, "config": config})
+
+        for sub in subjobs:
+            q.put({"type": "subjob", "id": sub["id"], "label": sub["label"], "status": "queued"})
+
+        live = LivePreview(q.put)
+        pool = _get_subjob_pool()
+        futures = {pool.submit(_run_subjob, sub, q, live): sub["id"] for sub in subjobs}
+        results = {}
+        for done_count, fut in enumerate(as_completed(futures), start=1):
+            idx = futures[fut]
+            try:
+                results[idx] = fut.result()
+            except Exception as e:
+                results[idx] = []
+                subjobs[idx]["failed"] = True
+                q.put({"type": "log", "text": f"[{subjobs[idx]['label']}] Fehler: {e}", "level": "error"})
+                q.put({"type": "subjob", "id": idx, "label": subjobs[idx]["label"], "status": "error"})
+            q.put({"type": "progress", "percent": int(done_count / len(subjobs) * 100)})
+
+        # Merge in the original year order so the dedup below is deterministic
+        all_preview_items = []
+        for idx in range(len(subjobs)):
+            all_preview_items.extend(results.get(idx, []))
 
         # Sort all items by release_date
         all_preview_items.sort(key=lambda x: x.get("release_date") or "9999-99-99")
 
         # Cross-category dedup: keep best version per normalized title
-        import re as _re
-        CAT_PRIO = {"4K UHD": 0, "Blu-ray Filme": 1, "3D Blu-ray": 2, "Serien": 3, "Importe": 4}
-
-        def _norm(t):
-            if not t:
-                return ""
-            s = t.lower()
-            s = s.replace('ä','ae').replace('ö','oe').replace('ü','ue').replace('ß','ss')
-            s = _re.sub(r"\([^)]*\)", ' ', s)
-            s = _re.sub(r"\[[^\]]*\]", ' ', s)
-            s = _re.sub(r'\b\d+\s*blu[\s-]?rays?\b', ' ', s)
-            s = _re.sub(r'\bblu[\s-]?ray\s*disc\b', ' ', s)
-            s = _re.sub(r'\bblu[\s-]?rays?\b', ' ', s)
-            s = _re.sub(r'\b\d+k\b', ' ', s)
-            s = _re.sub(r'\buhd\b', ' ', s)
-            s = _re.sub(r'\bdvd\b', ' ', s)
-            for tok in ['limited','steelbook','mediabook','wattierte','amaray','cover',
-                        'edition','soundtrack','cd','deluxe','collector','exclusive',
-                        'special','uncut','extended','directors cut']:
-                s = _re.sub(r'\b' + _re.escape(tok) + r'\b', ' ', s)
-            s = _re.sub(r'[^a-z0-9\-\s]', ' ', s)
-            s = _re.sub(r'[-\s]+', ' ', s).strip()
-            return s
-
         seen = {}
         deduped = []
         for item in all_preview_items:
-            key = _norm(item.get("title", ""))
+            key = item["dedup_key"]
             if not key:
                 deduped.append(item)
                 continue
@@ -1224,8 +1699,8 @@ def run_scraper(job_id, data):
             else:
                 # Keep the one with higher category priority (lower number = better)
                 existing = deduped[seen[key]]
-                ex_prio = CAT_PRIO.get(existing.get("category"), 99)
-                new_prio = CAT_PRIO.get(item.get("category"), 99)
+                ex_prio = CATEGORY_PRIORITY.get(existing.get("category"), 99)
+                new_prio = CATEGORY_PRIORITY.get(item.get("category"), 99)
                 if new_prio < ex_prio:
                     deduped[seen[key]] = item
 
@@ -1233,49 +1708,95 @@ def run_scraper(job_id, data):
             q.put({"type": "log", "text": f"Duplikate entfernt: {len(all_preview_items)} -> {len(deduped)} Eintraege", "level": "info"})
         all_preview_items = deduped
 
-        # Store items in job for later ICS generation
-        job["preview_items"] = all_preview_items
-        job["form_data"] = data
-        job["status"] = "preview"
+        # Near-duplicates ("Teil 2" / "Part II", spelling variants) are not removed, only
+        # grouped: "Duplikate markieren" marks all but the best entry of a group
+        # (preview_query.duplicate_ids).
+        fuzzy_threshold = _fuzzy_threshold(data.get("fuzzy_threshold", DEFAULT_THRESHOLD))
+        groups = duplicate_groups([item["dedup_key"] for item in all_preview_items], fuzzy_threshold)
+        for item, group in zip(all_preview_items, groups):
+            item["dup_group"] = group
+        fuzzy_dups = len(groups) - len(set(groups))
+        if fuzzy_dups and fuzzy_threshold < 1:
+            q.put({"type": "log", "text": f"Aehnliche Titel: {fuzzy_dups} moegliche Duplikate markierbar (Schwelle {fuzzy_threshold:g})", "level": "info"})
+
+        # the registry writes the items to disk and keeps them in memory within its budget
+        _jobs.finish(job_id, all_preview_items)
+        # incomplete results (a sub-job failed) are not cached
+        if any(sub.get("failed") for sub in subjobs):
+            _results.fail(job["cache_key"], job_id)
+        else:
+            _results.finish(job["cache_key"], job_id)
         q.put({"type": "log", "text": f"Scraping abgeschlossen! {len(all_preview_items)} Eintraege gefunden.", "level": "success"})
-        q.put({"type": "preview", "items": all_preview_items})
+        # the browser already has the items from the live deltas; this one sets the final list
+        live.finish(all_preview_items)
+        q.put({"type": "preview", "job": job_id, "count": len(all_preview_items), "deltas": live.deltas})
+        timer = threading.Timer(PREVIEW_DELTA_GRACE, q.discard, args=("items",))
+        timer.daemon = True
+        timer.start()
 
     except Exception as e:
-        job["status"] = "error"
+        _jobs.finish(job_id, status="error")
+        _results.fail(job["cache_key"], job_id)
         q.put({"type": "log", "text": f"Fehler: {e}", "level": "error"})
         q.put({"type": "error", "text": str(e)})
 
 
-@app.route("/generate-ics", methods=["POST"])
-def generate_ics():
-    """Generate an ICS file from user-selected preview items."""
-    from icalendar import Calendar, Event
-    data = request.get_json(force=True)
-    items = data.get("items", [])
-    output_pattern = data.get("output_pattern", "bluray_selected.ics")
-
-    if not items:
-        return jsonify({"ok": False, "error": "Keine Eintraege ausgewaehlt"}), 400
-
-    cal = Calendar()
-    cal.add('prodid', '-//BlurayDisc Scraper//de//')
-    cal.add('version', '2.0')
-
+def _ics_events(items):
+    """Event dicts (keyword arguments of ics_writer.format_event) for preview items."""
+    dtstamp = datetime.now(timezone.utc)
     for item in items:
-        ev = Event()
-        ev.add('summary', item.get('title', 'Unbekannt'))
-        ev.add('dtstamp', datetime.now())
+        rd = None
         if item.get('release_date'):
             try:
-                from datetime import date
                 rd = date.fromisoformat(item['release_date'])
-                ev.add('dtstart', rd)
             except Exception:
                 pass
         url = item.get('url', '')
-        ev.add('description', f"Quelle: {url}")
-        ev['uid'] = f"{abs(hash(url))}@bluray-disc.de"
-        cal.add_component(ev)
+        yield {"summary": item.get('title', 'Unbekannt'), "uid": event_uid(url),
+               "dtstamp": dtstamp, "dtstart": rd, "description": f"Quelle: {url}"}
+
+
+def _batched(chunks, size=ICS_CHUNK_SIZE):
+    """Join small chunks into pieces of about `size` bytes."""
+    buf, n = [], 0
+    for chunk in chunks:
+        buf.append(chunk)
+        n += len(chunk)
+        if n >= size:
+            yield b"".join(buf)
+            buf, n = [], 0
+    if buf:
+        yield b"".join(buf)
+
+
+def _gzipped(chunks):
+    """gzip-compress a stream of chunks on the fly."""
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+@app.route("/generate-ics", methods=["POST"])
+def generate_ics():
+    """Generate an ICS file from user-selected preview items: "job" plus the selected
+    "ids" (or all items but "exclude"), or the "items" themselves. With "stream": true the
+    calendar is sent back directly (chunked, gzip if the client accepts it) instead of
+    being written to BASE_DIR for a later /download."""
+    data = request.get_json(force=True)
+    if data.get("job"):
+        stored = _jobs.items(data["job"])
+        if stored is None:
+            return jsonify({"ok": False, "error": "Ergebnis nicht mehr vorhanden, bitte neu starten."}), 404
+        items = select(stored, data.get("ids"), data.get("exclude"))
+    else:
+        items = data.get("items", [])
+    output_pattern = data.get("output_pattern", "bluray_selected.ics")
+
+    if not items:
+        return jsonify({"ok": False, "error": "Keine Eintraege ausgewaehlt"}), 400
 
     # Build output filename
     out_name = output_pattern
@@ -1288,9 +1809,23 @@ def generate_ics():
     out_name = out_name.replace("{slug}", "selected")
     safe_name = Path(out_name).name
 
+    if data.get("stream"):
+        body = _batched(iter_calendar(_ics_events(items)))
+        headers = {
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(safe_name)}",
+            "X-Event-Count": str(len(items)),
+            "Cache-Control": "no-store",
+            "Vary": "Accept-Encoding",
+        }
+        if "gzip" in request.accept_encodings:
+            body = _gzipped(body)
+            headers["Content-Encoding"] = "gzip"
+        return Response(body, mimetype="text/calendar", headers=headers)
+
     out_path = BASE_DIR / safe_name
-    with open(out_path, 'wb') as f:
-        f.write(cal.to_ical())
+    with open(out_path, 'wb') as f, IcsWriter(f) as cal:
+        for event in _ics_events(items):
+            cal.add_event(**event)
 
     return jsonify({"ok": True, "file": safe_name, "count": len(items)})
 
@@ -1303,4 +1838,5 @@ if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     print(f"BluRay Calendar Scraper Web-UI startet auf http://localhost:{port}")
     threading.Timer(1.5, lambda: webbrowser.open(f"http://localhost:{port}")).start()
+    _prewarm.start()
     app.run(host="127.0.0.1", port=port, debug=False, threaded=True)